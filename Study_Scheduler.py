@@ -1,9 +1,23 @@
 # study_planner/main.py
-from ui.main_window import StudyPlannerApp
+import sys
 
-def main():
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        # headless: never imports tkinter
+        from core.cli import main as cli_main
+        return cli_main(argv)
+    from core import instrument
+    from ui.main_window import StudyPlannerApp
     app = StudyPlannerApp()
-    app.mainloop()
+    profile = instrument.output_path()
+    if profile and profile.endswith(".prof"):
+        with instrument.profile_to(profile):
+            app.mainloop()
+    else:
+        app.mainloop()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# study_planner/benchmarks/bench_blockstore.py
+"""
+Memory and speed of BlockStore versus the plain list of StudyBlock objects
+the UI used before (linear scans, strftime matching).
+
+Run from the repository root:
+  python -m benchmarks.bench_blockstore [--blocks 20000]
+"""
+import argparse
+import time as _time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from core.blockstore import BlockStore
+from core.scheduler import StudyBlock
+
+
+class LegacyBlock:
+    """StudyBlock as it was before __slots__ and ids."""
+
+    def __init__(self, chapter, start_time, end_time, mode="Study"):
+        self.chapter = chapter
+        self.start_time = start_time
+        self.end_time = end_time
+        self.mode = mode
+        self.completed = False
+
+
+def _rows(n, chapters=200):
+    t0 = datetime(2030, 1, 1, 9, 0)
+    for i in range(n):
+        start = t0 + timedelta(minutes=55 * i)
+        yield f"Chapter {i % chapters}", start, start + timedelta(minutes=45)
+
+
+def _measure(build):
+    """Build twice: once timed, once under tracemalloc for retained memory."""
+    t = _time.perf_counter()
+    build()
+    elapsed = _time.perf_counter() - t
+    tracemalloc.start()
+    obj = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, elapsed, retained
+
+
+def _time_ops(fn, repeat):
+    t = _time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (_time.perf_counter() - t) / repeat
+
+
+def run(n, lookups=200):
+    rows = list(_rows(n))
+    legacy, legacy_build, legacy_mem = _measure(lambda: [LegacyBlock(*r) for r in rows])
+    store, store_build, store_mem = _measure(lambda: BlockStore(StudyBlock(*r) for r in rows))
+    # spread lookups over the whole schedule
+    spread = lambda i: (i * 7919) % n
+
+    # UI path before: match chapter + formatted start string
+    def legacy_find(i):
+        target = legacy[spread(i)]
+        key = target.start_time.strftime("%Y-%m-%d %H:%M")
+        for b in legacy:
+            if b.chapter == target.chapter and b.start_time.strftime("%Y-%m-%d %H:%M") == key:
+                return b
+
+    ids = [b.block_id for b in store]
+
+    def store_find(i):
+        return store.get(ids[spread(i)])
+
+    def legacy_chapter(i):
+        return [b for b in legacy if b.chapter == f"Chapter {i % 200}"]
+
+    def store_chapter(i):
+        return store.by_chapter(f"Chapter {i % 200}")
+
+    results = [
+        ("build", legacy_build, store_build),
+        ("find by row", _time_ops(legacy_find, 20), _time_ops(store_find, lookups)),
+        ("blocks of chapter", _time_ops(legacy_chapter, 20), _time_ops(store_chapter, lookups)),
+    ]
+    print(f"{n} blocks")
+    print(f"  retained memory: list {legacy_mem / 1024:.0f} KiB, BlockStore {store_mem / 1024:.0f} KiB")
+    for name, before, after in results:
+        print(f"  {name:<18} list {before * 1e3:9.3f} ms   BlockStore {after * 1e3:9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blocks", type=int, nargs="+", default=[1000, 20000])
+    args = parser.parse_args(argv)
+    for n in args.blocks:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# study_planner/benchmarks/bench_suite.py
+"""
+Offline benchmark suite with regression thresholds.
+
+Times schedule generation, save/load in each storage format, ICS export and
+the Treeview refresh path on the synthetic workloads in
+benchmarks/workloads.py. Wall time is the best of --repeat runs; peak memory
+comes from one extra run under tracemalloc. Results are written as JSON and
+compared with a stored baseline; the exit status is 1 when anything got more
+than --threshold percent slower or larger.
+
+Run from the repository root:
+  python -m benchmarks.bench_suite [--quick] [--out results.json]
+  python -m benchmarks.bench_suite --update-baseline      # after an intended change
+"""
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time as _time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.workloads import QUICK, SIZES, workloads
+from core.exporter import export_to_ics
+from core.scheduler import SmartScheduler
+from core.storage import load_schedule, save_schedule
+from ui.schedule_view import ScheduleView
+
+BASELINE = Path(__file__).with_name("baselines.json")
+THRESHOLD = 25.0      # percent
+MIN_DELTA_S = 0.002   # timing differences below this are noise, never a regression
+MIN_DELTA_KIB = 64
+TREE_PAGES = 5        # pages scrolled in after the first render
+
+
+class HeadlessTree:
+    """Treeview stand-in with the calls ScheduleView makes, for machines without a display; counts inserts."""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = 0
+
+    def insert(self, parent, index, iid, values):
+        self.rows[iid] = values
+        self.inserts += 1
+
+    def item(self, iid, values):
+        self.rows[iid] = values
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.rows[iid]
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def get_children(self):
+        return tuple(self.rows)
+
+
+def make_tree(real_tk=False):
+    """A real ttk.Treeview when asked for and a display is available, else HeadlessTree."""
+    if real_tk:
+        try:
+            import tkinter as tk
+            from tkinter import ttk
+            root = tk.Tk()
+            root.withdraw()
+            return ttk.Treeview(root, columns=("chapter", "start", "end", "mode", "done"), show="headings")
+        except Exception:  # no display / no Tk
+            pass
+    return HeadlessTree()
+
+
+def _benchmarks(kwargs, blocks, tmp, real_tk):
+    """Yield (name, fn) pairs; any files a load benchmark reads are written first."""
+    yield "generate", lambda: SmartScheduler(**kwargs).generate_schedule()
+    for suffix in (".json", ".jsonl", ".db", ".ssb"):
+        fname = tmp / f"plan{suffix}"
+        yield f"save{suffix}", lambda fname=fname: save_schedule(blocks, fname)
+        save_schedule(blocks, fname)
+        yield f"load{suffix}", lambda fname=fname: load_schedule(fname)
+    yield "export.ics", lambda: export_to_ics(blocks, tmp / "plan.ics")
+
+    view = ScheduleView(make_tree(real_tk))
+
+    def refresh():
+        view.show(blocks)
+        for _ in range(TREE_PAGES):
+            view.load_more()
+        view.update_blocks(blocks[:view.loaded])
+
+    yield "tree_refresh", refresh
+
+
+def measure(fn, repeat=3):
+    """Best wall time over `repeat` runs, and peak traced memory of one more run."""
+    best = None
+    for _ in range(repeat):
+        t = _time.perf_counter()
+        fn()
+        elapsed = _time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"wall_s": round(best, 6), "peak_kib": round(peak / 1024, 1)}
+
+
+def run(sizes=None, repeat=3, real_tk=False, log=None):
+    results = {}
+    tmp = Path(tempfile.mkdtemp(prefix="study-bench-"))
+    try:
+        for size, kwargs in workloads(sizes):
+            blocks = SmartScheduler(**kwargs).generate_schedule()
+            for name, fn in _benchmarks(kwargs, blocks, tmp, real_tk):
+                key = f"{name}[{size}]"
+                results[key] = dict(measure(fn, repeat), blocks=len(blocks))
+                if log is not None:
+                    r = results[key]
+                    log(f"{key:<24} {r['wall_s'] * 1e3:10.2f} ms {r['peak_kib']:10.0f} KiB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "date": datetime.now().isoformat(timespec="seconds"), "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """Return a message for every result more than `threshold` percent worse than the baseline."""
+    regressions = []
+    base = baseline.get("results", {})
+    for key, now in current["results"].items():
+        old = base.get(key)
+        if old is None:
+            continue
+        for metric, floor in (("wall_s", MIN_DELTA_S), ("peak_kib", MIN_DELTA_KIB)):
+            before, after = old[metric], now[metric]
+            if after - before > floor and after > before * (1 + threshold / 100):
+                pct = 100 * (after - before) / before if before else float("inf")
+                regressions.append(f"{key} {metric}: {before} -> {after} (+{pct:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite with regression thresholds.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=None, help="workload sizes (default: all)")
+    parser.add_argument("--quick", action="store_true", help=f"only the {' and '.join(QUICK)} workloads")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown in percent")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tk", action="store_true", help="use a real Treeview if a display is available")
+    args = parser.parse_args(argv)
+
+    current = run(QUICK if args.quick else args.sizes, args.repeat, args.tk, log=print)
+    if args.out:
+        Path(args.out).write_text(json.dumps(current, indent=2), encoding="utf-8")
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+        return 0
+    regressions = compare(current, json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
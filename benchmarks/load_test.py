@@ -0,0 +1,125 @@
+# study_planner/benchmarks/load_test.py
+"""
+Load test for the local HTTP service (core/service.py).
+
+Sends --requests generate requests from --concurrency client threads. The
+requests cycle through --distinct parameter sets, so with fewer distinct sets
+than concurrent clients identical requests overlap and exercise the
+deduplication. Reports client-side latency percentiles, throughput and status
+codes (503s show backpressure), then the service's own /stats.
+
+Against a running service:
+  python Study_Scheduler.py serve --port 8765 --workers 2
+  python -m benchmarks.load_test --url http://127.0.0.1:8765 --requests 200 --concurrency 16
+
+Or let the script start one on a free localhost port for the duration:
+  python -m benchmarks.load_test --start-server --workers 2
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks.workloads import PARAMS, chapter_titles
+
+
+def request_bodies(distinct, chapters, days, fmt, seed=0):
+    exam = (datetime.now() + timedelta(days=days)).replace(hour=23, minute=0, second=0, microsecond=0)
+    bodies = []
+    for n in range(distinct):
+        bodies.append({"chapters": chapter_titles(chapters, seed + n), "exam": exam.isoformat(),
+                       "block_minutes": PARAMS["block_minutes"], "break_minutes": PARAMS["break_minutes"],
+                       "daily_limit": PARAMS["daily_limit"], "ramp_factor": PARAMS["ramp_factor"],
+                       "day_start_hour": PARAMS["day_start_hour"], "random_seed": seed + n, "format": fmt})
+    return bodies
+
+
+def post(url, body, timeout=120):
+    """(status, response bytes, seconds); 503 and other HTTP errors are returned, not raised."""
+    data = json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        payload, status = e.read(), e.code
+    return status, len(payload), time.perf_counter() - started
+
+
+def run(url, bodies, requests, concurrency):
+    def one(n):
+        return post(url + "/generate", bodies[n % len(bodies)])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    ok = sorted(seconds for status, _, seconds in results if status == 200)
+
+    def pct(p):
+        return round(ok[min(len(ok) - 1, int(p * len(ok)))] * 1e3, 1) if ok else None
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "status": dict(Counter(status for status, _, _ in results)),
+        "bytes": sum(size for status, size, _ in results if status == 200),
+        "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": pct(1.0)},
+    }
+
+
+def fetch_stats(url):
+    with urllib.request.urlopen(url + "/stats", timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the local scheduling service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--start-server", action="store_true", help="start a service on a free localhost port")
+    parser.add_argument("--workers", type=int, default=2, help="pool size for --start-server")
+    parser.add_argument("--max-pending", type=int, default=None, help="admission limit for --start-server")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=4, help="distinct parameter sets")
+    parser.add_argument("--chapters", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--format", choices=("json", "jsonl", "ics"), default="json")
+    parser.add_argument("--out", default=None, help="write the results JSON here")
+    args = parser.parse_args(argv)
+
+    service = None
+    url = args.url.rstrip("/")
+    if args.start_server:
+        from core.service import ScheduleService
+        service = ScheduleService(port=0, workers=args.workers, max_pending=args.max_pending,
+                                  root=tempfile.gettempdir()).start()
+        url = service.url
+    try:
+        bodies = request_bodies(args.distinct, args.chapters, args.days, args.format)
+        result = run(url, bodies, args.requests, args.concurrency)
+        result["service"] = fetch_stats(url)
+    finally:
+        if service is not None:
+            service.close()
+
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["status"].get(200) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
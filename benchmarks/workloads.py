@@ -0,0 +1,55 @@
+# study_planner/benchmarks/workloads.py
+"""
+Synthetic scheduling workloads for the benchmark suite.
+
+A workload is a chapter count plus a horizon (days until the exam). Titles
+are built from a seeded word list with varied lengths, so the difficulty and
+length heuristics see a realistic spread. Timing parameters are fixed; the
+named sizes pair chapter counts with horizons that can hold them.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+WORDS = ("Introduction", "to", "Linear", "Algebra", "Organic", "Chemistry", "Thermodynamics", "and",
+         "Statistics", "Advanced", "Topics", "in", "Molecular", "Biology", "the", "Theory", "of",
+         "Probability", "Differential", "Equations", "European", "History", "Macroeconomics",
+         "Data", "Structures", "Quantum", "Mechanics", "Review", "Part", "Applications")
+
+# fixed timing: 25 + 5 minute blocks from 06:00 leave room for 34 blocks a day
+PARAMS = {"block_minutes": 25, "break_minutes": 5, "day_start_hour": 6, "daily_limit": 4, "ramp_factor": 0.5}
+
+# name -> (chapters, horizon days)
+SIZES = {
+    "tiny": (10, 1),
+    "small": (100, 30),
+    "medium": (1000, 365),
+    "large": (10000, 1095),
+}
+QUICK = ("tiny", "small")
+
+
+def chapter_titles(n, seed=0):
+    rng = random.Random(seed)
+    titles = []
+    for i in range(n):
+        words = rng.choices(WORDS, k=rng.randint(1, 12))
+        titles.append(f"{i + 1}. {' '.join(words)}")
+    return titles
+
+
+def make_workload(chapters, days, seed=0):
+    """
+    Keyword arguments for SmartScheduler: `chapters` synthetic titles and an
+    exam at 23:00 `days` days from today, so there are always `days` full days.
+    """
+    if chapters < 1 or days < 1:
+        raise ValueError("A workload needs at least one chapter and one day.")
+    exam = datetime.combine(datetime.now().date() + timedelta(days=days), time(23, 0))
+    return dict(PARAMS, chapter_titles=chapter_titles(chapters, seed), exam_datetime=exam, random_seed=seed)
+
+
+def workloads(names=None, seed=0):
+    """Yield (name, kwargs) for the named sizes (all by default)."""
+    for name in names or SIZES:
+        chapters, days = SIZES[name]
+        yield name, make_workload(chapters, days, seed)
@@ -0,0 +1,231 @@
+# study_planner/core/autosave.py
+"""
+Write-behind persistence for interactive edits.
+
+AutoSaver sits in front of a storage backend (SQLiteBackend or JsonBackend)
+and has the same write methods: save_all, update_blocks/update_block,
+delete_block and clear_completed. Calls only record the change in memory
+(snapshotting the blocks, so later edits on the caller's side can't race
+the writer) and return. A background thread writes once the changes have
+been quiet for `delay` seconds, or `max_delay` after the first unsaved
+change while edits keep coming, so a burst of clicks becomes one flush.
+
+Pending changes are merged as they arrive: a full save replaces everything
+before it, repeated updates of a block keep only the latest state and a
+delete cancels earlier updates. If a write fails the changes are kept and
+retried, with the wait doubling after each failure up to RETRY_MAX_DELAY,
+so a target that stays unwritable is not hammered. on_error is told about
+the first background failure of such a run. flush() writes synchronously
+and raises on failure; close() flushes and stops the thread (call it on
+exit).
+"""
+import threading
+import time
+
+from . import instrument
+from .blockstore import BlockStore
+
+DELAY = 0.5      # seconds of quiet before a flush
+MAX_DELAY = 5.0  # upper bound on how long a change stays unsaved while edits continue
+RETRY_MAX_DELAY = 60.0  # longest wait between retries of a failing write
+
+
+class _Pending:
+    """Changes not yet written, already merged."""
+
+    def __init__(self):
+        self.replace = None  # private BlockStore copy from save_all
+        self.clear = False   # clear_completed before the updates below
+        self.deletes = set()
+        self.upserts = {}    # block_id -> StudyBlock copy
+
+    def __bool__(self):
+        return self.replace is not None or self.clear or bool(self.deletes) or bool(self.upserts)
+
+    def save_all(self, store):
+        self.replace = store
+        self.clear = False
+        self.deletes.clear()
+        self.upserts.clear()
+
+    def update(self, blocks):
+        for b in blocks:
+            self.upserts[b.block_id] = b
+            self.deletes.discard(b.block_id)
+
+    def delete(self, block_id):
+        self.upserts.pop(block_id, None)
+        self.deletes.add(block_id)
+
+    def clear_completed(self):
+        # earlier updates must not bring completed flags back after the clear
+        for b in self.upserts.values():
+            b.completed = False
+        if self.replace is not None:
+            for b in self.replace:
+                b.completed = False
+        else:
+            self.clear = True
+
+    def absorb(self, newer):
+        """Apply `newer` (changes made after these) on top, in write order."""
+        if newer.replace is not None:
+            self.save_all(newer.replace)
+        if newer.clear:
+            self.clear_completed()
+        for block_id in newer.deletes:
+            self.delete(block_id)
+        self.update(newer.upserts.values())
+
+    def write(self, backend):
+        if self.replace is not None:
+            backend.save_all(self.replace)
+        if self.clear:
+            backend.clear_completed()
+        for block_id in self.deletes:
+            backend.delete_block(block_id)
+        if self.upserts:
+            backend.update_blocks(list(self.upserts.values()))
+
+
+class AutoSaver:
+    def __init__(self, backend, delay=DELAY, max_delay=MAX_DELAY, on_error=None, clock=time.monotonic):
+        self.backend = backend
+        self.delay = delay
+        self.max_delay = max_delay
+        self.clock = clock  # seconds, for the debounce and retry times
+        # callable(exc), run on the autosave thread when a background write starts failing
+        self.on_error = on_error
+        self.error = None  # last failed write, cleared by the next successful one
+        self.failures = 0  # consecutive failed writes
+        self.flushes = 0
+        self._retry_at = 0.0  # clock time before which a failed write is not retried
+        self._pending = _Pending()
+        self._cond = threading.Condition()
+        self._first = self._last = 0.0  # clock times of the first/latest unsaved change
+        self._writing = False
+        self._closed = False
+        self._thread = None
+
+    @property
+    def pending(self):
+        with self._cond:
+            return bool(self._pending) or self._writing
+
+    # backend interface: record and return
+    def save_all(self, blocks):
+        store = BlockStore.wrap(blocks).copy()
+        self._change(lambda p: p.save_all(store))
+
+    def update_blocks(self, blocks):
+        copies = [b.copy() for b in blocks]
+        self._change(lambda p: p.update(copies))
+
+    def update_block(self, block):
+        self.update_blocks([block])
+
+    def delete_block(self, block_id):
+        self._change(lambda p: p.delete(block_id))
+
+    def clear_completed(self):
+        self._change(lambda p: p.clear_completed())
+
+    def _change(self, apply):
+        with self._cond:
+            now = self.clock()
+            if not self._pending:
+                self._first = now
+            self._last = now
+            apply(self._pending)
+            instrument.count("autosave.changes")
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="study-planner-autosave",
+                                                    daemon=True)
+                    self._thread.start()
+                self._cond.notify_all()
+        if closed:
+            self.flush()  # nothing left to write behind: write through
+
+    def flush(self):
+        """Write all pending changes now, on the calling thread. Raises if the write fails."""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            batch = self._take()
+        if batch is not None:
+            self._write(batch, raise_errors=True)
+
+    def close(self):
+        """Flush and stop the background thread. Later changes are written through."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def _take(self):
+        # caller holds the lock
+        if not self._pending:
+            return None
+        batch, self._pending = self._pending, _Pending()
+        self._writing = True
+        return batch
+
+    def _write(self, batch, raise_errors=False):
+        try:
+            with instrument.span("autosave.flush"):
+                batch.write(self.backend)
+        except Exception as e:
+            with self._cond:
+                # keep the changes, with anything newer on top, for the next attempt
+                batch.absorb(self._pending)
+                self._pending = batch
+                self._first = self._last = now = self.clock()
+                self.error = e
+                self.failures += 1
+                self._retry_at = now + min(RETRY_MAX_DELAY, self.delay * 2 ** self.failures)
+                report = self.failures == 1
+            instrument.count("autosave.failures")
+            if raise_errors:
+                raise
+            if report and self.on_error is not None:
+                self.on_error(e)
+        else:
+            with self._cond:
+                self.flushes += 1
+                self.error = None
+                self.failures = 0
+                self._retry_at = 0.0
+            instrument.count("autosave.flushes")
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return  # close() flushes on its own thread
+                # debounce: wait for a quiet period, bounded by max_delay
+                while self._pending and not self._closed:
+                    due = max(min(self._last + self.delay, self._first + self.max_delay), self._retry_at)
+                    wait = due - self.clock()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._closed:
+                    return
+                while self._writing:
+                    self._cond.wait()  # a flush() on another thread got there first
+                batch = self._take()
+            if batch is not None:
+                self._write(batch)
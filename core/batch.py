@@ -0,0 +1,190 @@
+# study_planner/core/batch.py
+"""
+Headless batch scheduling for whole cohorts.
+
+Reads one parameter set per student from a JSONL or CSV file, generates each
+schedule in a process pool and writes a per-student .json or .ics file as soon
+as that student's schedule is done.
+
+Recognised fields (JSONL keys or CSV header names):
+  student_id      optional, defaults to "student-<row number>"
+  chapters        list of titles (JSONL) or "|"-separated string (CSV)
+  exam            ISO datetime, e.g. 2026-06-01T09:00
+  block_minutes, daily_limit, break_minutes, ramp_factor, day_start_hour,
+  random_seed, strategy
+                  optional, same meaning as the SmartScheduler arguments
+  busy            optional weekly rules, e.g. ["Mon-Fri 09:00-17:00"]
+                  (JSONL list or ";"-separated CSV string)
+  busy_ics        optional path of an .ics calendar whose events are busy
+
+Usage:
+  python -m core.batch students.jsonl --out plans/ --format ics --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .busy import BusyCalendar
+from .scheduler import SmartScheduler
+from .storage import save_schedule
+
+FORMATS = ("json", "ics")
+
+_OPTIONAL_INT_FIELDS = ("daily_limit", "break_minutes", "day_start_hour", "random_seed")
+
+
+def read_params(filename):
+    """Yield one parameter dict per student from a .jsonl/.json-lines or .csv file."""
+    path = Path(filename)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                yield {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip()}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def build_scheduler(params):
+    """Create a SmartScheduler from a (possibly string-valued) parameter dict."""
+    chapters = params.get("chapters") or []
+    if isinstance(chapters, str):
+        chapters = [c.strip() for c in chapters.split("|") if c.strip()]
+    if "exam" not in params:
+        raise ValueError("Missing 'exam' datetime.")
+    kwargs = {"chapter_titles": chapters,
+              "exam_datetime": datetime.fromisoformat(str(params["exam"])),
+              "block_minutes": int(params.get("block_minutes", 45))}
+    for key in _OPTIONAL_INT_FIELDS:
+        if params.get(key) not in (None, ""):
+            kwargs[key] = int(params[key])
+    if params.get("ramp_factor") not in (None, ""):
+        kwargs["ramp_factor"] = float(params["ramp_factor"])
+    if params.get("strategy") not in (None, ""):
+        kwargs["strategy"] = params["strategy"]
+    busy = params.get("busy") or []
+    if isinstance(busy, str):
+        busy = [r.strip() for r in busy.split(";") if r.strip()]
+    if busy or params.get("busy_ics"):
+        calendar = BusyCalendar(rules=busy)
+        if params.get("busy_ics"):
+            calendar.import_ics(params["busy_ics"])
+        kwargs["busy"] = calendar
+    return SmartScheduler(**kwargs)
+
+
+def _output_names(student_ids, fmt):
+    """
+    One file name per student. Ids that repeat or sanitize to the same name
+    (e.g. "a b" and "a_b") get -2, -3, ... instead of overwriting each other;
+    names are compared case-insensitively for case-insensitive file systems.
+    """
+    names, taken = [], set()
+    for student_id in student_ids:
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(student_id)).strip("._") or "student"
+        name, n = f"{safe}.{fmt}", 1
+        while name.casefold() in taken:
+            n += 1
+            name = f"{safe}-{n}.{fmt}"
+        taken.add(name.casefold())
+        names.append(name)
+    return names
+
+
+_caches = {}  # cache_dir -> ScheduleCache, one per worker process
+
+
+def _generate(scheduler, cache_dir):
+    if cache_dir is None:
+        return scheduler.generate_schedule()
+    cache = _caches.get(cache_dir)
+    if cache is None:
+        from .schedule_cache import ScheduleCache
+        cache = _caches[cache_dir] = ScheduleCache(disk_dir=cache_dir)
+    return cache.generate(scheduler)
+
+
+def _run_one(job):
+    """Worker: generate and write one student's schedule. Never raises."""
+    student_id, params, target, fmt, cache_dir = job
+    try:
+        blocks = _generate(build_scheduler(params), cache_dir)
+        if fmt == "ics":
+            from .exporter import export_to_ics
+            export_to_ics(blocks, str(target))
+        else:
+            save_schedule(blocks, target)
+        return student_id, str(target), len(blocks), None
+    except Exception as e:
+        return student_id, None, 0, f"{type(e).__name__}: {e}"
+
+
+def run_batch(filename, out_dir, fmt="json", workers=None, chunksize=None, cache_dir=None):
+    """
+    Generate every student's schedule from `filename` into `out_dir`.
+    Returns an iterator of (student_id, output_path, block_count, error) in
+    the order the students finish; error is None on success and output_path
+    is None on failure. Arguments and output names are checked before the
+    pool starts.
+    With cache_dir, plans are memoized on disk (core/schedule_cache.py), so
+    repeated parameter sets, in this run or later ones, are not regenerated.
+    """
+    # checked here, not in the generator below, so bad arguments fail before any work starts
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    rows = [(params.get("student_id") or f"student-{n}", params)
+            for n, params in enumerate(read_params(filename), start=1)]
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    cache_dir = str(cache_dir) if cache_dir is not None else None
+    names = _output_names((student_id for student_id, _ in rows), fmt)
+    jobs = [(student_id, params, str(Path(out_dir) / name), fmt, cache_dir)
+            for (student_id, params), name in zip(rows, names)]
+    return _run_jobs(jobs, workers, chunksize)
+
+
+def _run_jobs(jobs, workers, chunksize):
+    if not jobs:
+        return
+    workers = workers or os.cpu_count() or 1
+    # a few chunks per worker keeps IPC overhead low without starving the pool at the end
+    chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+    if workers == 1:
+        for job in jobs:
+            yield _run_one(job)
+        return
+    from multiprocessing import Pool  # only needed for parallel runs; keeps CLI startup light
+    with Pool(processes=workers) as pool:
+        for result in pool.imap_unordered(_run_one, jobs, chunksize=chunksize):
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.batch",
+                                     description="Generate study schedules for many students in parallel.")
+    parser.add_argument("input", help="JSONL or CSV file with one scheduler parameter set per line/row")
+    parser.add_argument("--out", default="schedules", help="output directory (default: schedules)")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="per-student output format")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="jobs sent to a worker at a time")
+    parser.add_argument("--cache-dir", default=None, help="reuse plans for repeated parameter sets from this directory")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for student_id, path, count, error in run_batch(args.input, args.out, args.format,
+                                                    args.workers, args.chunksize, args.cache_dir):
+        if error:
+            failures += 1
+            print(f"{student_id}: FAILED {error}", file=sys.stderr)
+        else:
+            print(f"{student_id}: {count} blocks -> {path}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+# study_planner/core/binary_schedule.py
+"""
+Compact binary schedule format (.ssb) opened with mmap.
+
+Layout (little-endian):
+  header    magic b"SSCHED\\0\\1", uint32 chapter count, uint32 record count
+  chapters  interned chapter-name table: uint16 byte length + UTF-8 bytes each,
+            padded to a multiple of 8 bytes
+  records   16 bytes per block, four int32 words:
+              start   epoch minutes
+              end     epoch minutes
+              chapter index into the chapter table
+              meta    block_id << 8 | mode code << 1 | completed bit
+
+Records are read in place through a memoryview over the mapping, so opening
+a multi-year plan costs only the chapter table; rows become StudyBlocks only
+when indexed. The completed bit can be flipped without rewriting the file.
+Times are stored at minute resolution. Lookups by id or chapter build a small
+index of record positions on first use; ScheduleView pages a BinarySchedule
+the same way it pages a BlockStore.
+
+Conversion:
+  python -m core.binary_schedule to-binary study_schedule.json archive.ssb
+  python -m core.binary_schedule to-json archive.ssb study_schedule.json
+"""
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from .scheduler import StudyBlock
+
+MAGIC = b"SSCHED\x00\x01"
+HEADER = struct.Struct("<8sII")
+RECORD_WORDS = 4
+RECORD_SIZE = 4 * RECORD_WORDS
+MODES = ("Study", "Revision")
+BINARY_SUFFIXES = (".ssb",)
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+MAX_BLOCK_ID = (1 << 23) - 1  # meta word is a signed int32
+
+
+def _to_minutes(dt):
+    minutes, rest = divmod(dt - EPOCH, MINUTE)
+    if rest:
+        raise ValueError(f"Binary schedules store whole minutes; {dt.isoformat()} has seconds.")
+    return minutes
+
+
+def _ceil_minutes(dt):
+    return -(-(dt - EPOCH) // MINUTE)
+
+
+def _from_minutes(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def write_binary(blocks, filename):
+    """Write start-sorted blocks from any iterable to `filename` in the binary format."""
+    chapters = {}
+    records = array("i")
+    last_start = None
+    for b in blocks:
+        if last_start is not None and b.start_time < last_start:
+            raise ValueError("Blocks must be sorted by start time to write a binary schedule.")
+        last_start = b.start_time
+        if b.mode not in MODES:
+            raise ValueError(f"Binary schedules only store modes {MODES}, not {b.mode!r}.")
+        block_id = b.block_id if b.block_id is not None else len(records) // RECORD_WORDS + 1
+        if not 0 < block_id <= MAX_BLOCK_ID:
+            raise ValueError(f"Block id {block_id} does not fit the binary format.")
+        chapter = chapters.setdefault(b.chapter, len(chapters))
+        records.extend((_to_minutes(b.start_time), _to_minutes(b.end_time), chapter,
+                        block_id << 8 | MODES.index(b.mode) << 1 | int(bool(b.completed))))
+    if sys.byteorder != "little":
+        records.byteswap()
+
+    table = bytearray()
+    for name in chapters:  # dicts keep insertion order == index order
+        raw = name.encode("utf-8")
+        table += struct.pack("<H", len(raw)) + raw
+    table += b"\x00" * (-(HEADER.size + len(table)) % 8)
+
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(chapters), len(records) // RECORD_WORDS))
+        f.write(table)
+        f.write(records.tobytes())
+    return filename
+
+
+class BinarySchedule:
+    """
+    Read-only, start-sorted sequence view over a .ssb file (writable=True also
+    allows set_completed/clear_completed). Use as a context manager or call close().
+    """
+
+    def __init__(self, filename, writable=False):
+        self.filename = filename
+        self._file = open(filename, "r+b" if writable else "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, chapter_count, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a binary study schedule.")
+
+        offset = HEADER.size
+        self.chapter_names = []
+        for _ in range(chapter_count):
+            (length,) = struct.unpack_from("<H", self._map, offset)
+            self.chapter_names.append(bytes(self._map[offset + 2:offset + 2 + length]).decode("utf-8"))
+            offset += 2 + length
+        offset += -offset % 8
+
+        region = memoryview(self._map)[offset:offset + self._count * RECORD_SIZE]
+        if sys.byteorder == "little":
+            self._words = region.cast("i")  # zero-copy
+        else:
+            self._words = array("i", region.tobytes())
+            self._words.byteswap()
+        self._region = region
+        self._region_offset = offset
+        self._positions = None  # block_id -> record index, built by get()
+        self._chapter_rows = None  # chapter -> (record indexes, starts), built by _chapter()
+
+    def close(self):
+        # views into the mapping must be released before it can be closed
+        for view in (getattr(self, "_words", None), getattr(self, "_region", None)):
+            if isinstance(view, memoryview):
+                view.release()
+        self._words = self._region = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._block(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._block(index)
+
+    def __iter__(self):
+        return (self._block(i) for i in range(self._count))
+
+    def _block(self, index):
+        w = RECORD_WORDS * index
+        start, end, chapter, meta = self._words[w:w + RECORD_WORDS]
+        b = StudyBlock(self.chapter_names[chapter], _from_minutes(start), _from_minutes(end),
+                       MODES[meta >> 1 & 0x7F], meta >> 8)
+        b.completed = bool(meta & 1)
+        return b
+
+    def start_minutes(self, index):
+        return self._words[RECORD_WORDS * index]
+
+    def _first_at_or_after(self, minutes):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._words[RECORD_WORDS * mid] < minutes:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def index_at_or_after(self, when):
+        """Binary search on the start column without building any blocks."""
+        return self._first_at_or_after(_ceil_minutes(when))
+
+    def _find(self, block):
+        # records with equal starts are adjacent; scan that run for the id
+        minutes = _ceil_minutes(block.start_time)
+        first = i = self._first_at_or_after(minutes)
+        while i < self._count and self._words[RECORD_WORDS * i] == minutes:
+            if self._words[RECORD_WORDS * i + 3] >> 8 == block.block_id:
+                return i, True
+            i += 1
+        return first, False
+
+    def index_of(self, block):
+        """Record index of `block` (same start and id), or where it would be."""
+        return self._find(block)[0]
+
+    def __contains__(self, block):
+        return getattr(block, "block_id", None) is not None and self._find(block)[1]
+
+    def get(self, block_id, default=None):
+        if self._positions is None:
+            metas = self._words[3::RECORD_WORDS].tolist()
+            self._positions = {meta >> 8: i for i, meta in enumerate(metas)}
+        index = self._positions.get(block_id)
+        return default if index is None else self._block(index)
+
+    def between(self, start=None, end=None):
+        lo = 0 if start is None else self.index_at_or_after(start)
+        hi = self._count if end is None else self.index_at_or_after(end)
+        return [self._block(i) for i in range(lo, hi)]
+
+    def _chapter(self, chapter):
+        """(record indexes, start minutes) of a chapter's records, in order."""
+        if self._chapter_rows is None:
+            rows = {}
+            for i, (c, minutes) in enumerate(zip(self._words[2::RECORD_WORDS].tolist(),
+                                                 self._words[0::RECORD_WORDS].tolist())):
+                indexes, starts = rows.setdefault(self.chapter_names[c], ([], []))
+                indexes.append(i)
+                starts.append(minutes)
+            self._chapter_rows = rows
+        return self._chapter_rows.get(chapter, ((), ()))
+
+    def chapter_span(self, chapter, start=None, end=None):
+        """(lo, hi) positions in the chapter's start order of its blocks with start <= start_time < end."""
+        _, starts = self._chapter(chapter)
+        lo = 0 if start is None else bisect_left(starts, _ceil_minutes(start))
+        hi = len(starts) if end is None else bisect_left(starts, _ceil_minutes(end))
+        return lo, max(lo, hi)
+
+    def chapter_position(self, chapter, block):
+        """Position of `block` in the chapter's start order, or where it would go."""
+        indexes, starts = self._chapter(chapter)
+        minutes = _ceil_minutes(block.start_time)
+        pos = bisect_left(starts, minutes)
+        while (pos < len(starts) and starts[pos] == minutes
+               and self._words[RECORD_WORDS * indexes[pos] + 3] >> 8 < block.block_id):
+            pos += 1
+        return pos
+
+    def chapter_slice(self, chapter, lo, hi):
+        indexes, _ = self._chapter(chapter)
+        return [self._block(i) for i in indexes[lo:hi]]
+
+    def by_chapter(self, chapter, start=None, end=None):
+        """A chapter's blocks with start <= start_time < end, in order; None means unbounded."""
+        return self.chapter_slice(chapter, *self.chapter_span(chapter, start, end))
+
+    def chapters(self):
+        return list(self.chapter_names)
+
+    def _set_bit(self, index, completed):
+        w = RECORD_WORDS * index + 3
+        meta = (self._words[w] & ~1) | int(bool(completed))
+        if isinstance(self._words, memoryview):
+            self._words[w] = meta
+        else:
+            at = self._region_offset + w * 4
+            self._map[at:at + 4] = struct.pack("<i", meta)
+            self._words[w] = meta
+
+    def set_completed(self, index, completed=True):
+        """Flip one record's completed bit in place (file opened with writable=True)."""
+        self._set_bit(index, completed)
+        self._map.flush()
+
+    def clear_completed(self):
+        """Clear every completed bit in place, with one flush."""
+        for i in range(self._count):
+            if self._words[RECORD_WORDS * i + 3] & 1:
+                self._set_bit(i, False)
+        self._map.flush()
+
+
+def is_binary(filename):
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def json_to_binary(src, dst):
+    """Convert a JSON / JSON Lines / SQLite schedule to the binary format."""
+    from .storage import load_schedule
+    return write_binary(load_schedule(src), dst)
+
+
+def binary_to_json(src, dst):
+    """Convert a binary schedule to JSON (or JSON Lines / SQLite, by dst extension)."""
+    from .storage import save_schedule
+    with BinarySchedule(src) as sched:
+        return save_schedule(iter(sched), dst)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.binary_schedule",
+                                     description="Convert schedules to and from the binary .ssb format.")
+    parser.add_argument("direction", choices=("to-binary", "to-json"))
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args(argv)
+    convert = json_to_binary if args.direction == "to-binary" else binary_to_json
+    print(convert(args.src, args.dst))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# study_planner/core/blockstore.py
+"""
+Indexed container for StudyBlocks.
+
+Keeps blocks ordered by start time (bisect over a sorted list of starts), an
+index from chapter to its blocks and a stable integer id per block, so lookups,
+deletes and per-chapter queries don't need a linear scan of the schedule.
+It behaves like a read-only, start-sorted sequence: len(), iteration and
+store[i] work the way they did on the plain list of blocks.
+
+Indexes are parallel lists (start times / ids) rather than tuples, so each
+block costs a few pointers on top of the slotted StudyBlock itself.
+
+Costs: finding a block's position is a bisect (O(log n)), and so are
+lookups by time. Inserting or deleting in the middle of a plain list moves
+the tail of the list, so add()/remove() are O(n) memmoves of pointers.
+This is a fast C-level copy, and appends in start order (generator output,
+bulk loads) are O(1). A balanced tree would make them O(log n) at a few
+times the memory and a slower constant for plans of a few thousand blocks.
+"""
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+
+class _SortedIndex:
+    """Parallel start/id lists ordered by (start_time, block_id); see the module docstring for costs."""
+    __slots__ = ("starts", "ids")
+
+    def __init__(self):
+        self.starts = []
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _position(self, start, block_id):
+        lo = bisect_left(self.starts, start)
+        hi = bisect_right(self.starts, start, lo)
+        # ids are ascending within a run of equal starts
+        return bisect_left(self.ids, block_id, lo, hi)
+
+    def insert(self, start, block_id):
+        if not self.starts or self.starts[-1] < start:
+            pos = len(self.starts)  # generator output arrives in order
+        else:
+            pos = self._position(start, block_id)
+        self.starts.insert(pos, start)
+        self.ids.insert(pos, block_id)
+
+    def delete(self, start, block_id):
+        pos = self._position(start, block_id)
+        del self.starts[pos]
+        del self.ids[pos]
+
+    def index(self, start, block_id):
+        return self._position(start, block_id)
+
+    def first_at_or_after(self, when):
+        return bisect_left(self.starts, when)
+
+
+class BlockStore:
+    __slots__ = ("_blocks", "_order", "_by_chapter", "_next_id")
+
+    def __init__(self, blocks=(), next_id=1):
+        """
+        Index `blocks`, keeping the ids they already have. New ids start at
+        `next_id` (at least), e.g. a store's next_id when rebuilding it, so
+        ids of removed blocks are never handed to different ones.
+        """
+        self._blocks = {}      # block_id -> StudyBlock
+        self._order = _SortedIndex()
+        self._by_chapter = {}  # chapter -> _SortedIndex
+        self._next_id = next_id
+        self._bulk_load(blocks)
+
+    @property
+    def next_id(self):
+        """Id the next block without one will get."""
+        return self._next_id
+
+    @classmethod
+    def wrap(cls, blocks):
+        """Return `blocks` if it already is a BlockStore, else index it in a new one."""
+        return blocks if isinstance(blocks, cls) else cls(blocks)
+
+    def _bulk_load(self, blocks):
+        # assign ids, sort once (already-sorted input is linear) and append
+        blocks = list(blocks)
+        register = self._register
+        for b in blocks:
+            register(b)
+        blocks.sort(key=attrgetter("start_time", "block_id"))
+        order = self._order
+        order.starts = [b.start_time for b in blocks]
+        order.ids = [b.block_id for b in blocks]
+        chapter_index = self._chapter_index
+        for b in blocks:
+            index = chapter_index(b.chapter)
+            index.starts.append(b.start_time)
+            index.ids.append(b.block_id)
+
+    def copy(self):
+        """
+        Deep copy with new block objects (same ids); the sorted indexes are
+        copied list by list instead of being rebuilt.
+        """
+        clone = BlockStore()
+        clone._next_id = self._next_id
+        clone._blocks = {block_id: b.copy() for block_id, b in self._blocks.items()}
+        clone._order.starts = list(self._order.starts)
+        clone._order.ids = list(self._order.ids)
+        for chapter, index in self._by_chapter.items():
+            copied = clone._by_chapter[chapter] = _SortedIndex()
+            copied.starts = list(index.starts)
+            copied.ids = list(index.ids)
+        return clone
+
+    def _register(self, block):
+        if block.block_id is None or block.block_id in self._blocks:
+            block.block_id = self._next_id
+        self._next_id = max(self._next_id, block.block_id + 1)
+        self._blocks[block.block_id] = block
+
+    # sequence protocol (start-time order)
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        blocks = self._blocks
+        return (blocks[block_id] for block_id in self._order.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._blocks[block_id] for block_id in self._order.ids[index]]
+        return self._blocks[self._order.ids[index]]
+
+    def __contains__(self, block):
+        return self._blocks.get(getattr(block, "block_id", None)) is block
+
+    def __bool__(self):
+        return bool(self._blocks)
+
+    # mutation
+    def add(self, block):
+        """Index a block, assigning a fresh id unless it brings an unused one."""
+        self._register(block)
+        self._order.insert(block.start_time, block.block_id)
+        self._chapter_index(block.chapter).insert(block.start_time, block.block_id)
+        return block.block_id
+
+    def extend(self, blocks):
+        for b in blocks:
+            self.add(b)
+
+    def remove(self, block_or_id):
+        """Remove a block by object or id and return it."""
+        block = self._blocks.pop(getattr(block_or_id, "block_id", block_or_id))
+        self._order.delete(block.start_time, block.block_id)
+        self._drop_from_chapter(block)
+        return block
+
+    def relabel(self, block, chapter, mode):
+        """Change a stored block's chapter/mode and keep the chapter index in sync."""
+        if chapter != block.chapter:
+            self._drop_from_chapter(block)
+            self._chapter_index(chapter).insert(block.start_time, block.block_id)
+        block.chapter = chapter
+        block.mode = mode
+
+    def _chapter_index(self, chapter):
+        index = self._by_chapter.get(chapter)
+        if index is None:
+            index = self._by_chapter[chapter] = _SortedIndex()
+        return index
+
+    def _drop_from_chapter(self, block):
+        index = self._by_chapter[block.chapter]
+        index.delete(block.start_time, block.block_id)
+        if not index:
+            del self._by_chapter[block.chapter]
+
+    # lookups
+    def get(self, block_id, default=None):
+        return self._blocks.get(block_id, default)
+
+    def index_at_or_after(self, when):
+        """Position of the first block starting at/after `when`."""
+        return self._order.first_at_or_after(when)
+
+    def index_of(self, block):
+        return self._order.index(block.start_time, block.block_id)
+
+    def between(self, start=None, end=None):
+        """Blocks with start <= start_time < end, in order; None means unbounded."""
+        lo = 0 if start is None else self._order.first_at_or_after(start)
+        hi = len(self._order) if end is None else self._order.first_at_or_after(end)
+        return [self._blocks[block_id] for block_id in self._order.ids[lo:hi]]
+
+    def chapter_span(self, chapter, start=None, end=None):
+        """(lo, hi) positions in the chapter's start order of its blocks with start <= start_time < end."""
+        index = self._by_chapter.get(chapter)
+        if index is None:
+            return 0, 0
+        lo = 0 if start is None else index.first_at_or_after(start)
+        hi = len(index) if end is None else index.first_at_or_after(end)
+        return lo, max(lo, hi)
+
+    def chapter_position(self, chapter, block):
+        """Position of `block` in the chapter's start order, or where it would go."""
+        index = self._by_chapter.get(chapter)
+        return 0 if index is None else index.index(block.start_time, block.block_id)
+
+    def chapter_slice(self, chapter, lo, hi):
+        index = self._by_chapter.get(chapter)
+        if index is None:
+            return []
+        return [self._blocks[block_id] for block_id in index.ids[lo:hi]]
+
+    def by_chapter(self, chapter, start=None, end=None):
+        """A chapter's blocks with start <= start_time < end, in start order; None means unbounded."""
+        return self.chapter_slice(chapter, *self.chapter_span(chapter, start, end))
+
+    def chapters(self):
+        return list(self._by_chapter)
@@ -0,0 +1,224 @@
+# study_planner/core/busy.py
+"""
+Busy time the scheduler must plan around.
+
+A BusyCalendar collects three kinds of blocked time:
+
+  - weekly rules, e.g. "Mon-Fri 09:00-17:00" or "daily 23:00-07:00"
+    (an end before the start runs past midnight);
+  - explicit (start, end) ranges;
+  - events imported from an .ics file (core/ics_import.py), including
+    DAILY/WEEKLY recurrences.
+
+BusyCalendar.index(window_start, window_end) expands everything inside the
+window into a BusyIndex: the intervals sorted and merged into two parallel
+lists of starts and ends. Merged intervals are disjoint, so both lists are
+sorted and any query is a bisect: overlaps() is O(log n) and next_free()
+is O(log n) plus one step per busy interval it has to jump over.
+"""
+import hashlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from . import ics_import
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_GROUPS = {
+    "daily": range(7),
+    "weekdays": range(5),
+    "weekends": range(5, 7),
+}
+
+
+def _day(name):
+    key = name.strip().lower()[:3]
+    if key not in DAY_NAMES:
+        raise ValueError(f"Unknown weekday {name!r}.")
+    return DAY_NAMES.index(key)
+
+
+def _clock(text):
+    hours, _, minutes = text.strip().partition(":")
+    value = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"Bad time of day {text!r}.")
+    return value  # minutes after midnight; 24:00 is allowed as an end
+
+
+class WeeklyRule:
+    """Busy every week on `weekdays` (0 = Monday) from start_minute to end_minute after midnight."""
+
+    __slots__ = ("weekdays", "start_minute", "end_minute")
+
+    def __init__(self, weekdays, start_minute, end_minute):
+        self.weekdays = frozenset(weekdays)
+        self.start_minute = int(start_minute)
+        self.end_minute = int(end_minute)
+        if self.start_minute == self.end_minute:
+            raise ValueError("A busy rule must not start and end at the same time.")
+
+    @classmethod
+    def parse(cls, text):
+        """
+        "<days> HH:MM-HH:MM", where days is daily, weekdays, weekends or a
+        comma list of day names and ranges ("Mon,Wed-Fri").
+        """
+        try:
+            days_part, times_part = text.strip().rsplit(None, 1)
+            start, end = times_part.split("-")
+        except ValueError:
+            raise ValueError(f"Bad busy rule {text!r}; expected e.g. 'Mon-Fri 09:00-17:00'.") from None
+        weekdays = set()
+        for item in days_part.replace(" ", "").split(","):
+            if item.lower() in DAY_GROUPS:
+                weekdays.update(DAY_GROUPS[item.lower()])
+            elif "-" in item:
+                first, last = (_day(d) for d in item.split("-", 1))
+                weekdays.update((first + i) % 7 for i in range((last - first) % 7 + 1))
+            else:
+                weekdays.add(_day(item))
+        return cls(weekdays, _clock(start), _clock(end))
+
+    def __str__(self):
+        days = ",".join(DAY_NAMES[d].title() for d in sorted(self.weekdays))
+        return f"{days} {self._fmt(self.start_minute)}-{self._fmt(self.end_minute)}"
+
+    @staticmethod
+    def _fmt(minute):
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+    def expand(self, first_day, last_day):
+        """Yield (start, end) for every day in first_day..last_day the rule applies to."""
+        length = (self.end_minute - self.start_minute) % (24 * 60) or 24 * 60
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in self.weekdays:
+                start = datetime.combine(day, time(0, 0)) + timedelta(minutes=self.start_minute)
+                yield start, start + timedelta(minutes=length)
+            day += timedelta(days=1)
+
+
+class BusyCalendar:
+    """Weekly rules, explicit ranges and imported .ics events; see module docstring."""
+
+    def __init__(self, rules=(), ranges=(), events=()):
+        self.rules = []
+        self.ranges = []
+        self.events = list(events)
+        self.version = 0  # bumped on every change, so schedulers can memoize index()
+        for rule in rules:
+            self.add_rule(rule)
+        for start, end in ranges:
+            self.add_range(start, end)
+
+    @classmethod
+    def wrap(cls, busy):
+        """
+        None, a BusyCalendar (returned as is) or an iterable whose items are
+        rule strings, WeeklyRules or (start, end) pairs.
+        """
+        if busy is None or isinstance(busy, cls):
+            return busy
+        calendar = cls()
+        for item in busy:
+            if isinstance(item, (str, WeeklyRule)):
+                calendar.add_rule(item)
+            else:
+                calendar.add_range(*item)
+        return calendar
+
+    def add_rule(self, rule):
+        self.rules.append(rule if isinstance(rule, WeeklyRule) else WeeklyRule.parse(rule))
+        self.version += 1
+
+    def add_range(self, start, end):
+        if isinstance(start, str):
+            start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        if end <= start:
+            raise ValueError(f"Busy range ends before it starts: {start} - {end}.")
+        self.ranges.append((start, end))
+        self.version += 1
+
+    def import_ics(self, filename):
+        """Add every busy event of an .ics file; returns how many were read."""
+        events = ics_import.read_events(filename)
+        self.events.extend(events)
+        self.version += 1
+        return len(events)
+
+    def __len__(self):
+        return len(self.rules) + len(self.ranges) + len(self.events)
+
+    def __eq__(self, other):
+        # imported events compare by identity: the same import is the same busy time
+        if not isinstance(other, BusyCalendar):
+            return NotImplemented
+        return ([str(r) for r in self.rules] == [str(r) for r in other.rules]
+                and self.ranges == other.ranges
+                and len(self.events) == len(other.events)
+                and all(a is b for a, b in zip(self.events, other.events)))
+
+    __hash__ = None
+
+    def index(self, window_start, window_end):
+        """BusyIndex of everything overlapping [window_start, window_end)."""
+        intervals = [(s, e) for s, e in self.ranges if e > window_start and s < window_end]
+        # start a day early so rules running past midnight into the window are included
+        first_day = window_start.date() - timedelta(days=1)
+        for rule in self.rules:
+            intervals.extend(rule.expand(first_day, window_end.date()))
+        for event in self.events:
+            intervals.extend(event.occurrences(window_start, window_end))
+        return BusyIndex(intervals)
+
+
+class BusyIndex:
+    """Sorted, merged busy intervals with bisect queries (half-open: [start, end))."""
+
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                # overlapping or touching the previous interval: extend it
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+        self._fingerprint = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def overlaps(self, start, end):
+        """True if [start, end) intersects busy time."""
+        i = bisect_right(self.ends, start)  # first interval ending after start
+        return i < len(self.starts) and self.starts[i] < end
+
+    def next_free(self, t, length):
+        """Earliest time >= t at which [time, time + length) is free."""
+        i = bisect_right(self.ends, t)
+        while i < len(self.starts) and self.starts[i] < t + length:
+            t = max(t, self.ends[i])
+            i += 1
+        return t
+
+    def next_busy(self, t):
+        """Start of the first busy interval at or after t (None if there is none)."""
+        i = bisect_left(self.starts, t)
+        return self.starts[i] if i < len(self.starts) else None
+
+    def fingerprint(self):
+        """Stable hash of the merged intervals (for cache keys)."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for start, end in self:
+                digest.update(f"{start.isoformat()}/{end.isoformat()};".encode("ascii"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
@@ -0,0 +1,162 @@
+# study_planner/core/chapter_meta.py
+"""
+Chapter metadata: (difficulty, length) scores, 1-5 each.
+
+estimate() scores a whole title list in one pass, splitting each title once
+for both heuristics. The seed only picks a small per-title tweak through a
+stable hash, so the same title and seed always get the same scores.
+
+ChapterMetaStore keeps those scores in SQLite, keyed by (seed, title). A
+scheduler built over a syllabus seen before reads them with one query and
+estimates only titles it has not seen. The store also records how long
+completed blocks actually took, keyed by normalize_title() so "Algebra" and
+"algebra " share a history. A chapter that keeps taking longer than planned
+becomes harder, one that goes faster becomes easier. The adjustment grows
+with the evidence (see learned_difficulty). The scores feed the study order
+(hardest first) and the spaced revision intervals.
+"""
+import math
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+from . import instrument
+
+DEFAULT_META_DB = Path("chapter_meta.db")
+
+TWEAKS = (0, 0, 1, -1)
+PRIOR_COMPLETIONS = 2  # evidence needed before the learned adjustment reaches half its full size
+LEARN_SCALE = 2.0      # difficulty steps per doubling of the time actually spent
+QUERY_BATCH = 500      # titles per IN (...) query, below SQLite's bound-parameter limit
+
+
+def normalize_title(title):
+    return " ".join(title.split()).casefold()
+
+
+def _salts(seed):
+    return tuple(zlib.crc32(f"{seed}|{kind}|".encode("utf-8")) for kind in ("difficulty", "length"))
+
+
+def _clamp(value):
+    return max(1, min(5, value))
+
+
+def estimate(titles, seed=None):
+    """[(difficulty, length)] for `titles`, in order, from the title heuristics."""
+    difficulty_salt, length_salt = _salts(seed)
+    scores = []
+    for title in titles:
+        raw = title.encode("utf-8")
+        words = len(title.split())
+        # longer titles and more words -> slightly higher difficulty; more words -> longer chapter
+        difficulty = 1 + min(4, len(title) // 15 + words // 6) + TWEAKS[zlib.crc32(raw, difficulty_salt) % 4]
+        length = 1 + min(4, words // 4) + TWEAKS[zlib.crc32(raw, length_salt) % 4]
+        scores.append((_clamp(difficulty), _clamp(length)))
+    instrument.count("chapter_meta.estimated", len(scores))
+    return scores
+
+
+def learned_difficulty(difficulty, completions, planned_minutes, actual_minutes):
+    """
+    Shift a heuristic difficulty by how much longer (or shorter) completed
+    blocks took than planned: LEARN_SCALE steps per doubling, weighted by
+    completions / (completions + PRIOR_COMPLETIONS).
+    """
+    if completions <= 0 or planned_minutes <= 0 or actual_minutes <= 0:
+        return difficulty
+    confidence = completions / (completions + PRIOR_COMPLETIONS)
+    shift = LEARN_SCALE * math.log2(actual_minutes / planned_minutes) * confidence
+    return _clamp(round(difficulty + shift))
+
+
+class ChapterMetaStore:
+    """SQLite cache of heuristic scores plus completion history; safe to share across threads."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS heuristics (
+            seed TEXT NOT NULL,
+            title TEXT NOT NULL,
+            difficulty INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            PRIMARY KEY (seed, title)
+        );
+        CREATE TABLE IF NOT EXISTS completions (
+            title TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            planned_minutes REAL NOT NULL,
+            actual_minutes REAL NOT NULL
+        );
+    """
+
+    def __init__(self, filename=None):
+        self.filename = Path(filename or DEFAULT_META_DB)
+        self.conn = sqlite3.connect(str(self.filename), check_same_thread=False)
+        self._lock = threading.RLock()
+        self._heuristics = {}  # seed key -> {title: (difficulty, length)}, filled per seed
+        with self._lock:
+            self.conn.executescript(self.SCHEMA)
+
+    def _seed_scores(self, seed_key):
+        scores = self._heuristics.get(seed_key)
+        if scores is None:
+            rows = self.conn.execute("SELECT title, difficulty, length FROM heuristics WHERE seed = ?", (seed_key,))
+            scores = self._heuristics[seed_key] = {title: (d, l) for title, d, l in rows}
+        return scores
+
+    def meta(self, titles, seed=None):
+        """
+        [(title, difficulty, length)] for `titles`: stored heuristic scores
+        (titles not seen with this seed are estimated in one batch and
+        stored), with difficulty refined from the completion history.
+        """
+        titles = list(titles)
+        seed_key = str(seed)
+        with instrument.span("chapter_meta.lookup"), self._lock:
+            scores = self._seed_scores(seed_key)
+            missing = list(dict.fromkeys(t for t in titles if t not in scores))
+            if missing:
+                fresh = estimate(missing, seed)
+                scores.update(zip(missing, fresh))
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO heuristics VALUES (?, ?, ?, ?)",
+                                          ((seed_key, t, d, l) for t, (d, l) in zip(missing, fresh)))
+            history = self.history(titles)
+        instrument.count("chapter_meta.cached", len(titles) - len(missing))
+        meta = []
+        for title in titles:
+            difficulty, length = scores[title]
+            norm = normalize_title(title)
+            if norm in history:
+                difficulty = learned_difficulty(difficulty, *history[norm])
+            meta.append((title, difficulty, length))
+        return meta
+
+    def history(self, titles):
+        """{normalized title: (completions, planned minutes, actual minutes)} for those with a record."""
+        wanted = list(dict.fromkeys(normalize_title(t) for t in titles))
+        history = {}
+        with self._lock:
+            for i in range(0, len(wanted), QUERY_BATCH):
+                batch = wanted[i:i + QUERY_BATCH]
+                rows = self.conn.execute(
+                    "SELECT title, count, planned_minutes, actual_minutes FROM completions "
+                    f"WHERE title IN ({', '.join('?' * len(batch))})", batch)
+                history.update((title, (n, planned, actual)) for title, n, planned, actual in rows)
+        return history
+
+    def record_completion(self, title, planned_minutes, actual_minutes):
+        """Add one completed block of `title` that was planned for / actually took these minutes."""
+        if planned_minutes <= 0 or actual_minutes <= 0:
+            raise ValueError("Planned and actual minutes must be positive.")
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO completions VALUES (?, 1, ?, ?) ON CONFLICT(title) DO UPDATE SET "
+                "count = count + 1, planned_minutes = planned_minutes + excluded.planned_minutes, "
+                "actual_minutes = actual_minutes + excluded.actual_minutes",
+                (normalize_title(title), float(planned_minutes), float(actual_minutes)))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,266 @@
+# study_planner/core/cli.py
+"""
+Headless command line for the study planner.
+
+Runs the same generate/load/save/export operations as the GUI without
+importing tkinter, so it works on servers and machines without a display.
+Only the modules a command needs are imported, after its arguments have
+been parsed.
+
+Usage:
+  python Study_Scheduler.py generate --chapters "Algebra|Geometry" --exam 2026-06-01T09:00 -o plan.json
+  python Study_Scheduler.py load plan.json --chapter Algebra --from 2026-05-01
+  python Study_Scheduler.py save plan.json plan.db
+  python Study_Scheduler.py export plan.db plan.ics --split-by month
+  python Study_Scheduler.py merge maths.db physics.jsonl -o all.ics --policy shift
+  python Study_Scheduler.py batch students.jsonl --out plans --format ics
+  python Study_Scheduler.py serve --port 8765 --workers 2
+
+--profile FILE (before the command) times each phase and writes the result:
+FILE.prof is a cProfile dump, FILE.speedscope.json a speedscope profile and
+anything else a JSON summary of spans and counters (see core/instrument.py).
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from . import instrument
+
+
+def _add_generate(sub):
+    p = sub.add_parser("generate", help="generate a new schedule")
+    chapters = p.add_mutually_exclusive_group(required=True)
+    chapters.add_argument("--chapters", help='"|"-separated chapter titles')
+    chapters.add_argument("--chapters-file", help="text file with one chapter title per line")
+    p.add_argument("--exam", required=True, help="exam date and time, e.g. 2026-06-01T09:00")
+    p.add_argument("--block-minutes", type=int, default=45)
+    p.add_argument("--daily-limit", type=int, default=4)
+    p.add_argument("--break-minutes", type=int, default=10)
+    p.add_argument("--ramp-factor", type=float, default=0.5)
+    p.add_argument("--day-start-hour", type=int, default=9)
+    p.add_argument("--seed", type=int, default=None, help="random seed for reproducible plans")
+    p.add_argument("--engine", choices=("auto", "python", "numpy"), default="auto", help="slot engine")
+    p.add_argument("--strategy", choices=("round_robin", "spaced"), default="round_robin",
+                   help="how revision slots are filled (default: round_robin)")
+    p.add_argument("--busy", action="append", default=[], metavar="RULE",
+                   help='weekly busy time, e.g. "Mon-Fri 09:00-17:00" (repeatable)')
+    p.add_argument("--busy-ics", action="append", default=[], metavar="FILE",
+                   help="block the events of an .ics calendar (repeatable)")
+    p.add_argument("--cache-dir", default=None, help="reuse the plan for identical inputs from this directory")
+    p.add_argument("--meta-db", default=None, metavar="FILE",
+                   help="chapter score cache with difficulty learned from completions (see core/chapter_meta.py)")
+    p.add_argument("-o", "--out", default=None,
+                   help="output file; .ics exports a calendar, other suffixes pick the storage format "
+                        "(default: study_schedule.json)")
+    p.set_defaults(func=cmd_generate)
+
+
+def _add_load(sub):
+    p = sub.add_parser("load", help="print the blocks stored in a schedule file")
+    p.add_argument("input")
+    p.add_argument("--chapter", default=None)
+    p.add_argument("--from", dest="start", default=None, help="first day, YYYY-MM-DD")
+    p.add_argument("--to", dest="end", default=None, help="last day (inclusive), YYYY-MM-DD")
+    p.add_argument("--summary", action="store_true", help="only print counts")
+    p.set_defaults(func=cmd_load)
+
+
+def _add_save(sub):
+    p = sub.add_parser("save", help="copy a schedule into another storage format")
+    p.add_argument("input")
+    p.add_argument("output", help=".json, .jsonl, .db or .ssb")
+    p.set_defaults(func=cmd_save)
+
+
+def _add_export(sub):
+    p = sub.add_parser("export", help="export a schedule to iCalendar")
+    p.add_argument("input")
+    p.add_argument("output", nargs="?", default="study_schedule.ics")
+    p.add_argument("--split-by", choices=("month", "chapter"), default=None)
+    p.add_argument("--incremental", action="store_true", help="only write changes since the last export")
+    p.set_defaults(func=cmd_export)
+
+
+def _add_merge(sub):
+    p = sub.add_parser("merge", help="merge schedules (e.g. one per course) into one timeline")
+    p.add_argument("inputs", nargs="+", help="schedule files, highest priority first")
+    p.add_argument("-o", "--out", required=True, help=".ics exports a calendar, other suffixes a schedule file")
+    p.add_argument("--policy", choices=("keep", "drop", "shift"), default="keep",
+                   help="what to do with overlapping blocks: keep and report (default), drop or shift "
+                        "the block from the lower-priority file")
+    p.add_argument("--gap", type=int, default=0, help="minutes between a block and one shifted after it")
+    p.add_argument("--max-shift", type=int, default=None,
+                   help="drop instead of shifting a block by more than this many minutes")
+    p.add_argument("--no-labels", action="store_true", help='keep chapter names as they are (no "<file>: " prefix)')
+    p.add_argument("--list-conflicts", action="store_true", help="print every conflict")
+    p.set_defaults(func=cmd_merge)
+
+
+def _add_serve(sub):
+    p = sub.add_parser("serve", help="run the local HTTP/JSON service (see core/service.py)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=None, help="generation processes (default: CPU count)")
+    p.add_argument("--max-pending", type=int, default=None,
+                   help="requests admitted at once before answering 503 (default: 4 per worker)")
+    p.add_argument("--root", default=".", help="directory request paths are resolved in")
+    p.add_argument("--cache-dir", default=None, help="reuse plans for identical inputs from this directory")
+    p.set_defaults(func=cmd_serve)
+
+
+def _add_batch(sub):
+    p = sub.add_parser("batch", help="generate schedules for many students (see core/batch.py)", add_help=False)
+    p.add_argument("args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_batch)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="Study_Scheduler.py",
+                                     description="Study planner without the GUI. Run without arguments for the GUI.")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="record phase timings and write them to FILE (.json, .speedscope.json or .prof)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for add in (_add_generate, _add_load, _add_save, _add_export, _add_merge, _add_serve, _add_batch):
+        add(sub)
+    return parser
+
+
+def _write(blocks, out):
+    if str(out).lower().endswith(".ics"):
+        from .exporter import export_to_ics
+        return export_to_ics(blocks, str(out))
+    from .storage import save_schedule
+    return save_schedule(blocks, out)
+
+
+def cmd_generate(args):
+    from .scheduler import SmartScheduler
+    from .storage import DEFAULT_SAVE
+    if args.chapters_file:
+        with open(args.chapters_file, "r", encoding="utf-8") as f:
+            chapters = [ln.strip() for ln in f if ln.strip()]
+    else:
+        chapters = [c.strip() for c in args.chapters.split("|") if c.strip()]
+    busy = None
+    if args.busy or args.busy_ics:
+        from .busy import BusyCalendar
+        busy = BusyCalendar(rules=args.busy)
+        for filename in args.busy_ics:
+            busy.import_ics(filename)
+    meta_store = None
+    if args.meta_db:
+        from .chapter_meta import ChapterMetaStore
+        meta_store = ChapterMetaStore(args.meta_db)
+    scheduler = SmartScheduler(chapter_titles=chapters,
+                               block_minutes=args.block_minutes,
+                               exam_datetime=datetime.fromisoformat(args.exam),
+                               daily_limit=args.daily_limit,
+                               break_minutes=args.break_minutes,
+                               ramp_factor=args.ramp_factor,
+                               day_start_hour=args.day_start_hour,
+                               random_seed=args.seed,
+                               engine=args.engine,
+                               strategy=args.strategy,
+                               busy=busy,
+                               meta_store=meta_store)
+    if meta_store is not None:
+        meta_store.close()
+    if args.cache_dir:
+        from .schedule_cache import ScheduleCache
+        blocks = ScheduleCache(disk_dir=args.cache_dir).generate(scheduler)
+    else:
+        blocks = scheduler.generate_schedule()
+    out = _write(blocks, args.out or DEFAULT_SAVE)
+    print(f"Generated {len(blocks)} blocks -> {out}")
+    return 0
+
+
+def cmd_load(args):
+    from .storage import iter_schedule
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) + timedelta(days=1) if args.end else None
+    count = done = 0
+    for b in iter_schedule(args.input, start=start, end=end, chapter=args.chapter):
+        count += 1
+        done += bool(b.completed)
+        if not args.summary:
+            mark = "\tdone" if b.completed else ""
+            print(f"{b.start_time:%Y-%m-%d %H:%M}-{b.end_time:%H:%M}\t{b.mode}\t{b.chapter}{mark}")
+    print(f"{count} blocks, {done} completed")
+    return 0
+
+
+def cmd_save(args):
+    from .storage import iter_schedule, save_schedule
+    from .blockstore import BlockStore
+    # BlockStore sorts by start time, which the binary writer requires
+    save_schedule(BlockStore(iter_schedule(args.input)), args.output)
+    print(f"Saved {args.input} -> {args.output}")
+    return 0
+
+
+def cmd_export(args):
+    from .exporter import export_to_ics
+    from .storage import iter_schedule
+    written = export_to_ics(iter_schedule(args.input), args.output,
+                            split_by=args.split_by, incremental=args.incremental)
+    for name in written if args.split_by else [written]:
+        print(f"Exported -> {name}")
+    return 0
+
+
+def cmd_merge(args):
+    from .merge import merge_schedules
+    options = dict(policy=args.policy, gap=timedelta(minutes=args.gap),
+                   max_shift=timedelta(minutes=args.max_shift) if args.max_shift is not None else None)
+    if args.no_labels:
+        options["labels"] = None
+    timeline = merge_schedules(args.inputs, **options)
+    # streamed: one block per input file is in memory at a time (except for .db/.json outputs)
+    out = _write(timeline, args.out)
+    if args.list_conflicts:
+        for c in timeline.conflicts:
+            print(f"{c.action}\t{c.original_start:%Y-%m-%d %H:%M}\t{c.block.chapter}\t"
+                  f"vs {c.against.chapter} {c.against.start_time:%Y-%m-%d %H:%M}")
+    print(f"Merged {len(args.inputs)} schedules: {timeline.merged} blocks, {len(timeline.conflicts)} conflicts -> {out}")
+    return 0
+
+
+def cmd_serve(args):
+    from .service import serve
+    return serve(args.host, args.port, args.workers, args.max_pending, args.root, args.cache_dir)
+
+
+def cmd_batch(args):
+    from .batch import main as batch_main
+    return batch_main(args.args)
+
+
+def _run(args):
+    try:
+        return args.func(args)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profile = args.profile or instrument.output_path()
+    if profile:
+        instrument.enable()
+    if profile and profile.endswith(".prof"):
+        with instrument.profile_to(profile):
+            status = _run(args)
+    else:
+        status = _run(args)
+        if profile:
+            instrument.export(profile)
+    line = instrument.status_line() if instrument.enabled() else ""
+    if line:
+        print(f"profile: {line}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,265 @@
 # study_planner/core/exporter.py
-from ics import Calendar, Event
+"""
+Streaming iCalendar (RFC 5545) export.
 
-def export_to_ics(blocks, filename="study_schedule.ics"):
+VEVENTs are written straight to the file handle one block at a time, so no
+calendar object is built in memory. Every event gets a stable UID derived
+from the block (its id, else chapter/start/mode) and a SEQUENCE number.
+Block ids restart at 1 in every plan, so UIDs also carry a per-plan
+namespace (see plan_namespace). Without one, two imported plans would
+overwrite each other's events in a calendar client.
+
+With a state file the exporter remembers what it wrote last time; in
+incremental mode only blocks that were added or changed since then, plus
+STATUS:CANCELLED events for blocks that disappeared, are written, so
+calendar clients only re-sync the delta.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import instrument
+from .progress import tracked
+
+PRODID = "-//Study Scheduler//Study Planner//EN"
+SPLIT_MODES = (None, "month", "chapter")
+MAX_OPEN_FILES = 32  # when splitting by chapter
+
+
+def export_to_ics(blocks, filename="study_schedule.ics", split_by=None, incremental=False, state_file=None,
+                  progress=None, cancel=None, namespace=None):
+    """
+    Export StudyBlocks (any iterable) to an .ics calendar file.
+
+    split_by     None, "month" or "chapter": write one file per month/chapter,
+                 named <stem>-<key><suffix> next to `filename`.
+    incremental  only write blocks added/changed since the last export and
+                 cancellations for removed ones (needs the state file).
+    state_file   JSON file with the UIDs/SEQUENCEs of the last export;
+                 defaults to <filename>.state.json when incremental is set.
+    progress/cancel  optional hooks, see core/progress.py. Files are written
+                 under temporary names and only replace existing calendars
+                 when the export completes.
+    namespace    per-plan part of the event UIDs; defaults to one derived
+                 from the resolved `filename`, so re-exports to the same file
+                 keep their UIDs.
+
+    Returns `filename`, or the list of written files when split_by is set.
+    """
+    if split_by not in SPLIT_MODES:
+        raise ValueError(f"Unknown split mode {split_by!r}; expected month or chapter.")
+    if incremental and state_file is None:
+        state_file = str(filename) + ".state.json"
+    if namespace is None:
+        namespace = plan_namespace(Path(filename).resolve())
+    with instrument.span("export.ics"):
+        return _export(blocks, filename, split_by, incremental, state_file, progress, cancel, namespace)
+
+
+def iter_ics(blocks, namespace):
     """
-    Export list of StudyBlock objects to an .ics calendar file.
+    Yield one calendar as text pieces instead of writing a file, e.g. to
+    stream it over HTTP. No state file: every event has SEQUENCE 0.
     """
-    cal = Calendar()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield _CalendarWriter.HEADER
     for b in blocks:
-        e = Event()
-        e.name = f"{b.mode}: {b.chapter}"
-        e.begin = b.start_time
-        e.end = b.end_time
-        status = "Completed" if getattr(b, "completed", False) else "Pending"
-        e.description = f"{b.mode} session for {b.chapter}\nStatus: {status}"
-        cal.events.add(e)
-
-    with open(filename, "w", encoding="utf-8") as f:
-        f.writelines(cal)
-    return filename
+        yield _vevent(b, block_uid(b, namespace), 0, stamp)
+    yield _CalendarWriter.FOOTER
+
+
+def _export(blocks, filename, split_by, incremental, state_file, progress, cancel, namespace):
+    previous = _load_state(state_file)
+    state = {}
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    written_events = 0
+
+    with _CalendarWriter(filename, split_by) as out:
+        for b in tracked(blocks, progress, cancel, "Exporting"):
+            uid = block_uid(b, namespace)
+            fingerprint = _fingerprint(b)
+            seq, old = 0, previous.get(uid)
+            if old is not None:
+                seq = old["seq"] if old["hash"] == fingerprint else old["seq"] + 1
+            state[uid] = {"seq": seq, "hash": fingerprint, "chapter": b.chapter,
+                          "start": b.start_time.isoformat(), "end": b.end_time.isoformat()}
+            if incremental and old is not None and old["hash"] == fingerprint:
+                continue
+            out.write(_split_key(split_by, b.chapter, b.start_time), _vevent(b, uid, seq, stamp))
+            written_events += 1
+
+        if incremental:
+            for uid, old in previous.items():
+                if uid not in state:
+                    start = datetime.fromisoformat(old["start"])
+                    out.write(_split_key(split_by, old["chapter"], start),
+                              _cancelled_vevent(uid, old, stamp))
+        written = out.filenames
+
+    if state_file is not None:
+        with instrument.span("export.ics.state"), open(state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    instrument.count("export.events", written_events)
+    return written if split_by else filename
+
+
+def plan_namespace(*parts):
+    """Short stable hash of whatever identifies a plan (source file, chapters, exam, seed, ...)."""
+    key = "|".join(str(part) for part in parts)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def block_uid(block, namespace=""):
+    """Stable UID for a block within a plan: its store id if it has one, else chapter/start/mode."""
+    suffix = f"-{namespace}" if namespace else ""
+    if getattr(block, "block_id", None) is not None:
+        return f"block-{block.block_id}{suffix}@study-scheduler"
+    key = f"{block.chapter}|{block.start_time.isoformat()}|{block.mode}{suffix}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + "@study-scheduler"
+
+
+def _fingerprint(block):
+    key = (f"{block.chapter}|{block.mode}|{block.start_time.isoformat()}|"
+           f"{block.end_time.isoformat()}|{bool(getattr(block, 'completed', False))}")
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _load_state(state_file):
+    if state_file is None or not Path(state_file).exists():
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _split_key(split_by, chapter, start):
+    if split_by == "month":
+        return start.strftime("%Y-%m")
+    if split_by == "chapter":
+        return re.sub(r"[^A-Za-z0-9_-]+", "_", chapter).strip("_") or "chapter"
+    return None
+
+
+def _escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line):
+    """Fold a content line to 75 octets per RFC 5545 section 3.1."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, limit = [], 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _dt(value):
+    # naive datetimes are local wall-clock times: write them as floating times
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _vevent(b, uid, seq, stamp):
+    status = "Completed" if getattr(b, "completed", False) else "Pending"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"SEQUENCE:{seq}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_dt(b.start_time)}",
+        f"DTEND:{_dt(b.end_time)}",
+        f"SUMMARY:{_escape(f'{b.mode}: {b.chapter}')}",
+        f"DESCRIPTION:{_escape(f'{b.mode} session for {b.chapter}' + chr(10) + f'Status: {status}')}",
+        "STATUS:CONFIRMED",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+def _cancelled_vevent(uid, old, stamp):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"SEQUENCE:{old['seq'] + 1}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_dt(datetime.fromisoformat(old['start']))}",
+        f"DTEND:{_dt(datetime.fromisoformat(old['end']))}",
+        f"SUMMARY:{_escape('Cancelled: ' + old['chapter'])}",
+        "STATUS:CANCELLED",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+class _CalendarWriter:
+    """
+    Writes VEVENT text into one calendar file, or one per split key.
+    Month splits arrive in order, so only one file is open at a time;
+    chapter splits keep a small LRU of open handles and reopen in append mode.
+    Output goes to <name>.tmp files that are renamed into place on success
+    and removed if the export fails or is cancelled.
+    """
+
+    HEADER = "".join(_fold(line) for line in
+                     ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH"))
+    FOOTER = "END:VCALENDAR\r\n"
+
+    def __init__(self, filename, split_by):
+        self.path = Path(filename)
+        self.split_by = split_by
+        self.filenames = []
+        self._open = OrderedDict()  # key -> file handle
+
+    def _name(self, key):
+        if key is None:
+            return str(self.path)
+        return str(self.path.with_name(f"{self.path.stem}-{key}{self.path.suffix or '.ics'}"))
+
+    def _handle(self, key):
+        f = self._open.get(key)
+        if f is not None:
+            self._open.move_to_end(key)
+            return f
+        name = self._name(key)
+        if name in self.filenames:
+            f = open(name + ".tmp", "a", encoding="utf-8", newline="")
+        else:
+            f = open(name + ".tmp", "w", encoding="utf-8", newline="")
+            f.write(self.HEADER)
+            self.filenames.append(name)
+        self._open[key] = f
+        limit = 1 if self.split_by == "month" else MAX_OPEN_FILES
+        while len(self._open) > limit:
+            _, oldest = self._open.popitem(last=False)
+            oldest.close()
+        return f
+
+    def write(self, key, text):
+        self._handle(key).write(text)
+
+    def __enter__(self):
+        if self.split_by is None:
+            self._handle(None)  # always produce the file, even with no events
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for f in self._open.values():
+            f.close()
+        self._open.clear()
+        for name in self.filenames:
+            if exc_type is not None:
+                os.remove(name + ".tmp")
+                continue
+            with open(name + ".tmp", "a", encoding="utf-8", newline="") as f:
+                f.write(self.FOOTER)
+            os.replace(name + ".tmp", name)
@@ -0,0 +1,207 @@
+# study_planner/core/ics_import.py
+"""
+Minimal iCalendar (RFC 5545) reader for busy-time import.
+
+Only what is needed to block time is read: VEVENT DTSTART/DTEND/DURATION,
+RRULE (FREQ=DAILY/WEEKLY with INTERVAL, COUNT, UNTIL and BYDAY), EXDATE,
+STATUS and TRANSP. Cancelled and transparent ("free") events are skipped.
+Times are converted to naive local time like the rest of the planner: UTC
+values via the local zone, TZID values via zoneinfo when available, and
+floating values as they are. All-day events block the whole day. Other
+recurrence frequencies only block their first occurrence.
+
+read_events() parses a file into IcsEvent objects; IcsEvent.occurrences()
+expands one event within a window, jumping straight to the window instead
+of walking every earlier repetition when there is no COUNT.
+"""
+import re
+from datetime import date, datetime, time, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_DURATION = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+class IcsEvent:
+    __slots__ = ("start", "end", "rrule", "exdates")
+
+    def __init__(self, start, end, rrule=None, exdates=()):
+        self.start = start
+        self.end = end
+        self.rrule = rrule or {}
+        self.exdates = set(exdates)
+
+    def occurrences(self, window_start, window_end):
+        """Yield (start, end) for every occurrence overlapping [window_start, window_end)."""
+        length = self.end - self.start
+        for start in self._starts(window_start - length, window_end):
+            if start not in self.exdates and start + length > window_start and start < window_end:
+                yield start, start + length
+
+    def _starts(self, lo, hi):
+        rule = self.rrule
+        freq = rule.get("FREQ")
+        if freq not in ("DAILY", "WEEKLY"):
+            yield self.start
+            return
+        interval = max(1, int(rule.get("INTERVAL", 1)))
+        count = int(rule["COUNT"]) if "COUNT" in rule else None
+        until = _parse_value(rule["UNTIL"], {}) if "UNTIL" in rule else None
+        if isinstance(until, date) and not isinstance(until, datetime):
+            until = datetime.combine(until, time(23, 59, 59))
+
+        if freq == "DAILY":
+            base, period, offsets = self.start, timedelta(days=interval), [timedelta(0)]
+        else:
+            # weeks start on Monday at DTSTART's time of day
+            base = self.start - timedelta(days=self.start.weekday())
+            period = timedelta(weeks=interval)
+            days = {WEEKDAYS.index(d[-2:]) for d in rule.get("BYDAY", "").split(",") if d[-2:] in WEEKDAYS}
+            offsets = [timedelta(days=d) for d in sorted(days or {self.start.weekday()})]
+
+        # without COUNT, skip whole periods that end before the window
+        k = 0
+        if count is None and lo > base:
+            k = max(0, (lo - base) // period - 1)
+        emitted = 0
+        while True:
+            period_start = base + k * period
+            if period_start > hi:
+                return
+            for offset in offsets:
+                start = period_start + offset
+                if start < self.start:
+                    continue  # BYDAY days before DTSTART in its first week
+                if until is not None and start > until:
+                    return
+                if count is not None:
+                    if emitted >= count:
+                        return
+                    emitted += 1
+                if start > hi:
+                    return
+                yield start
+            k += 1
+
+
+def read_events(filename):
+    """Parse a .ics file into IcsEvent objects (one per VEVENT, recurrences unexpanded)."""
+    with open(filename, "r", encoding="utf-8-sig", newline="") as f:
+        return list(parse_events(f.read()))
+
+
+def parse_events(text):
+    props = None
+    for name, params, value in _content_lines(text):
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            props = {}
+        elif name == "END" and value.upper() == "VEVENT" and props is not None:
+            event = _event(props)
+            if event is not None:
+                yield event
+            props = None
+        elif props is not None:
+            props.setdefault(name, []).append((params, value))
+
+
+def _content_lines(text):
+    # unfold: a line starting with a space or tab continues the previous one
+    lines = []
+    for raw in re.split(r"\r\n|\n|\r", text):
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        elif raw:
+            lines.append(raw)
+    for line in lines:
+        head, value = _split_value(line)
+        parts = head.split(";")
+        params = {}
+        for p in parts[1:]:
+            if "=" in p:
+                key, val = p.split("=", 1)
+                params[key.upper()] = val.strip('"')
+        yield parts[0].upper(), params, value
+
+
+def _split_value(line):
+    """Split at the first colon that is not inside a quoted parameter value."""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            return line[:i], line[i + 1:]
+    return line, ""
+
+
+def _event(props):
+    def first(name):
+        values = props.get(name)
+        return values[0] if values else (None, None)
+
+    if (first("STATUS")[1] or "").upper() == "CANCELLED" or (first("TRANSP")[1] or "").upper() == "TRANSPARENT":
+        return None
+    params, value = first("DTSTART")
+    if value is None:
+        return None
+    start = _parse_value(value, params)
+    all_day = not isinstance(start, datetime)
+    if all_day:
+        start = datetime.combine(start, time(0, 0))
+
+    end_params, end_value = first("DTEND")
+    if end_value is not None:
+        end = _parse_value(end_value, end_params)
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, time(0, 0))
+    elif first("DURATION")[1] is not None:
+        end = start + _parse_duration(first("DURATION")[1])
+    else:
+        end = start + (timedelta(days=1) if all_day else timedelta(0))
+    if end <= start:
+        return None
+
+    rrule = {}
+    if first("RRULE")[1]:
+        for part in first("RRULE")[1].split(";"):
+            if "=" in part:
+                key, val = part.split("=", 1)
+                rrule[key.upper()] = val.upper() if key.upper() != "UNTIL" else val
+    exdates = []
+    for ex_params, ex_value in props.get("EXDATE", []):
+        for item in ex_value.split(","):
+            ex = _parse_value(item, ex_params)
+            exdates.append(ex if isinstance(ex, datetime) else datetime.combine(ex, start.time()))
+    return IcsEvent(start, end, rrule, exdates)
+
+
+def _parse_value(value, params):
+    """DATE -> date; DATE-TIME -> naive local datetime."""
+    value = value.strip()
+    if len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date()
+    utc = value.endswith("Z")
+    dt = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if utc:
+        return dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    tzid = params.get("TZID")
+    if tzid and ZoneInfo is not None:
+        try:
+            return dt.replace(tzinfo=ZoneInfo(tzid)).astimezone().replace(tzinfo=None)
+        except Exception:  # unknown zone name: treat as floating time
+            return dt
+    return dt
+
+
+def _parse_duration(value):
+    m = _DURATION.match(value.strip().upper())
+    if not m:
+        raise ValueError(f"Bad iCalendar duration {value!r}.")
+    sign, weeks, days, hours, minutes, seconds = m.groups()
+    delta = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -delta if sign == "-" else delta
@@ -0,0 +1,201 @@
+# study_planner/core/instrument.py
+"""
+Lightweight phase timing and counters.
+
+Code is annotated with spans and counters:
+
+    with instrument.span("generate.assign"):
+        ...
+    instrument.count("generate.blocks", len(blocks))
+
+While disabled (the default) span() returns a shared no-op context manager
+and count() returns immediately, so the cost is one global lookup per call.
+Enable with the STUDY_PLANNER_PROFILE environment variable or enable() /
+the CLI's --profile flag. "1" only enables collection; any other value is
+taken as the file to write the results to on exit (see output_path).
+
+Collected data can be summarised (summary(), status_line()), written as JSON
+(export_json) or as a speedscope evented profile (export_speedscope) for
+https://www.speedscope.app. profile_to() wraps a block in cProfile for
+function-level detail.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "STUDY_PLANNER_PROFILE"
+MAX_EVENTS = 200000  # span open/close events kept for speedscope; totals are always exact
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}     # name -> [calls, total_s, max_s]
+_counters = {}  # name -> value
+_events = []    # (name, start_s, end_s, thread name) in completion order
+_origin = time.perf_counter()
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def output_path():
+    """The file STUDY_PLANNER_PROFILE names, or None when it is unset or just "1"."""
+    value = os.environ.get(ENV_VAR, "")
+    return None if value in ("", "0", "1") else value
+
+
+def reset():
+    global _origin
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        del _events[:]
+        _origin = time.perf_counter()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        elapsed = end - self.start
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                _spans[self.name] = [1, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+            if len(_events) < MAX_EVENTS:
+                _events.append((self.name, self.start, end, threading.current_thread().name))
+        return False
+
+
+def span(name):
+    """Context manager timing one phase; a shared no-op while disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def summary():
+    """{"spans": {name: {calls, total_ms, mean_ms, max_ms}}, "counters": {name: value}}"""
+    with _lock:
+        spans = {name: {"calls": calls, "total_ms": round(total * 1e3, 3),
+                        "mean_ms": round(total * 1e3 / calls, 3), "max_ms": round(peak * 1e3, 3)}
+                 for name, (calls, total, peak) in _spans.items()}
+        return {"spans": spans, "counters": dict(_counters)}
+
+
+def status_line(prefix=None, top=4):
+    """One line for a status bar: the slowest spans (optionally only those under `prefix`)."""
+    spans = summary()["spans"]
+    if prefix is not None:
+        spans = {k: v for k, v in spans.items() if k == prefix or k.startswith(prefix + ".")}
+    slowest = sorted(spans.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:top]
+    return "  ".join(f"{name} {s['total_ms']:.1f} ms" for name, s in slowest)
+
+
+def export_json(filename):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(summary(), f, indent=2)
+    return filename
+
+
+def export_speedscope(filename, name="study planner"):
+    """Write recorded spans as a speedscope evented profile (one profile per thread)."""
+    with _lock:
+        events = list(_events)
+        origin = _origin
+    frames, index = [], {}
+    by_thread = {}
+    for span_name, start, end, thread in events:
+        if span_name not in index:
+            index[span_name] = len(frames)
+            frames.append({"name": span_name})
+        by_thread.setdefault(thread, []).append((start, end, index[span_name]))
+
+    profiles = []
+    for thread, spans in by_thread.items():
+        # spans on one thread nest; sort so parents open before and close after children
+        opens = sorted(spans, key=lambda s: (s[0], -s[1]))
+        timeline, stack = [], []
+        for start, end, frame in opens:
+            while stack and stack[-1][0] <= start:
+                timeline.append({"type": "C", "frame": stack[-1][1], "at": (stack[-1][0] - origin) * 1e3})
+                stack.pop()
+            timeline.append({"type": "O", "frame": frame, "at": (start - origin) * 1e3})
+            stack.append((end, frame))
+        while stack:
+            timeline.append({"type": "C", "frame": stack[-1][1], "at": (stack[-1][0] - origin) * 1e3})
+            stack.pop()
+        profiles.append({"type": "evented", "name": thread, "unit": "milliseconds",
+                         "startValue": timeline[0]["at"], "endValue": timeline[-1]["at"], "events": timeline})
+
+    doc = {"$schema": "https://www.speedscope.app/file-format-schema.json", "name": name,
+           "shared": {"frames": frames}, "profiles": profiles, "exporter": "study-planner"}
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(doc, f)
+    return filename
+
+
+def export(filename):
+    """
+    Write collected data; *.speedscope.json gets the speedscope format, other
+    names plain JSON. (*.prof files come from profile_to, not from here.)
+    """
+    if str(filename).endswith(".speedscope.json"):
+        return export_speedscope(filename)
+    return export_json(filename)
+
+
+@contextmanager
+def profile_to(filename):
+    """Run the block under cProfile and dump pstats to `filename` (open with pstats or snakeviz)."""
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(filename))
@@ -0,0 +1,45 @@
+# study_planner/core/progress.py
+"""
+Progress reporting and cancellation hooks for long-running core operations.
+
+Core functions accept two optional arguments:
+  progress  callable(done, total, stage); total is None when unknown
+  cancel    object with is_set() (e.g. threading.Event); when it is set the
+            operation raises Cancelled at its next checkpoint
+Both default to None, which costs one comparison per checkpoint.
+"""
+
+REPORT_EVERY = 1000  # blocks between checkpoints inside per-block loops
+
+
+class Cancelled(Exception):
+    """Raised inside a core operation when its cancel event has been set."""
+
+
+def checkpoint(progress=None, cancel=None, done=0, total=None, stage=""):
+    if cancel is not None and cancel.is_set():
+        raise Cancelled(f"{stage or 'Operation'} cancelled.")
+    if progress is not None:
+        progress(done, total, stage)
+
+
+def total_of(items):
+    """len(items) when the iterable knows its size, else None."""
+    try:
+        return len(items)
+    except TypeError:
+        return None
+
+
+def tracked(items, progress=None, cancel=None, stage="", every=REPORT_EVERY):
+    """Yield from items, calling checkpoint every `every` items and once at the end."""
+    if progress is None and cancel is None:
+        yield from items
+        return
+    total = total_of(items)
+    done = 0
+    for done, item in enumerate(items, start=1):
+        if done % every == 0:
+            checkpoint(progress, cancel, done, total, stage)
+        yield item
+    checkpoint(progress, cancel, done, total, stage)
@@ -0,0 +1,120 @@
+# study_planner/core/revision.py
+"""
+Revision assignment strategies.
+
+After the Study pass every remaining candidate slot becomes a Revision block.
+"round_robin" (the default) cycles through the chapter queue. "spaced" places
+revisions on spaced-repetition intervals: each chapter has a next-due time,
+kept in a heap, and every slot goes to the chapter that is most overdue (or
+due soonest). After a revision the chapter's interval grows by an ease
+factor, so intervals widen over time (up to MAX_INTERVAL). Harder and longer chapters
+(chapters_meta difficulty/length, 1-5) start with shorter intervals and
+widen more slowly. Completed blocks from the history count as successful
+reviews; a chapter whose last block was missed starts over at the first
+interval. Assignment is O(slots log chapters).
+"""
+import heapq
+from datetime import timedelta
+
+STRATEGIES = ("round_robin", "spaced")
+
+FIRST_INTERVAL = timedelta(days=1)  # for an average chapter (weight 0.5)
+MAX_INTERVAL = timedelta(days=60)
+MIN_EASE = 1.3
+MAX_EASE = 2.5
+
+
+def resolve_strategy(strategy):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown revision strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}.")
+    return strategy
+
+
+def weight(difficulty, length):
+    """0.2 (easy, short) .. 1.0 (hard, long)."""
+    return (difficulty + length) / 10
+
+
+def first_interval(w):
+    # hardest chapters come back after half the base interval, the easiest after 1.3x
+    return FIRST_INTERVAL * (1.5 - w)
+
+
+def ease(w):
+    return max(MIN_EASE, MAX_EASE - 1.2 * w)
+
+
+def _next_due(last, interval, factor, reviews):
+    # grown in float seconds and capped, so many reviews can't overflow timedelta
+    seconds = interval.total_seconds() * factor ** min(reviews, 64)
+    return last + min(MAX_INTERVAL, timedelta(seconds=min(seconds, MAX_INTERVAL.total_seconds())))
+
+
+def assign_round_robin(blocks, study_queue, revision_queue):
+    """
+    Fill the first len(study_queue) blocks with unique chapters (Study);
+    remaining blocks become Revision cycling through revision_queue.
+    """
+    for idx, block in enumerate(blocks):
+        if idx < len(study_queue):
+            block.chapter = study_queue[idx]
+            block.mode = "Study"
+        else:
+            # revision cycles through original order (keep grouping useful)
+            block.chapter = revision_queue[(idx - len(study_queue)) % len(revision_queue)]
+            block.mode = "Revision"
+    return blocks
+
+
+def _review_state(history):
+    """chapter -> (last seen, successful reviews) from earlier blocks, in start order."""
+    state = {}
+    for b in history:
+        last, reviews = state.get(b.chapter, (None, 0))
+        # a past block that was not completed was missed: the next interval starts over
+        reviews = reviews + 1 if b.completed else 0
+        state[b.chapter] = (max(last, b.end_time) if last else b.end_time, reviews)
+    return state
+
+
+def assign_spaced(blocks, study_queue, revision_queue, meta, history=()):
+    """
+    Study pass as in round-robin, then revisions by next-due time.
+    meta: chapter -> (difficulty, length); history: earlier blocks of the plan
+    (past or completed) that seed each chapter's last-seen time and review count.
+    """
+    n_study = min(len(study_queue), len(blocks))
+    for idx in range(n_study):
+        blocks[idx].chapter = study_queue[idx]
+        blocks[idx].mode = "Study"
+
+    state = _review_state(history)
+    for b in blocks[:n_study]:
+        state[b.chapter] = (b.end_time, 0)
+
+    # per chapter: (first interval, ease); chapters without meta count as average
+    spacing = {}
+    for chapter in revision_queue:
+        w = weight(*meta.get(chapter, (3, 3)))
+        spacing[chapter] = (first_interval(w), ease(w))
+
+    # heap entries: (due, queue position, chapter, reviews); position breaks ties deterministically
+    heap = []
+    for pos, chapter in enumerate(revision_queue):
+        last, reviews = state.get(chapter, (None, 0))
+        if last is None:
+            continue  # never seen (cannot happen for a complete plan): nothing to revise yet
+        interval, factor = spacing[chapter]
+        heap.append((_next_due(last, interval, factor, reviews), pos, chapter, reviews))
+    heapq.heapify(heap)
+    if not heap:
+        return assign_round_robin(blocks, study_queue, revision_queue)
+
+    for block in blocks[n_study:]:
+        due, pos, chapter, reviews = heapq.heappop(heap)
+        block.chapter = chapter
+        block.mode = "Revision"
+        reviews += 1
+        interval, factor = spacing[chapter]
+        heapq.heappush(heap, (_next_due(block.end_time, interval, factor, reviews), pos, chapter, reviews))
+    return blocks
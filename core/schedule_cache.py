@@ -0,0 +1,175 @@
+# study_planner/core/schedule_cache.py
+"""
+Memoized schedule generation.
+
+ScheduleCache.generate(scheduler) returns the same plan generate_schedule()
+would, from an in-memory LRU or an optional size-bounded directory of .ssb
+files when the inputs have been seen before. Generation is deterministic
+(title heuristics are hashed, not random), so the key only has to capture
+the inputs:
+
+  chapters and their (difficulty, length) estimates, block/break minutes,
+  daily limit, ramp factor, day start hour, exam time, seed, revision
+  strategy, the busy intervals up to the exam, today's date and the first
+  slot of today that is still in the future.
+
+The last two are all generate_schedule takes from the clock, so a cached
+plan stays valid until the next slot of the day starts. Each hit returns
+a BlockStore.copy() of the cached plan; callers may mutate it freely.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from . import instrument
+from .binary_schedule import BinarySchedule, write_binary
+from .blockstore import BlockStore
+
+CACHE_VERSION = 1  # bump when generate_schedule's output changes for the same inputs
+MAX_ENTRIES = 32
+MAX_DISK_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(scheduler, now=None):
+    """Canonical hash of everything generate_schedule's result depends on."""
+    now = now or datetime.now().replace(second=0, microsecond=0)
+    first_slot = scheduler._day_layout(now.date(), now)[0]
+    busy = None if scheduler.busy is None else scheduler._busy_index(now).fingerprint()
+    # repr of str/int/float/tuple is canonical, and much cheaper than json for 10k chapters
+    params = (
+        CACHE_VERSION,
+        tuple(tuple(meta) for meta in scheduler.chapters_meta),
+        scheduler.block_minutes,
+        scheduler.break_minutes,
+        scheduler.daily_limit,
+        float(scheduler.ramp_factor),
+        scheduler.day_start_hour,
+        scheduler.exam_datetime.isoformat(),
+        scheduler.random_seed,
+        scheduler.strategy,
+        now.date().isoformat(),
+        first_slot,
+        busy,
+    )
+    return hashlib.sha256(repr(params).encode("utf-8")).hexdigest()
+
+
+class ScheduleCache:
+    def __init__(self, max_entries=MAX_ENTRIES, disk_dir=None, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> private BlockStore, only ever handed out as a copy
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def generate(self, scheduler, progress=None, cancel=None):
+        """Cached scheduler.generate_schedule(); also sets scheduler.blocks like the original."""
+        now = datetime.now().replace(second=0, microsecond=0)
+        key = cache_key(scheduler, now)
+        cached = self._lookup(key)
+        if cached is not None:
+            with instrument.span("cache.copy"):
+                scheduler.blocks = cached.copy()
+            return scheduler.blocks
+        # same `now` as the key, so a slot boundary passing mid-call can't mismatch them
+        store = scheduler.generate_schedule(progress=progress, cancel=cancel, now=now)
+        self.put(key, store)
+        return store
+
+    def get(self, scheduler):
+        """Fresh copy of the cached plan for `scheduler`, or None."""
+        cached = self._lookup(cache_key(scheduler))
+        return None if cached is None else cached.copy()
+
+    def _lookup(self, key):
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+        if cached is None:
+            cached = self._disk_get(key)
+            if cached is not None:
+                self._remember(key, cached)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        instrument.count("cache.hits" if cached is not None else "cache.misses")
+        return cached
+
+    def put(self, key, blocks):
+        store = BlockStore.wrap(blocks).copy()  # the caller keeps (and may edit) the original
+        self._remember(key, store)
+        if self.disk_dir is not None:
+            self._disk_put(key, store)
+
+    def _remember(self, key, store):
+        with self._lock:
+            self._memory[key] = store
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.ssb"):
+                path.unlink()
+
+    def __len__(self):
+        return len(self._memory)
+
+    # disk store: one .ssb file per key; mtime is the LRU clock
+    def _path(self, key):
+        return self.disk_dir / f"{key}.ssb"
+
+    def _disk_get(self, key):
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with BinarySchedule(path) as schedule:
+                store = BlockStore(schedule)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            return None  # missing, evicted meanwhile or unreadable: regenerate
+        return store
+
+    def _disk_put(self, key, blocks):
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            write_binary(blocks, tmp)
+            os.replace(tmp, path)  # atomic, so concurrent batch workers never see half a file
+        except (OSError, ValueError):
+            if tmp.exists():
+                tmp.unlink()
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until the directory fits max_disk_bytes."""
+        entries = []
+        for path in self.disk_dir.glob("*.ssb"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
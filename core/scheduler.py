@@ -1,24 +1,39 @@
 # study_planner/core/scheduler.py
 import math
-import random
 from datetime import datetime, timedelta, time
 
+from . import chapter_meta, instrument, revision, vectorized
+from .blockstore import BlockStore
+from .busy import BusyCalendar
+from .progress import checkpoint
+
 class StudyBlock:
-    def __init__(self, chapter, start_time, end_time, mode="Study"):
+    __slots__ = ("chapter", "start_time", "end_time", "mode", "completed", "block_id")
+
+    def __init__(self, chapter, start_time, end_time, mode="Study", block_id=None):
         self.chapter = chapter
         self.start_time = start_time
         self.end_time = end_time
         self.mode = mode  # "Study" or "Revision"
         self.completed = False
+        self.block_id = block_id  # stable id, assigned by BlockStore
+
+    def copy(self):
+        clone = StudyBlock(self.chapter, self.start_time, self.end_time, self.mode, self.block_id)
+        clone.completed = self.completed
+        return clone
 
     def to_dict(self):
-        return {
+        d = {
             "chapter": self.chapter,
             "start": self.start_time.isoformat(),
             "end": self.end_time.isoformat(),
             "mode": self.mode,
             "completed": self.completed,
         }
+        if self.block_id is not None:
+            d["id"] = self.block_id
+        return d
 
     @staticmethod
     def from_dict(d):
@@ -26,7 +41,8 @@ class StudyBlock:
             d["chapter"],
             datetime.fromisoformat(d["start"]),
             datetime.fromisoformat(d["end"]),
-            d.get("mode", "Study")
+            d.get("mode", "Study"),
+            d.get("id")
         )
         sb.completed = d.get("completed", False)
         return sb
@@ -50,48 +66,50 @@ class SmartScheduler:
                  break_minutes=10,
                  ramp_factor=0.5,
                  day_start_hour=9,
-                 random_seed=None):
+                 random_seed=None,
+                 engine="auto",
+                 strategy="round_robin",
+                 busy=None,
+                 meta_store=None):
         if exam_datetime <= datetime.now():
             raise ValueError("Exam datetime must be in the future.")
 
-        if random_seed is not None:
-            random.seed(random_seed)
+        # the seed only perturbs the title heuristics, through a stable hash (see core/chapter_meta.py),
+        # so identical inputs always give identical schedules
+        self.random_seed = random_seed
 
         self.chapter_titles = list(chapter_titles)
         if not self.chapter_titles:
             raise ValueError("At least one chapter required.")
 
         self.block_minutes = int(block_minutes)
+        if self.block_minutes < 1:
+            raise ValueError("Block length must be at least one minute.")
         self.exam_datetime = exam_datetime
         self.daily_limit = max(1, int(daily_limit))
         self.break_minutes = max(0, int(break_minutes))
         self.ramp_factor = float(ramp_factor)
         self.day_start_hour = int(day_start_hour)
+        # "numpy" uses core/vectorized.py for slot generation, "python" the loops below
+        self.engine = vectorized.resolve_engine(engine)
+        # how revision slots are filled: "round_robin" or "spaced" (see core/revision.py)
+        self.strategy = revision.resolve_strategy(strategy)
+        # time no block may overlap: a BusyCalendar, or rule strings / (start, end) pairs (see core/busy.py)
+        self.busy = BusyCalendar.wrap(busy)
+        self._busy_memo = (None, None, None)
 
-        # meta: (title, difficulty 1-5, length_score 1-5)
-        self.chapters_meta = [
-            (t, self._estimate_difficulty(t), self._estimate_length(t))
-            for t in self.chapter_titles
-        ]
+        # optional ChapterMetaStore: cached heuristic scores, difficulty learned from completions
+        self.meta_store = meta_store
 
-        self.blocks = []
+        # meta: (title, difficulty 1-5, length_score 1-5)
+        self.chapters_meta = self._estimate_meta(self.chapter_titles)
 
-    @staticmethod
-    def _estimate_difficulty(title):
-        # Heuristic: longer titles and more words -> slightly higher difficulty
-        words = len(title.split())
-        chars = len(title)
-        base = 1 + min(4, chars // 15 + words // 6)
-        tweak = random.choice([0, 0, 1, -1])
-        return max(1, min(5, base + tweak))
+        self.blocks = BlockStore()
 
-    @staticmethod
-    def _estimate_length(title):
-        # Heuristic: number of words -> length score
-        words = len(title.split())
-        base = 1 + min(4, words // 4)
-        tweak = random.choice([0, 0, 1, -1])
-        return max(1, min(5, base + tweak))
+    def _estimate_meta(self, titles):
+        if self.meta_store is not None:
+            return self.meta_store.meta(titles, self.random_seed)
+        return [(t, d, l) for t, (d, l) in zip(titles, chapter_meta.estimate(titles, self.random_seed))]
 
     def _compute_daily_slots(self, total_days, base_daily_limit):
         """
@@ -107,59 +125,169 @@ class SmartScheduler:
             slots.append(day_slots)
         return slots
 
-    def _make_time_slots(self, slots_per_day):
+    def _daily_slots(self, total_days, base_daily_limit):
+        # same counts either way; the numpy engine computes the ramp as one array
+        if self.engine == "numpy":
+            return vectorized.compute_daily_slots(total_days, base_daily_limit, self.ramp_factor)
+        return self._compute_daily_slots(total_days, base_daily_limit)
+
+    def _day_layout(self, current_day, now):
+        """
+        Return (first, cap, runs) for one day: slot positions first..cap-1 are usable.
+        Without busy time runs is None and position p starts at
+        day_start_hour + p * (block + break). A usable slot starts at/after
+        `now`, ends at/before midnight and ends before the exam.
+        """
+        step = timedelta(minutes=self.block_minutes + self.break_minutes)
+        block = timedelta(minutes=self.block_minutes)
+        start_dt = datetime.combine(current_day, time(self.day_start_hour, 0))
+        if self.busy is not None:
+            return self._busy_day_layout(start_dt, now, step, block)
+
+        # midnight cutoff: start + p*step + block <= next midnight
+        room = datetime.combine(current_day + timedelta(days=1), time(0, 0)) - start_dt - block
+        cap = room // step + 1 if room >= timedelta(0) else 0
+        # exam cutoff: start + p*step + block < exam
+        room = self.exam_datetime - start_dt - block
+        cap = min(cap, -(-room // step)) if room > timedelta(0) else 0
+        # past cutoff: start + p*step >= now
+        first = -(-(now - start_dt) // step) if now > start_dt else 0
+        return first, max(first, cap), None
+
+    def _busy_day_layout(self, start_dt, now, step, block):
+        """
+        Day layout around busy time. Slots are packed greedily from
+        day_start_hour: a run of back-to-back slots fills each free gap and the
+        next run starts as soon as the busy interval ends. runs is a list of
+        (run start, slot count), so the work per day is one bisect per busy
+        interval crossed, not one check per slot.
+        """
+        index = self._busy_index(now)
+        midnight = datetime.combine(start_dt.date() + timedelta(days=1), time(0, 0))
+        runs, first, cap = [], 0, 0
+        t = start_dt
+        while True:
+            t = index.next_free(t, block)
+            # the run ends at the next busy interval, midnight or the exam
+            room = min(midnight, index.next_busy(t) or midnight) - t - block
+            n = room // step + 1 if room >= timedelta(0) else 0
+            room = self.exam_datetime - t - block
+            n = min(n, -(-room // step)) if room > timedelta(0) else 0
+            if n <= 0:
+                break
+            runs.append((t, n))
+            cap += n
+            if now > t:
+                first += min(n, -(-(now - t) // step))
+            t += n * step
+        return first, cap, runs
+
+    def _busy_index(self, now):
+        """BusyIndex for today..exam, rebuilt only when the calendar, the day or the exam changes."""
+        key = (self.busy.version, now.date(), self.exam_datetime)
+        calendar, memo_key, index = self._busy_memo
+        if calendar is not self.busy or memo_key != key:
+            with instrument.span("generate.busy_index"):
+                index = self.busy.index(datetime.combine(now.date(), time(0, 0)), self.exam_datetime)
+            instrument.count("generate.busy_intervals", len(index))
+            self._busy_memo = (self.busy, key, index)
+        return index
+
+    def _day_layouts(self, total_days, now):
+        today = now.date()
+        return [self._day_layout(today + timedelta(days=offset), now) for offset in range(total_days)]
+
+    def _capacity(self, layouts, base_daily_limit):
+        """Number of candidate slots _make_time_slots would return for base_daily_limit."""
+        instrument.count("generate.attempts")
+        slots_per_day = self._daily_slots(len(layouts), base_daily_limit)
+        if self.engine == "numpy":
+            return vectorized.capacity(slots_per_day, layouts)
+        return sum(min(slots, cap) - first
+                   for slots, (first, cap, _) in zip(slots_per_day, layouts)
+                   if slots > first)
+
+    def _solve_base_limit(self, layouts, needed):
+        """
+        Smallest base daily limit (>= daily_limit) whose candidate slots cover `needed`.
+        Capacity is monotone in the limit and saturates once every day is full,
+        so a binary search over [daily_limit, max day cap] finds it directly.
+        """
+        lo = max(1, self.daily_limit)
+        hi = max([lo] + [cap for _, cap, _ in layouts])
+        available = self._capacity(layouts, hi)
+        if available < needed:
+            raise RuntimeError(
+                f"Unable to fit all chapters before exam with given constraints: "
+                f"at most {available} blocks of {self.block_minutes} min "
+                f"(+{self.break_minutes} min break) fit between {self.day_start_hour:02d}:00 "
+                f"and midnight{' outside busy time' if self.busy is not None else ''} before the exam, "
+                f"but {needed} chapters need a study block."
+            )
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._capacity(layouts, mid) >= needed:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _make_time_slots(self, slots_per_day, now=None, layouts=None):
         """
         Convert slots_per_day -> list of datetime start times for candidate blocks.
-        Only returns slots that start/end before exam and are not in the past.
+        Only returns slots that are not in the past, end by midnight and end before exam.
         """
         candidate_times = []
-        now = datetime.now().replace(second=0, microsecond=0)
+        now = now or datetime.now().replace(second=0, microsecond=0)
+        if layouts is None:
+            layouts = self._day_layouts(len(slots_per_day), now)
         today = now.date()
+        step = timedelta(minutes=self.block_minutes + self.break_minutes)
         for offset, slots in enumerate(slots_per_day):
             current_day = today + timedelta(days=offset)
             # Start scheduling at day_start_hour for every day
             start_dt = datetime.combine(current_day, time(self.day_start_hour, 0))
-            t = start_dt
-            for _ in range(slots):
-                end_t = t + timedelta(minutes=self.block_minutes)
-                # Stop if block would end at/after exam
-                if end_t >= self.exam_datetime:
+            first, cap, runs = layouts[offset]
+            if runs is None:
+                for p in range(first, min(slots, cap)):
+                    candidate_times.append(start_dt + p * step)
+                continue
+            # busy day: walk the runs of free slots, positions first..min(slots, cap)-1
+            p, stop = 0, min(slots, cap)
+            for run_start, n in runs:
+                for k in range(max(0, first - p), min(n, stop - p)):
+                    candidate_times.append(run_start + k * step)
+                p += n
+                if p >= stop:
                     break
-                # Skip slots in the past (today only)
-                if t >= now and end_t <= self.exam_datetime:
-                    candidate_times.append(t)
-                t = end_t + timedelta(minutes=self.break_minutes)
         return candidate_times
 
-    def generate_schedule(self):
+    def _candidate_blocks(self, now, needed):
         """
-        Main routine:
-          - Compute number of days available.
-          - Find slots_per_day such that total candidate slots >= number of chapters.
-            If not enough, increase base daily_limit iteratively.
-          - Assign each chapter to one slot (Study). After each chapter assigned once,
-            remaining slots become Revision cycling through chapters.
-          - Return list[StudyBlock] sorted by start time, all ending before exam.
+        Solve capacity for `needed` slots from `now` on and return unlabelled
+        StudyBlocks (chapter None) for every candidate slot, sorted by start.
         """
-        now = datetime.now().replace(second=0, microsecond=0)
         total_days = (self.exam_datetime.date() - now.date()).days
         if total_days < 1:
             raise ValueError("Not enough days until the exam (must be at least tomorrow).")
 
-        base_limit = max(1, self.daily_limit)
-        max_attempts = 30
-        for attempt in range(max_attempts):
-            slots_per_day = self._compute_daily_slots(total_days, base_limit)
-            candidate_times = self._make_time_slots(slots_per_day)
-            if len(candidate_times) >= len(self.chapter_titles):
-                break
-            base_limit += 1  # increase capacity and retry
-        else:
-            # If still insufficient, attempt a fallback: allow scheduling earlier in day by reducing day_start_hour
-            raise RuntimeError("Unable to fit all chapters before exam with given constraints.")
+        with instrument.span("generate.solve"):
+            layouts = self._day_layouts(total_days, now)
+            base_limit = self._solve_base_limit(layouts, needed)
+            slots_per_day = self._daily_slots(total_days, base_limit)
+        with instrument.span("generate.build_slots"):
+            # the numpy engine only knows the fixed day grid
+            if self.engine == "numpy" and self.busy is None:
+                table = vectorized.make_slot_table(self, slots_per_day, now)
+                blocks = table.to_blocks([None] * len(table), ["Study"] * len(table))
+            else:
+                length = timedelta(minutes=self.block_minutes)
+                blocks = [StudyBlock(None, slot_start, slot_start + length)
+                          for slot_start in self._make_time_slots(slots_per_day, now, layouts)]
+        instrument.count("generate.candidate_slots", len(blocks))
+        return blocks
 
-        # Assign chapters to times
-        blocks = []
+    def _chapter_queue(self):
         # ensure deterministic order: schedule harder/longer first for study (optional)
         # We'll sort chapters by (difficulty+length) desc so tougher chapters appear earlier in schedule
         sorted_chapters = sorted(
@@ -167,27 +295,227 @@ class SmartScheduler:
             key=lambda tup: (tup[1] + tup[2]),
             reverse=True
         )
-        chapter_queue = [t[0] for t in sorted_chapters]
-
-        # Fill first len(chapters) slots with unique chapters (Study)
-        # Remaining slots become revision cycles
-        total_slots = len(candidate_times)
-        for idx, slot_start in enumerate(candidate_times):
-            if idx < len(chapter_queue):
-                chapter = chapter_queue[idx]
-                mode = "Study"
-            else:
-                # revision cycles through original order (keep grouping useful)
-                chapter = chapter_queue[(idx - len(chapter_queue)) % len(chapter_queue)]
-                mode = "Revision"
-            block = StudyBlock(chapter, slot_start, slot_start + timedelta(minutes=self.block_minutes), mode)
-            blocks.append(block)
-
-        # store and return blocks sorted by time (they already are)
-        self.blocks = blocks
-        return blocks
+        return [t[0] for t in sorted_chapters]
+
+    def _assign(self, blocks, study_queue, revision_queue, history=()):
+        """
+        Fill the first len(study_queue) blocks with unique chapters (Study);
+        remaining blocks become Revision, chosen by self.strategy. `history`
+        holds earlier blocks of the plan (used by the spaced strategy).
+        """
+        if self.strategy == "spaced":
+            meta = {title: (diff, length) for title, diff, length in self.chapters_meta}
+            return revision.assign_spaced(blocks, study_queue, revision_queue, meta, history)
+        return revision.assign_round_robin(blocks, study_queue, revision_queue)
+
+    def generate_schedule(self, progress=None, cancel=None, now=None):
+        """
+        Main routine:
+          - Compute number of days available.
+          - Solve for the smallest base daily limit whose candidate slots cover
+            the number of chapters, then build the candidate list once.
+          - Assign each chapter to one slot (Study). After each chapter assigned once,
+            remaining slots become Revision cycling through chapters.
+          - Return list[StudyBlock] sorted by start time, all ending before exam.
+        progress/cancel are the optional hooks described in core/progress.py;
+        `now` defaults to the current minute.
+        """
+        with instrument.span("generate"):
+            stages = 4
+            checkpoint(progress, cancel, 0, stages, "Building time slots")
+            now = now or datetime.now().replace(second=0, microsecond=0)
+            blocks = self._candidate_blocks(now, len(self.chapter_titles))
+            checkpoint(progress, cancel, 1, stages, "Ordering chapters")
+            with instrument.span("generate.order"):
+                chapter_queue = self._chapter_queue()
+            checkpoint(progress, cancel, 2, stages, "Assigning chapters")
+            with instrument.span("generate.assign"):
+                self._assign(blocks, chapter_queue, chapter_queue)
+            checkpoint(progress, cancel, 3, stages, "Indexing blocks")
+
+            # store and return blocks sorted by time (they already are)
+            with instrument.span("generate.index"):
+                self.blocks = BlockStore(blocks)
+            instrument.count("generate.blocks", len(blocks))
+            checkpoint(progress, None, stages, stages, "Done")
+        return self.blocks
+
+    # parameters a CHANGE_PARAMS edit may set, with their coercion
+    EDITABLE_PARAMS = {
+        "block_minutes": int,
+        "exam_datetime": lambda v: v,
+        "daily_limit": lambda v: max(1, int(v)),
+        "break_minutes": lambda v: max(0, int(v)),
+        "ramp_factor": float,
+        "day_start_hour": int,
+        "strategy": revision.resolve_strategy,
+        "busy": BusyCalendar.wrap,
+    }
+
+    def reschedule(self, blocks, edit, now=None):
+        """
+        Apply one ScheduleEdit to an existing schedule without a full rebuild.
+        Blocks that started before `now` and completed blocks are never changed;
+        only the pending part of the timeline touched by the edit is recomputed.
+        A BlockStore is updated in place; a list is indexed into a new store.
+        Returns the updated BlockStore (also stored in self.blocks). Blocks the
+        edit changed in place are listed in edit.touched; if the pending part
+        had to be re-planned a new store is returned instead.
+        """
+        now = now or datetime.now().replace(second=0, microsecond=0)
+        store = BlockStore.wrap(blocks)
+        cut = store.index_at_or_after(now)
+        edit.touched = []
+
+        if edit.kind == ScheduleEdit.COMPLETE_BLOCK:
+            edit.block.completed = True
+            edit.touched.append(edit.block)
+
+        elif edit.kind == ScheduleEdit.ADD_CHAPTER:
+            if edit.chapter not in self.chapter_titles:
+                self.chapter_titles.append(edit.chapter)
+                self.chapters_meta.extend(self._estimate_meta([edit.chapter]))
+                # the new chapter takes over the first pending revision slot
+                if not self._promote(store, cut, edit.chapter, edit.touched):
+                    store = self._rebuild_future(store, now)
+
+        elif edit.kind == ScheduleEdit.REMOVE_CHAPTER:
+            if edit.chapter in self.chapter_titles:
+                if len(self.chapter_titles) == 1:
+                    raise ValueError("At least one chapter required.")
+                self.chapter_titles.remove(edit.chapter)
+                self.chapters_meta = [m for m in self.chapters_meta if m[0] != edit.chapter]
+                # its pending slots stay in the plan as revisions of the remaining chapters
+                queue = self._chapter_queue()
+                freed = [b for b in store.by_chapter(edit.chapter, start=now) if not b.completed]
+                for n, b in enumerate(freed):
+                    store.relabel(b, queue[n % len(queue)], "Revision")
+                edit.touched.extend(freed)
+
+        elif edit.kind == ScheduleEdit.DELETE_BLOCK:
+            if edit.block not in store:
+                raise ValueError("Block to delete is not part of this schedule.")
+            idx = store.index_of(edit.block)
+            removed = store.remove(edit.block)
+            if idx >= cut and removed.mode == "Study" and not removed.completed:
+                # the chapter still needs a study session: reuse the next pending revision
+                if not self._promote(store, idx, removed.chapter, edit.touched):
+                    store = self._rebuild_future(store, now)
+
+        elif edit.kind == ScheduleEdit.CHANGE_PARAMS:
+            # convert every value before touching anything, and undo if the new plan does not fit
+            params = {}
+            for key, value in edit.params.items():
+                if key not in self.EDITABLE_PARAMS:
+                    raise ValueError(f"Parameter {key!r} cannot be changed incrementally.")
+                params[key] = self.EDITABLE_PARAMS[key](value)
+            old = {key: getattr(self, key) for key in params}
+            for key, value in params.items():
+                setattr(self, key, value)
+            try:
+                store = self._rebuild_future(store, now)
+            except Exception:
+                for key, value in old.items():
+                    setattr(self, key, value)
+                raise
+
+        else:
+            raise ValueError(f"Unknown schedule edit {edit.kind!r}.")
+
+        self.blocks = store
+        return store
+
+    @staticmethod
+    def _promote(store, start, chapter, touched):
+        """Turn the first pending Revision at/after position `start` into a Study block for chapter."""
+        for idx in range(start, len(store)):
+            b = store[idx]
+            if b.mode == "Revision" and not b.completed:
+                store.relabel(b, chapter, "Study")
+                touched.append(b)
+                return True
+        return False
+
+    def _rebuild_future(self, store, now):
+        """
+        Keep past and completed blocks, re-plan every pending block from `now`
+        with the current parameters. Chapters that already have a kept Study
+        block only get revisions. Returns a new BlockStore.
+        """
+        cut = store.index_at_or_after(now)
+        kept = store[:cut] + [b for b in store[cut:] if b.completed]
+        studied = {b.chapter for b in kept if b.mode == "Study"}
+        queue = self._chapter_queue()
+        study_queue = [c for c in queue if c not in studied]
+        fixed = [b for b in kept if b.end_time > now]
+
+        if fixed:
+            # kept future blocks are busy time for the new slots: after a parameter change the
+            # slot grid no longer lines up with them, and one kept block may cover several slots
+            busy = self.busy
+            self.busy = BusyCalendar(
+                rules=busy.rules if busy is not None else (),
+                ranges=(busy.ranges if busy is not None else []) + [(b.start_time, b.end_time) for b in fixed],
+                events=busy.events if busy is not None else ())
+            try:
+                fresh = self._candidate_blocks(now, len(study_queue))
+            finally:
+                self.busy = busy
+        else:
+            fresh = self._candidate_blocks(now, len(study_queue))
+        self._assign(fresh, study_queue, queue, history=kept)
+        # kept blocks keep their ids; new ones never reuse an id the old store handed out
+        return BlockStore(kept + fresh, next_id=store.next_id)
+
+    def copy(self):
+        """
+        Scheduler with the same settings and its own chapter lists, so edits
+        can be tried on it (e.g. on a worker thread, with blocks.copy()) and
+        this one is left untouched if they fail.
+        """
+        clone = SmartScheduler.__new__(SmartScheduler)
+        clone.__dict__.update(self.__dict__)
+        clone.chapter_titles = list(self.chapter_titles)
+        clone.chapters_meta = list(self.chapters_meta)
+        return clone
 
     def mark_completed(self, chapter_title):
-        for b in self.blocks:
-            if b.chapter == chapter_title:
-                b.completed = True
+        for b in self.blocks.by_chapter(chapter_title):
+            b.completed = True
+
+
+class ScheduleEdit:
+    """One change to an existing schedule, applied by SmartScheduler.reschedule."""
+
+    ADD_CHAPTER = "add_chapter"
+    REMOVE_CHAPTER = "remove_chapter"
+    COMPLETE_BLOCK = "complete_block"
+    DELETE_BLOCK = "delete_block"
+    CHANGE_PARAMS = "change_params"
+
+    def __init__(self, kind, chapter=None, block=None, params=None):
+        self.kind = kind
+        self.chapter = chapter
+        self.block = block
+        self.params = params or {}
+        self.touched = []  # blocks changed in place, filled in by reschedule
+
+    @classmethod
+    def add_chapter(cls, title):
+        return cls(cls.ADD_CHAPTER, chapter=title)
+
+    @classmethod
+    def remove_chapter(cls, title):
+        return cls(cls.REMOVE_CHAPTER, chapter=title)
+
+    @classmethod
+    def complete_block(cls, block):
+        return cls(cls.COMPLETE_BLOCK, block=block)
+
+    @classmethod
+    def delete_block(cls, block):
+        return cls(cls.DELETE_BLOCK, block=block)
+
+    @classmethod
+    def change_params(cls, **params):
+        return cls(cls.CHANGE_PARAMS, params=params)
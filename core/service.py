@@ -0,0 +1,519 @@
+# study_planner/core/service.py
+"""
+Local HTTP/JSON scheduling service for other tools.
+
+    python Study_Scheduler.py serve --port 8765 --workers 2
+
+Endpoints (POST bodies and responses are JSON unless noted):
+
+  POST /generate  generation parameters as in core/batch.py (chapters, exam,
+                  block_minutes, ..., busy), plus optional "format" (json,
+                  jsonl or ics) and "out" (also save the plan to this file)
+  POST /update    {"path", "params", "edits": [{"kind": "complete_block", "id": 3},
+                  {"kind": "add_chapter", "chapter": "..."}, {"kind": "change_params",
+                  "params": {...}}, ...]}: apply ScheduleEdits to a saved plan and
+                  save it back; responds with the updated plan
+  POST /load      {"path", "chapter", "from", "to", "format"}: blocks from a file
+  POST /save      {"path", "blocks": [...]} or {"path", "source": other file}
+  POST /export    {"path"} or {"blocks"}: the plan as an .ics calendar; with
+                  "out" it is written there instead (incremental with "incremental")
+  GET  /stats     request counts, latency percentiles and throughput
+  GET  /health
+
+Generation and updates are CPU-bound and run in a process pool of `workers`
+processes. At most `max_pending` pool jobs (running or waiting for a worker)
+and file operations are admitted at a time; beyond that the service answers
+503 with Retry-After instead of queueing without bound. Identical concurrent
+generate/update requests share one computation and need no extra slot; a
+different update of a file that is already being updated gets a 503 too.
+Plans, .ics calendars and loaded files are streamed with chunked transfer
+encoding, so a response never has to be built in memory as a whole.
+
+File paths are resolved inside `root` (default: the current directory);
+paths that leave it are rejected. The server binds to 127.0.0.1 by default.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from . import instrument
+from .batch import _generate, build_scheduler
+from .blockstore import BlockStore
+from .exporter import export_to_ics, iter_ics, plan_namespace
+from .scheduler import ScheduleEdit, StudyBlock
+from .storage import iter_schedule, load_schedule, save_schedule
+
+DEFAULT_PORT = 8765
+CHUNK_BYTES = 64 * 1024
+LATENCY_SAMPLES = 2048   # most recent request latencies kept for percentiles
+RECENT_WINDOW_S = 60.0   # throughput window
+FORMATS = ("json", "jsonl", "ics")
+
+
+class Busy(Exception):
+    """Raised when the admission limit is reached; answered with 503."""
+
+
+# pool jobs: top-level functions so they can be pickled into worker processes
+
+def _generate_job(params, cache_dir, out):
+    blocks = _generate(build_scheduler(params), cache_dir)
+    if out:
+        save_schedule(blocks, out)
+    return list(blocks)
+
+
+def _update_job(params, path, edits):
+    scheduler = build_scheduler(params)
+    store = load_schedule(path)
+    for spec in edits:
+        store = scheduler.reschedule(store, _edit(spec, store))
+    save_schedule(store, path)
+    return list(store)
+
+
+def _edit(spec, store):
+    kind = spec.get("kind")
+    if kind in (ScheduleEdit.ADD_CHAPTER, ScheduleEdit.REMOVE_CHAPTER):
+        return ScheduleEdit(kind, chapter=spec["chapter"])
+    if kind in (ScheduleEdit.COMPLETE_BLOCK, ScheduleEdit.DELETE_BLOCK):
+        block = store.get(spec["id"])
+        if block is None:
+            raise ValueError(f"No block with id {spec['id']!r}.")
+        return ScheduleEdit(kind, block=block)
+    if kind == ScheduleEdit.CHANGE_PARAMS:
+        params = dict(spec.get("params") or {})
+        if "exam" in params:
+            params["exam_datetime"] = params.pop("exam")
+        if isinstance(params.get("exam_datetime"), str):
+            params["exam_datetime"] = datetime.fromisoformat(params["exam_datetime"])
+        return ScheduleEdit.change_params(**params)
+    raise ValueError(f"Unknown edit kind {kind!r}.")
+
+
+class ServiceStats:
+    """Thread-safe request counters, latency percentiles and throughput."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.endpoints = {}  # path -> [requests, errors, total_s, max_s]
+        self.counters = {"rejected": 0, "deduplicated": 0, "pool_jobs": 0}
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._recent = deque()  # completion times within RECENT_WINDOW_S
+        self.active = 0
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        instrument.count(f"service.{name}", n)
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def record(self, endpoint, elapsed, error):
+        now = time.monotonic()
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += bool(error)
+            stats[2] += elapsed
+            stats[3] = max(stats[3], elapsed)
+            self._latencies.append(elapsed)
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - RECENT_WINDOW_S:
+                self._recent.popleft()
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            ordered = sorted(self._latencies)
+            total = sum(s[0] for s in self.endpoints.values())
+
+            def pct(p):
+                return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e3, 3) if ordered else None
+
+            return {
+                "uptime_s": round(uptime, 3),
+                "requests": total,
+                "active": self.active,
+                "throughput_rps": round(total / uptime, 3) if uptime > 0 else 0.0,
+                "recent_rps": round(len(self._recent) / min(uptime, RECENT_WINDOW_S), 3) if uptime > 0 else 0.0,
+                "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                               "max": round(ordered[-1] * 1e3, 3) if ordered else None},
+                "endpoints": {name: {"requests": n, "errors": err, "mean_ms": round(t * 1e3 / n, 3),
+                                     "max_ms": round(peak * 1e3, 3)}
+                              for name, (n, err, t, peak) in self.endpoints.items()},
+                "counters": dict(self.counters),
+            }
+
+
+class ScheduleService:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=None, max_pending=None, root=".",
+                 cache_dir=None):
+        self.root = Path(root).resolve()
+        self.cache_dir = str(cache_dir) if cache_dir is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.max_pending = max_pending or self.workers * 4
+        self.stats = ServiceStats()
+        self._admission = threading.BoundedSemaphore(self.max_pending)
+        self._inflight = {}    # request key -> Future shared by identical requests
+        self._path_locks = {}  # resolved path -> Lock, so updates to one file don't interleave
+        self._lock = threading.Lock()
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.service = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a background thread (for tests and embedding); returns self."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="study-planner-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        # jobs still waiting for a worker are dropped (shutdown(cancel_futures=...) needs Python 3.9)
+        with self._lock:
+            pending = list(self._inflight.values())
+        for future in pending:
+            future.cancel()
+        self.pool.shutdown(wait=True)
+
+    # admission, dedupe and the pool
+
+    def _admit(self):
+        if not self._admission.acquire(blocking=False):
+            self.stats.count("rejected")
+            raise Busy(f"{self.max_pending} requests are already pending; retry shortly.")
+
+    @contextmanager
+    def admission(self):
+        """Hold one admission slot for the block (raises Busy if none is free)."""
+        self._admit()
+        try:
+            yield
+        finally:
+            self._admission.release()
+
+    def joined(self, key):
+        """The in-flight computation for `key`, or None."""
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            self.stats.count("deduplicated")
+        return future
+
+    def submit(self, key, fn, *args):
+        """
+        Run fn(*args) in the pool, or join an identical request already in
+        flight. A new computation takes an admission slot until it finishes.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                self._admit()
+                try:
+                    future = self.pool.submit(fn, *args)
+                except BaseException:
+                    self._admission.release()
+                    raise
+                self._inflight[key] = future
+                joined = False
+            else:
+                joined = True
+        if joined:
+            self.stats.count("deduplicated")
+            return future
+        self.stats.count("pool_jobs")
+
+        def finished(_):
+            with self._lock:
+                self._inflight.pop(key, None)
+            self._admission.release()
+
+        future.add_done_callback(finished)
+        return future
+
+    def path(self, name):
+        path = (self.root / str(name)).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ValueError(f"Path {name!r} is outside the service root.")
+        return path
+
+    def path_lock(self, path):
+        with self._lock:
+            return self._path_locks.setdefault(str(path), threading.Lock())
+
+    @contextmanager
+    def exclusive(self, path):
+        """Hold the path's lock for the block without waiting (raises Busy if it is taken)."""
+        lock = self.path_lock(path)
+        if not lock.acquire(blocking=False):
+            self.stats.count("rejected")
+            raise Busy(f"{path.name} is already being updated; retry shortly.")
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+def request_key(endpoint, body, ignore=()):
+    """Identical requests (ignoring presentation-only fields) get the same key."""
+    canonical = json.dumps({k: v for k, v in body.items() if k not in ignore}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{endpoint}|{canonical}".encode("utf-8")).hexdigest()
+
+
+def _confined(service, params):
+    """Generation parameters with the file they name resolved inside the service root."""
+    params = dict(params)
+    if params.get("busy_ics"):
+        params["busy_ics"] = str(service.path(params["busy_ics"]))
+    return params
+
+
+def _blocks_from(body, service):
+    if "blocks" in body:
+        return BlockStore(StudyBlock.from_dict(d) for d in body["blocks"])
+    if "path" in body:
+        return iter_schedule(service.path(body["path"]))
+    raise ValueError("Give either 'blocks' or 'path'.")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default listen backlog of 5 makes bursts of clients wait for SYN retries
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive and chunked responses
+    server_version = "StudyPlanner/1"
+
+    routes = {
+        ("GET", "/health"): "health",
+        ("GET", "/stats"): "stats",
+        ("POST", "/generate"): "generate",
+        ("POST", "/update"): "update",
+        ("POST", "/load"): "load",
+        ("POST", "/save"): "save",
+        ("POST", "/export"): "export",
+    }
+
+    def log_message(self, format, *args):
+        pass  # /stats replaces the access log
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        service = self.server.service
+        endpoint = urlsplit(self.path).path
+        name = self.routes.get((method, endpoint))
+        started = time.perf_counter()
+        error = True
+        self._streaming = False  # set once a chunked 200 has been started
+        service.stats.enter()
+        try:
+            if name is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route {method} {endpoint}."})
+                return
+            body = self._body() if method == "POST" else {}
+            with instrument.span(f"service.{name}"):
+                getattr(self, "_" + name)(service, body)
+            error = False
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client went away mid-stream
+        except Exception as e:
+            if self._streaming:
+                # the status line is already out: a JSON error would land inside the chunked body
+                service.stats.count("stream_errors")
+                print(f"{endpoint}: response aborted mid-stream: {type(e).__name__}: {e}", file=sys.stderr)
+                self.close_connection = True
+            elif isinstance(e, Busy):
+                self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {"Retry-After": "1"})
+            elif isinstance(e, FileNotFoundError):
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": str(e)})
+            elif isinstance(e, (ValueError, KeyError, TypeError, RuntimeError)):
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"{type(e).__name__}: {e}"})
+            else:
+                self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            service.stats.leave()
+            service.stats.record(endpoint if name else "unknown", time.perf_counter() - started, error)
+
+    # endpoints
+
+    def _health(self, service, body):
+        self._send_json(HTTPStatus.OK, {"status": "ok", "workers": service.workers,
+                                        "max_pending": service.max_pending})
+
+    def _stats(self, service, body):
+        self._send_json(HTTPStatus.OK, service.stats.snapshot())
+
+    def _generate(self, service, body):
+        fmt = self._format(body)
+        out = str(service.path(body["out"])) if body.get("out") else None
+        params = _confined(service, {k: v for k, v in body.items() if k not in ("format", "out")})
+        key = request_key("generate", body, ignore=("format",))
+        future = service.submit(key, _generate_job, params, service.cache_dir, out)
+        # calendar UIDs are namespaced by the plan's inputs
+        self._send_blocks(future.result(), fmt, plan_namespace(request_key("generate", params)))
+
+    def _update(self, service, body):
+        path = service.path(body["path"])
+        key = request_key("update", body, ignore=("format",))
+        # identical concurrent updates share a result; a different one to a busy file gets a 503
+        # instead of holding a handler thread while it waits for the lock
+        future = service.joined(key)
+        if future is None:
+            with service.exclusive(path):
+                future = service.submit(key, _update_job, _confined(service, body["params"]), str(path),
+                                        body.get("edits") or [])
+                future.result()
+        self._send_blocks(future.result(), self._format(body), plan_namespace(path))
+
+    def _load(self, service, body):
+        start = datetime.fromisoformat(body["from"]) if body.get("from") else None
+        end = datetime.fromisoformat(body["to"]) if body.get("to") else None
+        path = service.path(body["path"])
+        if not path.exists():
+            raise FileNotFoundError(f"No schedule at {body['path']!r}.")
+        with service.admission():
+            self._send_blocks(iter_schedule(path, start=start, end=end, chapter=body.get("chapter")),
+                              self._format(body), plan_namespace(path))
+
+    def _save(self, service, body):
+        target = service.path(body["path"])
+        with service.admission():
+            if "source" in body:
+                blocks = BlockStore(iter_schedule(service.path(body["source"])))
+            else:
+                blocks = BlockStore(StudyBlock.from_dict(d) for d in body.get("blocks") or [])
+            with service.path_lock(target):
+                save_schedule(blocks, target)
+        self._send_json(HTTPStatus.OK, {"path": body["path"], "blocks": len(blocks)})
+
+    def _export(self, service, body):
+        with service.admission():
+            blocks = _blocks_from(body, service)
+            if body.get("out"):
+                target = service.path(body["out"])
+                export_to_ics(blocks, str(target), incremental=bool(body.get("incremental")))
+                self._send_json(HTTPStatus.OK, {"path": body["out"]})
+            else:
+                source = service.path(body["path"]) if "path" in body else request_key("export", body)
+                self._send_stream("text/calendar; charset=utf-8", iter_ics(blocks, plan_namespace(source)))
+
+    # request/response helpers
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(body, dict):
+            raise ValueError("The request body must be a JSON object.")
+        return body
+
+    @staticmethod
+    def _format(body):
+        fmt = body.get("format", "json")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+        return fmt
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_blocks(self, blocks, fmt, namespace):
+        if fmt == "ics":
+            self._send_stream("text/calendar; charset=utf-8", iter_ics(blocks, namespace))
+        elif fmt == "jsonl":
+            self._send_stream("application/x-ndjson", (json.dumps(b.to_dict()) + "\n" for b in blocks))
+        else:
+            self._send_stream("application/json", _json_array(blocks))
+
+    def _send_stream(self, content_type, pieces):
+        """Chunked response from text pieces, sent in chunks of about CHUNK_BYTES."""
+        pieces = iter(pieces)
+        first = next(pieces, "")  # errors before the first byte still get a proper status
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._streaming = True
+        buffer, size = [first], len(first)
+        for piece in pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= CHUNK_BYTES:
+                self._chunk("".join(buffer).encode("utf-8"))
+                buffer, size = [], 0
+        if buffer:
+            self._chunk("".join(buffer).encode("utf-8"))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, data):
+        if data:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+
+
+def _json_array(blocks):
+    yield '{"blocks": ['
+    sep = ""
+    for b in blocks:
+        yield sep + json.dumps(b.to_dict())
+        sep = ",\n"
+    yield "]}"
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=None, max_pending=None, root=".", cache_dir=None):
+    service = ScheduleService(host, port, workers, max_pending, root, cache_dir)
+    print(f"Study planner service on {service.url} (workers: {service.workers}, "
+          f"max pending: {service.max_pending}, root: {service.root})")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
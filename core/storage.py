@@ -1,22 +1,315 @@
 # study_planner/core/storage.py
 import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
+from . import instrument
+from .binary_schedule import BINARY_SUFFIXES, BinarySchedule, is_binary, write_binary
+from .blockstore import BlockStore
+from .progress import total_of, tracked
 from .scheduler import StudyBlock
 
 DEFAULT_SAVE = Path("study_schedule.json")
+DEFAULT_DB = Path("study_schedule.db")
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
 
-def save_schedule(blocks, filename=None):
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+def save_schedule(blocks, filename=None, progress=None, cancel=None):
+    """
+    Write blocks to `filename`: SQLite for .db/.sqlite, one JSON object per
+    line for .jsonl/.ndjson, the mmap-able binary format for .ssb, otherwise
+    the legacy indented JSON array. Files are written to a temporary file,
+    synced to disk and swapped in with os.replace, so a cancelled, failed or
+    crashed save leaves the old file intact. progress/cancel: see core/progress.py.
+    """
     filename = filename or DEFAULT_SAVE
-    data = [b.to_dict() for b in blocks]
-    with open(filename, "w", encoding="utf-8") as f:
+    with instrument.span("storage.save"):
+        if instrument.enabled():
+            instrument.count("storage.blocks_saved", total_of(blocks) or 0)
+        return _save(tracked(blocks, progress, cancel, "Saving"), filename)
+
+def _save(blocks, filename):
+    if _is_sqlite(filename):
+        backend = SQLiteBackend(filename)
+        try:
+            backend.save_all(blocks)
+        finally:
+            backend.close()
+        return filename
+    if Path(filename).suffix.lower() in JSONL_SUFFIXES:
+        return write_schedule_lines(blocks, filename)
+    if Path(filename).suffix.lower() in BINARY_SUFFIXES:
+        with _atomic(filename) as tmp:
+            write_binary(blocks, tmp)
+        return filename
+    with instrument.span("storage.save.serialize"):
+        data = [b.to_dict() for b in blocks]
+    with instrument.span("storage.save.write"), _replacing(filename) as f:
         json.dump(data, f, indent=2)
     return filename
 
-def load_schedule(filename=None):
+def load_schedule(filename=None, progress=None, cancel=None):
+    """Load every block into a BlockStore; the file format is detected automatically."""
     filename = filename or DEFAULT_SAVE
-    p = Path(filename)
-    if not p.exists():
-        return []
+    if not Path(filename).exists():
+        return BlockStore()
+    with instrument.span("storage.load"):
+        store = BlockStore(tracked(iter_schedule(filename), progress, cancel, "Loading"))
+    instrument.count("storage.blocks_loaded", len(store))
+    return store
+
+def write_schedule_lines(blocks, filename):
+    """Stream blocks from any iterable to a JSON Lines file, one block per line."""
+    with _replacing(filename) as f:
+        for b in blocks:
+            f.write(json.dumps(b.to_dict()))
+            f.write("\n")
+    return filename
+
+@contextmanager
+def _atomic(filename):
+    """Yield a temp path next to `filename`; it replaces `filename` only if the block succeeds."""
+    tmp = f"{filename}.tmp"
+    try:
+        yield tmp
+        _sync(tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _sync(path):
+    # data must be on disk before the rename, or a crash can swap in an empty file
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def _replacing(filename):
+    """Open a temp file next to `filename` for writing; replace `filename` only on success."""
+    with _atomic(filename) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        yield f
+
+def iter_schedule(filename=None, start=None, end=None, chapter=None):
+    """
+    Yield StudyBlocks from a schedule file without loading it all first.
+    JSON Lines files are read line by line and only matching rows become
+    StudyBlocks; legacy JSON arrays have to be parsed whole, then filtered.
+    Filters: chapter equality and start <= block start < end (None = open).
+    """
+    filename = filename or DEFAULT_SAVE
+    if _is_sqlite(filename):
+        backend = SQLiteBackend(filename)
+        try:
+            yield from backend.query(chapter=chapter, start=start, end=end)
+        finally:
+            backend.close()
+        return
+    if is_binary(filename):
+        with BinarySchedule(filename) as sched:
+            lo = 0 if start is None else sched.index_at_or_after(start)
+            hi = len(sched) if end is None else sched.index_at_or_after(end)
+            for i in range(lo, hi):
+                b = sched[i]
+                if chapter is None or b.chapter == chapter:
+                    yield b
+        return
     with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [StudyBlock.from_dict(d) for d in data]
+        if _sniff(f) == "[":
+            rows = json.load(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for d in rows:
+            if chapter is not None and d["chapter"] != chapter:
+                continue
+            if start is not None or end is not None:
+                begins = datetime.fromisoformat(d["start"])
+                if (start is not None and begins < start) or (end is not None and begins >= end):
+                    continue
+            yield StudyBlock.from_dict(d)
+
+def _sniff(f):
+    """First non-whitespace character of an open text file; rewinds the file."""
+    while True:
+        chunk = f.read(64)
+        if not chunk or chunk.strip():
+            f.seek(0)
+            return chunk.strip()[:1]
+
+def _is_sqlite(filename):
+    return Path(filename).suffix.lower() in SQLITE_SUFFIXES
+
+def open_backend(filename=None):
+    """Pick a storage backend from the file extension (.db/.sqlite -> SQLite, else JSON)."""
+    filename = filename or DEFAULT_DB
+    return SQLiteBackend(filename) if _is_sqlite(filename) else JsonBackend(filename)
+
+
+class JsonBackend:
+    """
+    Backend interface over the JSON file format. JSON has no per-row updates,
+    so every change is applied to the store last loaded/saved and the whole
+    file is rewritten. The file is loaded on first use, so an edit through a
+    backend that was never load()ed keeps the rest of the file.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = Path(filename or DEFAULT_SAVE)
+        self._store = None  # loaded on first use
+
+    def load(self):
+        self._store = load_schedule(self.filename) if self.filename.exists() else BlockStore()
+        return self._store
+
+    def _current(self):
+        return self._store if self._store is not None else self.load()
+
+    def save_all(self, blocks):
+        self._store = BlockStore.wrap(blocks)
+        save_schedule(self._store, self.filename)
+
+    def update_blocks(self, blocks):
+        # usually the store's own (already edited) blocks; copies, e.g. from AutoSaver, replace them
+        store = self._current()
+        for b in blocks:
+            if store.get(b.block_id) is not b:
+                if store.get(b.block_id) is not None:
+                    store.remove(b.block_id)
+                store.add(b)
+        save_schedule(store, self.filename)
+
+    def update_block(self, block):
+        self.update_blocks([block])
+
+    def delete_block(self, block_id):
+        store = self._current()
+        if store.get(block_id) is not None:
+            store.remove(block_id)
+        save_schedule(store, self.filename)
+
+    def clear_completed(self):
+        store = self._current()
+        for b in store:
+            b.completed = False
+        save_schedule(store, self.filename)
+
+    def import_json(self, filename):
+        self.save_all(load_schedule(filename))
+
+    def export_json(self, filename):
+        return save_schedule(self._current(), filename)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """
+    Local SQLite storage: one row per block, indexed by chapter and start time.
+    Click paths (complete, delete, clear) are single statements; a new
+    schedule is written with one transactional bulk insert. The connection
+    may be shared with worker threads; statements are serialized by a lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blocks (
+            id INTEGER PRIMARY KEY,
+            chapter TEXT NOT NULL,
+            start TEXT NOT NULL,
+            end TEXT NOT NULL,
+            mode TEXT NOT NULL DEFAULT 'Study',
+            completed INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS blocks_by_start ON blocks (start);
+        CREATE INDEX IF NOT EXISTS blocks_by_chapter ON blocks (chapter, start);
+    """
+
+    def __init__(self, filename=None):
+        self.filename = Path(filename or DEFAULT_DB)
+        self.conn = sqlite3.connect(str(self.filename), check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock:
+            self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _row(block):
+        return (block.block_id, block.chapter, block.start_time.isoformat(),
+                block.end_time.isoformat(), block.mode, int(bool(block.completed)))
+
+    @staticmethod
+    def _block(row):
+        block_id, chapter, start, end, mode, completed = row
+        b = StudyBlock(chapter, datetime.fromisoformat(start), datetime.fromisoformat(end), mode, block_id)
+        b.completed = bool(completed)
+        return b
+
+    def load(self):
+        return BlockStore(self.query())
+
+    def query(self, chapter=None, start=None, end=None):
+        """Yield blocks in start order, filtered by chapter and/or [start, end) via the indexes."""
+        sql = "SELECT id, chapter, start, end, mode, completed FROM blocks"
+        where, args = [], []
+        if chapter is not None:
+            where.append("chapter = ?")
+            args.append(chapter)
+        if start is not None:
+            where.append("start >= ?")
+            args.append(start.isoformat())
+        if end is not None:
+            where.append("start < ?")
+            args.append(end.isoformat())
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            cursor = self.conn.execute(sql + " ORDER BY start, id", args)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield self._block(row)
+
+    def save_all(self, blocks):
+        """Replace the stored schedule in one transaction."""
+        store = BlockStore.wrap(blocks)  # makes sure every block has an id
+        with instrument.span("storage.sqlite.save_all"), self._lock, self.conn:
+            self.conn.execute("DELETE FROM blocks")
+            self.conn.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                                  (self._row(b) for b in store))
+
+    def update_blocks(self, blocks):
+        """Upsert changed blocks (completed flag, relabels) in one transaction."""
+        with instrument.span("storage.sqlite.update"), self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                                  (self._row(b) for b in blocks))
+
+    def update_block(self, block):
+        self.update_blocks([block])
+
+    def delete_block(self, block_id):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM blocks WHERE id = ?", (block_id,))
+
+    def clear_completed(self):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE blocks SET completed = 0 WHERE completed != 0")
+
+    def import_json(self, filename):
+        """Load a legacy JSON schedule file into this database, replacing its contents."""
+        self.save_all(load_schedule(filename))
+
+    def export_json(self, filename):
+        return save_schedule(self.query(), filename)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
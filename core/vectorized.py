@@ -0,0 +1,128 @@
+# study_planner/core/vectorized.py
+"""
+Optional NumPy engine for slot generation.
+
+Mirrors SmartScheduler._compute_daily_slots / _capacity / _make_time_slots
+but works on arrays (per-day counts, int64 epoch minutes) instead of Python
+loops and per-slot datetime objects. Cutoffs
+(past time, midnight, exam) are applied as boolean masks and rows only become
+StudyBlock objects in SlotTable.to_blocks. The pure-Python path in
+core/scheduler.py stays the reference implementation; results must match it.
+
+numpy is imported on first use, not at import time, so headless startup
+and schedulers that end up on the python engine don't pay for it.
+"""
+import importlib.util
+from datetime import datetime, timedelta, time
+
+np = None  # bound by _numpy()
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+ENGINES = ("auto", "python", "numpy")
+
+
+def available():
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def resolve_engine(engine):
+    """Map "auto" to "numpy" when numpy is importable, else "python"."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown slot engine {engine!r}; expected one of {', '.join(ENGINES)}.")
+    if engine == "auto":
+        return "numpy" if available() else "python"
+    if engine == "numpy" and not available():
+        raise ValueError("The numpy slot engine was requested but numpy is not installed.")
+    return engine
+
+
+def to_epoch_minutes(dt):
+    """Whole minutes since 1970-01-01 (naive), rounded up for partial minutes."""
+    return -(-(dt - EPOCH) // MINUTE)
+
+
+def from_epoch_minutes(minutes):
+    return EPOCH + timedelta(minutes=int(minutes))
+
+
+def compute_daily_slots(total_days, base_daily_limit, ramp_factor):
+    """Array version of SmartScheduler._compute_daily_slots (same float ops, same rounding)."""
+    np = _numpy()
+    progress = np.arange(1, total_days + 1, dtype=np.float64) / max(1, total_days)
+    ramp_multiplier = 1 + ramp_factor * progress
+    return np.maximum(1, np.ceil(base_daily_limit * ramp_multiplier)).astype(np.int64)
+
+
+def capacity(slots_per_day, layouts):
+    """Array version of SmartScheduler._capacity for a slots_per_day array."""
+    np = _numpy()
+    first = np.fromiter((f for f, _, _ in layouts), dtype=np.int64, count=len(layouts))
+    cap = np.fromiter((c for _, c, _ in layouts), dtype=np.int64, count=len(layouts))
+    usable = np.minimum(slots_per_day, cap) - first
+    return int(usable[slots_per_day > first].sum())
+
+
+class SlotTable:
+    """Candidate slots as parallel int64 arrays of start/end epoch minutes."""
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        return int(self.starts.shape[0])
+
+    @staticmethod
+    def _datetimes(minutes):
+        # datetime64 -> object conversion builds the datetimes in C
+        return minutes.astype("datetime64[m]").astype(object).tolist()
+
+    def start_times(self):
+        return self._datetimes(self.starts)
+
+    def to_blocks(self, chapters, modes):
+        """Materialize StudyBlocks; chapters/modes are per-row sequences."""
+        from .scheduler import StudyBlock
+        return [
+            StudyBlock(chapter, start, end, mode)
+            for chapter, start, end, mode in zip(chapters, self._datetimes(self.starts),
+                                                 self._datetimes(self.ends), modes)
+        ]
+
+
+def make_slot_table(scheduler, slots_per_day, now):
+    """
+    Array version of SmartScheduler._make_time_slots.
+    Returns a SlotTable with the same rows, in the same order.
+    """
+    np = _numpy()
+    slots_per_day = np.asarray(slots_per_day, dtype=np.int64)
+    total_days = slots_per_day.shape[0]
+    step = scheduler.block_minutes + scheduler.break_minutes
+    block = scheduler.block_minutes
+    day_offset = scheduler.day_start_hour * 60
+
+    # positions past midnight can never be used, so cap before expanding rows
+    midnight_cap = max(0, (24 * 60 - day_offset - block) // step + 1)
+    counts = np.minimum(slots_per_day, midnight_cap)
+
+    today = to_epoch_minutes(datetime.combine(now.date(), time(0, 0)))
+    day_starts = today + day_offset + 24 * 60 * np.arange(total_days, dtype=np.int64)
+
+    row_day = np.repeat(np.arange(total_days, dtype=np.int64), counts)
+    first_row = np.cumsum(counts) - counts
+    position = np.arange(row_day.shape[0], dtype=np.int64) - np.repeat(first_row, counts)
+
+    starts = day_starts[row_day] + position * step
+    ends = starts + block
+    keep = (starts >= to_epoch_minutes(now)) & (ends < to_epoch_minutes(scheduler.exam_datetime))
+    return SlotTable(starts[keep], ends[keep])
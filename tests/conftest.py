@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.blockstore import BlockStore
+from core.scheduler import StudyBlock
+
+T0 = datetime(2031, 1, 1, 9, 0)
+
+
+def _make_blocks(n, chapters=3, minutes=45, step=timedelta(hours=1), study=None, name="C{chapter}", t0=T0):
+    """
+    n start-sorted blocks, one per `step` from t0, cycling through `chapters`
+    chapters. `name` is formatted with chapter (i % chapters) and i; the
+    first `study` blocks are Study and the rest Revision (all Study if None).
+    """
+    return [StudyBlock(name.format(chapter=i % chapters, i=i), t0 + i * step, t0 + i * step + timedelta(minutes=minutes),
+                       "Study" if study is None or i < study else "Revision")
+            for i in range(n)]
+
+
+@pytest.fixture
+def make_blocks():
+    return _make_blocks
+
+
+@pytest.fixture
+def make_store():
+    return lambda n, **options: BlockStore(_make_blocks(n, **options))
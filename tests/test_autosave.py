@@ -0,0 +1,130 @@
+import time
+
+import pytest
+
+from core.autosave import AutoSaver
+from core.storage import JsonBackend, SQLiteBackend, load_schedule
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.attempts = 0
+
+    def _record(self, *call):
+        self.attempts += 1
+        if self.fail:
+            raise OSError("disk full")
+        self.calls.append(call)
+
+    def save_all(self, blocks):
+        self._record("save_all", len(blocks))
+
+    def update_blocks(self, blocks):
+        self._record("update", sorted((b.block_id, b.completed) for b in blocks))
+
+    def delete_block(self, block_id):
+        self._record("delete", block_id)
+
+    def clear_completed(self):
+        self._record("clear")
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_burst_of_edits_is_written_once_in_the_background(make_blocks):
+    backend = RecordingBackend()
+    saver = AutoSaver(backend, delay=0.05)
+    blocks = make_blocks(3)
+    for i, b in enumerate(blocks):
+        b.block_id = i + 1
+    for _ in range(20):
+        for b in blocks:
+            b.completed = not b.completed
+            saver.update_block(b)  # returns without writing
+    saver.delete_block(3)
+    assert backend.calls == []
+    assert _wait_for(lambda: not saver.pending)
+    assert backend.calls == [("delete", 3), ("update", [(1, False), (2, False)])]
+    saver.close()
+
+
+def test_clear_completed_is_ordered_against_updates(make_blocks):
+    backend = RecordingBackend()
+    saver = AutoSaver(backend, delay=60)
+    a, b = make_blocks(2)
+    a.block_id, b.block_id = 1, 2
+    a.completed = True
+    saver.update_block(a)
+    saver.clear_completed()
+    b.completed = True
+    saver.update_block(b)
+    saver.flush()
+    assert backend.calls == [("clear",), ("update", [(1, False), (2, True)])]
+    saver.close()
+
+
+def test_failed_write_keeps_changes_for_the_next_flush(make_blocks):
+    backend = RecordingBackend()
+    saver = AutoSaver(backend, delay=60)
+    saver.save_all(make_blocks(4))
+    backend.fail = True
+    with pytest.raises(OSError):
+        saver.flush()
+    saver.delete_block(1)
+    backend.fail = False
+    saver.close()
+    assert backend.calls == [("save_all", 4), ("delete", 1)]
+    assert saver.error is None and not saver.pending
+
+
+def test_failing_target_is_retried_with_backoff_and_reported_once():
+    backend = RecordingBackend()
+    backend.fail = True
+    now = [0.0]
+    saver = AutoSaver(backend, delay=1, max_delay=1, clock=lambda: now[0])
+    saver.delete_block(1)
+    gaps = []
+    for _ in range(8):
+        with pytest.raises(OSError):
+            saver.flush()
+        gaps.append(saver._retry_at - now[0])
+        now[0] += 1
+    assert gaps == [2, 4, 8, 16, 32, 60, 60, 60]  # doubling, capped at RETRY_MAX_DELAY
+    assert saver.pending and isinstance(saver.error, OSError)
+    backend.fail = False
+    saver.close()
+    assert backend.calls == [("delete", 1)] and saver.failures == 0 and saver._retry_at == 0
+
+    # failures on the background thread are reported once per failing run
+    backend = RecordingBackend()
+    backend.fail = True
+    errors = []
+    saver = AutoSaver(backend, delay=0.001, max_delay=0.001, on_error=errors.append)
+    saver.delete_block(1)
+    assert _wait_for(lambda: saver.failures >= 3)
+    assert len(errors) == 1 and isinstance(errors[0], OSError)
+    backend.fail = False
+    saver.close()
+    assert backend.calls == [("delete", 1)]
+
+
+@pytest.mark.parametrize("name, backend_cls", [("s.json", JsonBackend), ("s.db", SQLiteBackend)])
+def test_real_backends_receive_snapshots(tmp_path, name, backend_cls, make_blocks):
+    backend = backend_cls(tmp_path / name)
+    saver = AutoSaver(backend, delay=60)
+    blocks = make_blocks(5)
+    saver.save_all(blocks)
+    blocks[2].completed = True
+    saver.update_block(blocks[2])
+    saver.delete_block(blocks[0].block_id)
+    saver.close()
+    stored = load_schedule(tmp_path / name)
+    assert len(stored) == 4 and stored.get(blocks[2].block_id).completed
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from core.batch import run_batch, read_params
+
+
+def _exam(days):
+    return (datetime.now() + timedelta(days=days)).replace(microsecond=0).isoformat()
+
+
+def test_run_batch_jsonl(tmp_path):
+    src = tmp_path / "students.jsonl"
+    rows = [
+        {"student_id": "alice", "chapters": ["A", "B"], "exam": _exam(5), "block_minutes": 30, "random_seed": 7},
+        {"student_id": "bob", "chapters": ["C"], "exam": _exam(3), "block_minutes": 45, "random_seed": 7},
+        {"student_id": "carol", "chapters": [], "exam": _exam(3)},
+    ]
+    src.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+    results = {r[0]: r for r in run_batch(src, tmp_path / "out", workers=2)}
+    assert results["alice"][3] is None and results["alice"][2] >= 2
+    assert json.loads((tmp_path / "out" / "alice.json").read_text())[0]["chapter"] in ("A", "B")
+    assert results["carol"][1] is None and "chapter" in results["carol"][3]
+
+
+def test_batch_is_reproducible_with_seed(tmp_path):
+    src = tmp_path / "students.csv"
+    titles = "|".join(f"Chapter {i} with a fairly long descriptive title" for i in range(12))
+    src.write_text(f"student_id,chapters,exam,block_minutes,random_seed\ns1,{titles},{_exam(9)},40,3\n",
+                   encoding="utf-8")
+    assert read_params(src).__next__()["chapters"].count("|") == 11
+    list(run_batch(src, tmp_path / "one", workers=1))
+    list(run_batch(src, tmp_path / "two", workers=2))
+    assert (tmp_path / "one" / "s1.json").read_text() == (tmp_path / "two" / "s1.json").read_text()
+
+
+def test_colliding_student_ids_get_distinct_files_and_bad_format_fails_early(tmp_path):
+    src = tmp_path / "students.jsonl"
+    ids = ["a b", "a_b", "a_b", "A_B"]
+    src.write_text("\n".join(json.dumps({"student_id": i, "chapters": [f"Ch {n}"], "exam": _exam(4)})
+                             for n, i in enumerate(ids)), encoding="utf-8")
+    results = list(run_batch(src, tmp_path / "out", workers=1))
+    # workers=1 keeps the input order
+    assert [Path(r[1]).name for r in results] == ["a_b.json", "a_b-2.json", "a_b-3.json", "A_B-4.json"]
+    chapters = {json.loads(Path(r[1]).read_text())[0]["chapter"] for r in results}
+    assert chapters == {"Ch 0", "Ch 1", "Ch 2", "Ch 3"}
+
+    with pytest.raises(ValueError, match="Unknown output format"):
+        run_batch(src, tmp_path / "never", fmt="pdf")
+    assert not (tmp_path / "never").exists()
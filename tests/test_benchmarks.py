@@ -0,0 +1,23 @@
+from benchmarks.bench_suite import compare, run
+from benchmarks.workloads import SIZES, make_workload
+from core.scheduler import SmartScheduler
+
+
+def test_workloads_fit_their_horizon():
+    for chapters, days in SIZES.values():
+        if chapters <= 1000:
+            kwargs = make_workload(chapters, days)
+            assert len(kwargs["chapter_titles"]) == chapters
+            assert len(SmartScheduler(**kwargs).generate_schedule().chapters()) == chapters
+
+
+def test_suite_results_and_regression_check():
+    current = run(["tiny"], repeat=1)
+    assert {"generate[tiny]", "load.ssb[tiny]", "export.ics[tiny]", "tree_refresh[tiny]"} <= set(current["results"])
+    assert compare(current, current) == []
+
+    slow = {"results": {k: dict(v, wall_s=v["wall_s"] * 10 + 1) for k, v in current["results"].items()}}
+    assert len(compare(slow, current)) == len(current["results"])
+    # small absolute differences are treated as noise
+    noisy = {"results": {"generate[tiny]": {"wall_s": 0.0015, "peak_kib": 10}}}
+    assert compare(noisy, {"results": {"generate[tiny]": {"wall_s": 0.001, "peak_kib": 10}}}) == []
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.bench_suite import HeadlessTree
+from core.binary_schedule import BinarySchedule, binary_to_json, json_to_binary
+from core.scheduler import StudyBlock
+from core.storage import iter_schedule, load_schedule, save_schedule
+from ui.schedule_view import ScheduleView
+
+
+def test_binary_round_trip_and_in_place_update(tmp_path, make_store):
+    store = make_store(10, minutes=50, study=3, name="Chapter {chapter} – é")
+    store[4].completed = True
+    json_file, bin_file = tmp_path / "s.json", tmp_path / "s.ssb"
+    save_schedule(store, json_file)
+    json_to_binary(json_file, bin_file)
+
+    with BinarySchedule(bin_file) as sched:
+        assert len(sched) == 10 and len(sched.chapter_names) == 3
+        assert [b.to_dict() for b in sched] == [b.to_dict() for b in store]
+        assert sched.index_at_or_after(store[6].start_time - timedelta(minutes=1)) == 6
+
+    with BinarySchedule(bin_file, writable=True) as sched:
+        sched.set_completed(7)
+        sched.set_completed(4, False)
+    reloaded = load_schedule(bin_file)
+    assert reloaded[7].completed and not reloaded[4].completed
+    assert [b.block_id for b in reloaded] == [b.block_id for b in store]
+
+    picked = list(iter_schedule(bin_file, start=store[2].start_time, end=store[8].start_time, chapter="Chapter 1 – é"))
+    assert [b.block_id for b in picked] == [store[4].block_id, store[7].block_id]
+
+    binary_to_json(bin_file, tmp_path / "back.json")
+    assert len(load_schedule(tmp_path / "back.json")) == 10
+
+
+def test_binary_rejects_sub_minute_times(tmp_path):
+    b = StudyBlock("A", datetime(2031, 1, 1, 9, 0, 30), datetime(2031, 1, 1, 10, 0))
+    with pytest.raises(ValueError):
+        save_schedule([b], tmp_path / "bad.ssb")
+
+
+def test_schedule_view_pages_a_binary_schedule_in_place(tmp_path, make_store):
+    store = make_store(1000, chapters=4)
+    store[10].completed = True
+    save_schedule(store, tmp_path / "big.ssb")
+    with BinarySchedule(tmp_path / "big.ssb", writable=True) as sched:
+        view = ScheduleView(HeadlessTree(), page_size=50)
+        view.show(sched)
+        assert view.loaded == 50 and view.total() == 1000
+        view.load_more()
+        assert list(view.tree.rows) == [str(b.block_id) for b in store[:100]]
+
+        view.show(sched, chapter="C2", start=store[100].start_time, end=store[200].start_time)
+        assert [int(iid) for iid in view.tree.rows] == [b.block_id for b in store.by_chapter("C2")
+                                                        if store[100].start_time <= b.start_time < store[200].start_time]
+
+        b = sched.get(store[10].block_id)
+        assert b.completed and b in sched and sched.index_of(b) == 10
+        assert sched.get(10 ** 6) is None and StudyBlock("C0", b.start_time, b.end_time) not in sched
+        sched.clear_completed()
+    assert not any(b.completed for b in load_schedule(tmp_path / "big.ssb"))
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from core.blockstore import BlockStore
+from core.scheduler import StudyBlock
+from core.storage import load_schedule, save_schedule
+
+
+def test_store_orders_indexes_and_removes(make_blocks):
+    blocks = make_blocks(9, minutes=30)
+    store = BlockStore(reversed(blocks))
+    assert list(store) == blocks
+    assert store[0] is blocks[0] and len(store) == 9
+    assert sorted(b.block_id for b in store) == list(range(1, 10))
+    assert store.by_chapter("C1") == blocks[1::3]
+    assert store.by_chapter("C1", blocks[2].start_time, blocks[7].start_time) == [blocks[4]]
+    assert store.chapter_span("C1", end=blocks[7].start_time) == (0, 2) and store.chapter_span("C9") == (0, 0)
+    assert store.between(blocks[2].start_time, blocks[5].start_time) == blocks[2:5]
+    assert store.index_at_or_after(blocks[4].start_time + timedelta(minutes=1)) == 5
+
+    removed = store.remove(blocks[4].block_id)
+    assert removed is blocks[4] and removed not in store
+    assert store.by_chapter("C1") == [blocks[1], blocks[7]]
+
+    store.relabel(blocks[7], "C0", "Revision")
+    assert blocks[7] in store.by_chapter("C0") and store.by_chapter("C1") == [blocks[1]]
+
+
+def test_ids_survive_save_and_load(tmp_path, make_store):
+    store = make_store(4, minutes=30)
+    store.remove(store[1])
+    fname = tmp_path / "s.json"
+    save_schedule(store, fname)
+    loaded = load_schedule(fname)
+    assert [b.block_id for b in loaded] == [b.block_id for b in store]
+    loaded.add(StudyBlock("new", datetime(2032, 1, 1), datetime(2032, 1, 1, 1)))
+    assert loaded[-1].block_id == 5
+
+
+def test_blocks_with_equal_starts_are_ordered_by_id(make_store):
+    store = make_store(5, chapters=5, minutes=30, step=timedelta(0))
+    t0 = store[0].start_time
+    store.add(StudyBlock("early", t0 - timedelta(hours=1), t0))
+    middle = store[3]
+    assert store.index_of(middle) == 3
+    store.remove(middle)
+    assert [b.chapter for b in store] == ["early", "C0", "C1", "C3", "C4"]
+    assert store.index_of(store[3]) == 3
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.busy import BusyCalendar, BusyIndex, WeeklyRule
+from core.ics_import import parse_events
+from core.schedule_cache import cache_key
+from core.scheduler import SmartScheduler
+
+NOW = datetime(2031, 3, 3, 8, 0)  # a Monday
+CHAPTERS = [f"Chapter {i}" for i in range(30)]
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART:20310303T120000
+DTEND:20310303T133000
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=3
+EXDATE:20310305T120000
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20310308
+END:VEVENT
+BEGIN:VEVENT
+DTSTART:20310304T100000
+DURATION:PT1H
+TRANSP:TRANSPARENT
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def _scheduler(**kwargs):
+    return SmartScheduler(CHAPTERS, 45, NOW + timedelta(days=10), break_minutes=15, engine="python", **kwargs)
+
+
+def test_rules_and_ics_events_expand_into_the_window():
+    assert str(WeeklyRule.parse("weekdays 9-17")) == "Mon,Tue,Wed,Thu,Fri 09:00-17:00"
+    assert WeeklyRule.parse("Fri-Mon 22:00-06:00").weekdays == {4, 5, 6, 0}
+    with pytest.raises(ValueError):
+        WeeklyRule.parse("someday 09:00-10:00")
+
+    events = list(parse_events(ICS))
+    assert len(events) == 2  # the transparent event is free time
+    window = (NOW, NOW + timedelta(days=14))
+    lunches = list(events[0].occurrences(*window))
+    # Mon 3rd, (Wed 5th excluded), Mon 10th; COUNT=3 ends the series
+    assert [s.day for s, _ in lunches] == [3, 10]
+    assert list(events[1].occurrences(*window)) == [(datetime(2031, 3, 8), datetime(2031, 3, 9))]
+
+    overnight = BusyCalendar(rules=["daily 23:00-07:00"]).index(datetime(2031, 3, 3), datetime(2031, 3, 4))
+    assert list(overnight)[0] == (datetime(2031, 3, 2, 23), datetime(2031, 3, 3, 7))
+
+
+def test_index_merges_and_finds_free_time():
+    t = datetime(2031, 3, 3, 9)
+    index = BusyIndex([(t, t + timedelta(hours=1)), (t + timedelta(minutes=30), t + timedelta(hours=2)),
+                       (t + timedelta(hours=2, minutes=30), t + timedelta(hours=3))])
+    assert len(index) == 2
+    assert index.overlaps(t + timedelta(hours=1), t + timedelta(hours=1, minutes=1))
+    assert not index.overlaps(t + timedelta(hours=2), t + timedelta(hours=2, minutes=30))
+    # a 45 minute gap does not fit between the intervals, so the slot moves past both
+    assert index.next_free(t, timedelta(minutes=45)) == t + timedelta(hours=3)
+    assert index.next_free(t, timedelta(minutes=30)) == t + timedelta(hours=2)
+
+
+def test_schedule_avoids_busy_time_and_counts_only_free_slots():
+    busy = BusyCalendar(rules=["Mon-Fri 09:00-17:00", "daily 22:00-07:00"])
+    busy.add_range(datetime(2031, 3, 8, 0, 0), datetime(2031, 3, 9, 0, 0))
+    for event in parse_events(ICS):
+        busy.events.append(event)
+    sched = _scheduler(busy=busy)
+    blocks = sched.generate_schedule(now=NOW)
+    index = sched._busy_index(NOW)
+    assert not any(index.overlaps(b.start_time, b.end_time) for b in blocks)
+    assert {b.chapter for b in blocks} == set(CHAPTERS)
+    assert all(b.start_time.date() != datetime(2031, 3, 8).date() for b in blocks)
+
+    # weekdays 17:00-22:00 hold exactly five one-hour slots
+    layout = sched._day_layout(NOW.date(), NOW)
+    assert layout[:2] == (0, 5) and layout[2] == [(datetime(2031, 3, 3, 17), 5)]
+
+
+def test_empty_calendar_matches_free_schedule_and_busy_changes_cache_key():
+    free = _scheduler()
+    empty = _scheduler(busy=[])
+    as_tuples = lambda blocks: [(b.chapter, b.start_time, b.end_time, b.mode) for b in blocks]
+    assert as_tuples(free.generate_schedule(now=NOW)) == as_tuples(empty.generate_schedule(now=NOW))
+    assert cache_key(free, NOW) != cache_key(_scheduler(busy=["Sat 10:00-11:00"]), NOW)
+
+
+def test_busy_time_that_leaves_no_room_is_reported():
+    with pytest.raises(RuntimeError, match="outside busy time"):
+        _scheduler(busy=["daily 00:00-24:00"]).generate_schedule(now=NOW)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import chapter_meta
+from core.chapter_meta import ChapterMetaStore, learned_difficulty
+from core.scheduler import ScheduleEdit, SmartScheduler
+
+TITLES = ["Algebra", "Geometry of curves and surfaces", "Optics", "Waves and oscillations in media"]
+
+
+def _scheduler(store=None, titles=TITLES, seed=3):
+    return SmartScheduler(chapter_titles=titles, block_minutes=45, exam_datetime=datetime.now() + timedelta(days=6),
+                          random_seed=seed, meta_store=store)
+
+
+def test_store_matches_batch_estimate_and_only_estimates_new_titles(tmp_path, monkeypatch):
+    store = ChapterMetaStore(tmp_path / "meta.db")
+    plain = _scheduler()
+    assert _scheduler(store).chapters_meta == plain.chapters_meta
+    assert [m[1:] for m in plain.chapters_meta] == chapter_meta.estimate(TITLES, 3)
+
+    estimated = []
+    real = chapter_meta.estimate
+    monkeypatch.setattr(chapter_meta, "estimate", lambda titles, seed=None: estimated.append(list(titles))
+                        or real(titles, seed))
+    scheduler = _scheduler(store)
+    scheduler.reschedule(scheduler.generate_schedule(), ScheduleEdit.add_chapter("Thermodynamics"))
+    assert estimated == [["Thermodynamics"]]
+    _scheduler(store, seed=4)  # another seed is another set of scores
+    assert estimated[-1] == TITLES
+    store.close()
+
+    reopened = ChapterMetaStore(tmp_path / "meta.db")
+    estimated.clear()
+    assert _scheduler(reopened).chapters_meta == plain.chapters_meta and estimated == []
+    reopened.close()
+
+
+def test_slow_completions_raise_difficulty_and_reorder_chapters(tmp_path):
+    store = ChapterMetaStore(tmp_path / "meta.db")
+    before = _scheduler(store)
+    last = before._chapter_queue()[-1]
+    for _ in range(4):
+        store.record_completion(" " + last.upper() + " ", 45, 120)  # history is shared by normalized title
+    after = _scheduler(store)
+    old = dict((t, d) for t, d, _ in before.chapters_meta)[last]
+    assert dict((t, d) for t, d, _ in after.chapters_meta)[last] > old
+    assert after._chapter_queue().index(last) < before._chapter_queue().index(last)
+
+    store.record_completion("Unrelated", 45, 45)
+    many = [f"Extra {i}" for i in range(1200)] + [last]  # more titles than one IN (...) batch
+    assert store.history(many) == {chapter_meta.normalize_title(last): (4, 180.0, 480.0)}
+
+    with pytest.raises(ValueError):
+        store.record_completion(last, 45, 0)
+    store.close()
+
+
+def test_learned_difficulty_grows_with_evidence():
+    assert learned_difficulty(3, 0, 0, 0) == 3
+    assert learned_difficulty(3, 1, 60, 60) == 3
+    assert learned_difficulty(3, 1, 60, 120) == 4  # one doubling, a third of the weight
+    assert learned_difficulty(3, 8, 480, 960) == 5
+    assert learned_difficulty(3, 8, 480, 240) == 1
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from core.cli import main
+from core.storage import load_schedule
+
+
+def test_cli_generate_save_load_export(tmp_path, capsys):
+    exam = (datetime.now() + timedelta(days=6)).replace(second=0, microsecond=0).isoformat()
+    plan = tmp_path / "plan.json"
+    assert main(["generate", "--chapters", "Algebra|Geometry", "--exam", exam,
+                 "--seed", "3", "-o", str(plan)]) == 0
+    blocks = load_schedule(plan)
+    assert {b.chapter for b in blocks} == {"Algebra", "Geometry"}
+
+    assert main(["save", str(plan), str(tmp_path / "plan.db")]) == 0
+    assert [b.to_dict() for b in load_schedule(tmp_path / "plan.db")] == [b.to_dict() for b in blocks]
+
+    capsys.readouterr()
+    assert main(["load", str(tmp_path / "plan.db"), "--chapter", "Algebra", "--summary"]) == 0
+    count = sum(1 for b in blocks if b.chapter == "Algebra")
+    assert capsys.readouterr().out.strip() == f"{count} blocks, 0 completed"
+
+    assert main(["export", str(plan), str(tmp_path / "plan.ics")]) == 0
+    assert (tmp_path / "plan.ics").read_text().count("BEGIN:VEVENT") == len(blocks)
+
+
+def test_cli_reports_errors(tmp_path, capsys):
+    assert main(["load", str(tmp_path / "missing.json")]) == 1
+    assert "error:" in capsys.readouterr().err
@@ -1,5 +1,9 @@
+import re
 from datetime import datetime, timedelta
-from core.exporter import export_to_ics
+
+import pytest
+
+from core.exporter import export_to_ics, iter_ics, plan_namespace
 from core.scheduler import StudyBlock
 
 
@@ -13,3 +17,61 @@ def test_export_to_ics(tmp_path):
     assert fname.exists()
     content = fname.read_text(encoding="utf-8")
     assert "BEGIN:VCALENDAR" in content or "BEGIN:VEVENT" in content
+
+
+@pytest.fixture
+def plan(make_store):
+    # spans a month boundary; a new store (ids from 1) on every call
+    return lambda: make_store(4, chapters=2, step=timedelta(days=1), name="Chapter {chapter}; part, {i}",
+                              t0=datetime(2031, 1, 30, 9, 0))
+
+
+def test_export_streams_valid_events(tmp_path, plan):
+    fname = tmp_path / "plan.ics"
+    export_to_ics(plan(), fname)
+    content = fname.read_bytes().decode("utf-8")
+    assert content.startswith("BEGIN:VCALENDAR\r\n") and content.endswith("END:VCALENDAR\r\n")
+    assert content.count("BEGIN:VEVENT") == 4
+    assert f"UID:block-1-{plan_namespace(fname.resolve())}@study-scheduler" in content and "SEQUENCE:0" in content
+    assert r"SUMMARY:Study: Chapter 0\; part\, 0" in content
+    assert all(len(line.encode("utf-8")) <= 75 for line in content.split("\r\n"))
+
+
+def test_export_split_by_month(tmp_path, plan):
+    files = export_to_ics(plan(), tmp_path / "plan.ics", split_by="month")
+    assert [f.rsplit("-", 2)[-2:] for f in files] == [["2031", "01.ics"], ["2031", "02.ics"]]
+
+
+def test_incremental_export_writes_only_delta(tmp_path, plan):
+    plan = plan()
+    fname = tmp_path / "plan.ics"
+    export_to_ics(plan, fname, incremental=True)
+    assert fname.read_text().count("BEGIN:VEVENT") == 4
+
+    plan[1].completed = True
+    plan.remove(plan[3])
+    export_to_ics(plan, fname, incremental=True)
+    content = fname.read_text()
+    assert content.count("BEGIN:VEVENT") == 2
+    ns = plan_namespace(fname.resolve())
+    assert f"UID:block-2-{ns}@study-scheduler\nSEQUENCE:1" in content
+    assert "STATUS:CANCELLED" in content and f"UID:block-4-{ns}@study-scheduler" in content
+
+    export_to_ics(plan, fname, incremental=True)
+    assert fname.read_text().count("BEGIN:VEVENT") == 0
+
+
+def _uids(text):
+    return set(re.findall(r"^UID:(.*)$", text, re.M))
+
+
+def test_separate_plans_get_disjoint_uids(tmp_path, plan):
+    # both stores number their blocks from 1
+    export_to_ics(plan(), tmp_path / "alice.ics")
+    export_to_ics(plan(), tmp_path / "bob.ics")
+    alice, bob = (_uids((tmp_path / name).read_text()) for name in ("alice.ics", "bob.ics"))
+    assert len(alice) == 4 and not alice & bob
+
+    streamed = ["".join(iter_ics(plan(), plan_namespace(name))) for name in ("maths", "physics")]
+    assert not _uids(streamed[0]) & _uids(streamed[1])
+    assert _uids(streamed[0]) == _uids("".join(iter_ics(plan(), plan_namespace("maths"))))
@@ -0,0 +1,40 @@
+import json
+
+from core import instrument
+from core.scheduler import SmartScheduler
+from core.storage import load_schedule, save_schedule
+from benchmarks.workloads import make_workload
+
+
+def test_disabled_instrumentation_records_nothing():
+    instrument.disable()
+    instrument.reset()
+    with instrument.span("x"):
+        instrument.count("y")
+    assert instrument.summary() == {"spans": {}, "counters": {}}
+
+
+def test_generate_and_storage_spans(tmp_path):
+    instrument.reset()
+    instrument.enable()
+    try:
+        blocks = SmartScheduler(**make_workload(30, 7)).generate_schedule()
+        save_schedule(blocks, tmp_path / "s.json")
+        load_schedule(tmp_path / "s.json")
+    finally:
+        instrument.disable()
+    data = instrument.summary()
+    assert {"generate", "generate.solve", "generate.build_slots", "generate.assign",
+            "storage.save", "storage.save.write", "storage.load"} <= set(data["spans"])
+    counters = data["counters"]
+    assert counters["generate.attempts"] >= 1
+    assert counters["generate.blocks"] == counters["generate.candidate_slots"] == len(blocks)
+    assert counters["storage.blocks_loaded"] == len(blocks)
+    assert "generate" in instrument.status_line()
+
+    doc = json.loads(open(instrument.export(tmp_path / "p.speedscope.json")).read())
+    events = doc["profiles"][0]["events"]
+    assert [e["type"] for e in events].count("O") == [e["type"] for e in events].count("C")
+    assert [e["at"] for e in events] == sorted(e["at"] for e in events)
+    assert json.loads(open(instrument.export(tmp_path / "p.json")).read())["counters"] == counters
+    instrument.reset()
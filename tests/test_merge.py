@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.cli import main
+from core.merge import TimelineMerge, merge_schedules
+from core.storage import load_schedule, save_schedule
+
+T0 = datetime(2031, 5, 1, 9, 0)
+
+
+@pytest.fixture
+def blocks_at(make_blocks):
+    """One-hour blocks of `chapter` starting the given minutes after T0."""
+    return lambda chapter, *starts: [b for m in starts
+                                     for b in make_blocks(1, minutes=60, name=chapter, t0=T0 + timedelta(minutes=m))]
+
+
+def _times(blocks):
+    return [(b.chapter, (b.start_time - T0) // timedelta(minutes=1)) for b in blocks]
+
+
+def test_merge_interleaves_and_reports_overlaps(blocks_at):
+    maths = blocks_at("maths", 0, 120, 240)
+    physics = blocks_at("physics", 30, 150, 300)  # the last one only touches maths at 240-300
+    timeline = TimelineMerge([maths, physics])
+    merged = list(timeline)
+    assert _times(merged) == [("maths", 0), ("physics", 30), ("maths", 120), ("physics", 150),
+                              ("maths", 240), ("physics", 300)]
+    assert [(c.block.chapter, c.against.chapter, c.action) for c in timeline.conflicts] == \
+        [("physics", "maths", "overlap")] * 2
+    assert all(b.block_id is None for b in merged) and maths[0].chapter == "maths"  # inputs untouched
+
+
+def test_drop_and_shift_follow_source_priority(blocks_at):
+    maths = blocks_at("maths", 0, 60)
+    physics = blocks_at("physics", 30, 200)
+    # physics has priority: the held-back maths block and the next one, which overlaps physics, are dropped
+    dropped = TimelineMerge([maths, physics], priorities=[1, 0], policy="drop")
+    assert _times(dropped) == [("physics", 30), ("physics", 200)]
+    assert [(c.block.chapter, c.action) for c in dropped.conflicts] == [("maths", "dropped")] * 2
+
+    # maths first: physics moves behind maths' second block (+10 min), then fits before 200
+    shifted = TimelineMerge([maths, physics], policy="shift", gap=timedelta(minutes=10))
+    merged = list(shifted)
+    assert _times(merged) == [("maths", 0), ("maths", 60), ("physics", 130), ("physics", 200)]
+    assert [c.action for c in shifted.conflicts] == ["shifted", "shifted"]
+    assert shifted.conflicts[-1].original_start == T0 + timedelta(minutes=30)
+    assert all(a.end_time <= b.start_time for a, b in zip(merged, merged[1:]))
+
+    limited = TimelineMerge([maths, physics], policy="shift", max_shift=timedelta(minutes=45))
+    assert _times(limited) == [("maths", 0), ("maths", 60), ("physics", 200)]
+
+
+def test_unsorted_source_is_rejected(blocks_at):
+    with pytest.raises(ValueError, match="not sorted"):
+        list(TimelineMerge([blocks_at("a", 60, 0)]))
+
+
+def test_merge_files_streams_to_ics_and_schedule_files(tmp_path, capsys, blocks_at):
+    save_schedule(blocks_at("Algebra", 0, 120), tmp_path / "maths.jsonl")
+    save_schedule(blocks_at("Optics", 60, 150), tmp_path / "physics.db")
+    labelled = merge_schedules([tmp_path / "maths.jsonl", tmp_path / "physics.db"], policy="drop")
+    assert [b.chapter for b in labelled] == ["maths: Algebra", "physics: Optics", "maths: Algebra"]
+
+    out = tmp_path / "all.ics"
+    assert main(["merge", str(tmp_path / "maths.jsonl"), str(tmp_path / "physics.db"),
+                 "-o", str(out), "--policy", "keep"]) == 0
+    assert "4 blocks, 1 conflicts" in capsys.readouterr().out
+    assert out.read_text().count("BEGIN:VEVENT") == 4
+
+    assert main(["merge", str(tmp_path / "maths.jsonl"), str(tmp_path / "physics.db"),
+                 "-o", str(tmp_path / "all.ssb"), "--policy", "shift", "--no-labels"]) == 0
+    assert _times(load_schedule(tmp_path / "all.ssb")) == [("Algebra", 0), ("Optics", 60),
+                                                           ("Algebra", 120), ("Optics", 180)]
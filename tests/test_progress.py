@@ -0,0 +1,84 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.progress import Cancelled
+from core.scheduler import SmartScheduler
+from core.storage import load_schedule, save_schedule
+from ui.tasks import BackgroundRunner
+
+
+def test_generate_reports_progress_and_cancels():
+    exam = datetime.now() + timedelta(days=10)
+    seen = []
+    SmartScheduler(["A", "B"], 45, exam, random_seed=1).generate_schedule(
+        progress=lambda done, total, stage: seen.append(stage))
+    assert seen[0] == "Building time slots" and seen[-1] == "Done"
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(Cancelled):
+        SmartScheduler(["A", "B"], 45, exam).generate_schedule(cancel=cancel)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".db"])
+def test_cancelled_save_keeps_old_file(tmp_path, suffix, make_blocks):
+    fname = tmp_path / ("s" + suffix)
+    save_schedule(make_blocks(3), fname)
+    cancel = threading.Event()
+
+    def progress(done, total, stage):
+        cancel.set()  # cancel at the first checkpoint
+
+    with pytest.raises(Cancelled):
+        save_schedule(make_blocks(2500), fname, progress=progress, cancel=cancel)
+    assert len(load_schedule(fname)) == 3
+    assert not (tmp_path / ("s" + suffix + ".tmp")).exists()
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks are run by pump()."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+    def pump(self, timeout=5):
+        deadline = datetime.now() + timedelta(seconds=timeout)
+        while self.pending and datetime.now() < deadline:
+            self.pending.pop(0)()
+
+
+def test_background_runner_delivers_on_tk_thread():
+    root = FakeRoot()
+    events = []
+    runner = BackgroundRunner(root, on_progress=lambda *a: events.append(a), on_idle=lambda: events.append("idle"))
+
+    def job(progress, cancel):
+        progress(1, 2, "Working")
+        return threading.current_thread().name
+
+    assert runner.submit("Job", job, on_done=lambda r: events.append(("done", r)))
+    assert runner.busy and not runner.submit("Other", job, on_done=print)
+    root.pump()
+    assert not runner.busy
+    assert events[0] == ("Job", 1, 2, "Working") and events[1] == "idle"
+    assert events[2][0] == "done" and events[2][1] != threading.current_thread().name
+
+    started = threading.Event()
+
+    def slow(progress, cancel):
+        started.set()
+        while True:
+            if cancel.wait(0.01):
+                raise Cancelled("stop")
+
+    runner.submit("Slow", slow, on_done=events.append, on_cancelled=lambda: events.append("cancelled"))
+    started.wait(5)
+    runner.cancel()
+    root.pump()
+    assert events[-1] == "cancelled"
+    runner.shutdown()
@@ -0,0 +1,64 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.revision import assign_spaced
+from core.scheduler import ScheduleEdit, SmartScheduler, StudyBlock
+
+
+def _slots(n, step_hours=3):
+    t0 = datetime(2031, 3, 1, 9, 0)
+    return [StudyBlock(None, t0 + timedelta(hours=step_hours * i), t0 + timedelta(hours=step_hours * i, minutes=45))
+            for i in range(n)]
+
+
+def test_spaced_revisions_favour_hard_chapters_and_widen():
+    meta = {"hard": (5, 5), "easy": (1, 1), "mid": (3, 3)}
+    queue = ["hard", "mid", "easy"]
+    blocks = assign_spaced(_slots(60, step_hours=24), queue, queue, meta)
+    assert [b.mode for b in blocks[:3]] == ["Study"] * 3 and {b.chapter for b in blocks[:3]} == set(queue)
+    counts = Counter(b.chapter for b in blocks[3:])
+    assert counts["hard"] > counts["mid"] > counts["easy"]
+
+    starts = [b.start_time for b in blocks if b.chapter == "easy"]
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert gaps[0] < gaps[1] < gaps[2]  # widening while slots are scarce relative to due reviews
+
+
+def test_completion_history_delays_well_known_chapters():
+    queue = ["a", "b"]
+    meta = {"a": (3, 3), "b": (3, 3)}
+    past = _slots(4)
+    for b, chapter in zip(past, ["a", "b", "a", "b"]):
+        b.chapter = chapter
+    past[0].completed = past[2].completed = True  # "a" was revised, "b" was missed
+    future = [StudyBlock(None, b.start_time + timedelta(days=1), b.end_time + timedelta(days=1)) for b in _slots(6)]
+    assign_spaced(future, [], queue, meta, history=past)
+    assert future[0].chapter == "b"
+    assert Counter(b.chapter for b in future)["b"] > Counter(b.chapter for b in future)["a"]
+
+
+def test_scheduler_strategy_parameter():
+    exam = datetime.now() + timedelta(days=20)
+    titles = ["Short", "A much longer and considerably harder chapter title about many things", "Middle chapter"]
+    default = SmartScheduler(titles, 45, exam, random_seed=1)
+    assert default.strategy == "round_robin"
+    spaced = SmartScheduler(titles, 45, exam, random_seed=1, strategy="spaced")
+    plan = spaced.generate_schedule()
+    studied = [b.chapter for b in plan if b.mode == "Study"]
+    assert sorted(studied) == sorted(titles)
+    assert all(b.chapter in studied[:i + 1] for i, b in enumerate(plan) if b.mode == "Study")
+    with pytest.raises(ValueError):
+        SmartScheduler(titles, 45, exam, strategy="random")
+
+    # incremental edits keep using the strategy
+    plan = spaced.reschedule(plan, ScheduleEdit.change_params(daily_limit=3))
+    assert {b.chapter for b in plan} == set(titles)
+
+
+def test_spaced_assignment_scales_to_large_plans():
+    queue = [f"C{i}" for i in range(2000)]
+    meta = {c: (1 + i % 5, 1 + i % 3) for i, c in enumerate(queue)}
+    blocks = assign_spaced(_slots(100000, step_hours=1), queue, queue, meta)
+    assert len({b.chapter for b in blocks}) == 2000
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from core.schedule_cache import ScheduleCache, cache_key
+from core.scheduler import SmartScheduler
+
+
+def _scheduler(**overrides):
+    params = dict(chapter_titles=[f"Chapter {i} on a topic with a longer title" for i in range(8)],
+                  block_minutes=40, exam_datetime=datetime.now() + timedelta(days=9), random_seed=5)
+    params.update(overrides)
+    return SmartScheduler(**params)
+
+
+def _rows(blocks):
+    return [b.to_dict() for b in blocks]
+
+
+def test_identical_inputs_give_identical_plans():
+    exam = datetime.now() + timedelta(days=9)
+    a, b = _scheduler(exam_datetime=exam), _scheduler(exam_datetime=exam)
+    assert a.chapters_meta == b.chapters_meta
+    assert _rows(a.generate_schedule()) == _rows(b.generate_schedule())
+    assert cache_key(a) == cache_key(b)
+    assert cache_key(a) != cache_key(_scheduler(exam_datetime=exam, ramp_factor=0.6))
+    assert cache_key(a) != cache_key(_scheduler(exam_datetime=exam, random_seed=6))
+
+
+def test_memory_cache_returns_independent_copies():
+    exam = datetime.now() + timedelta(days=9)
+    cache = ScheduleCache(max_entries=2)
+    first = cache.generate(_scheduler(exam_datetime=exam))
+    first[0].completed = True
+    second_scheduler = _scheduler(exam_datetime=exam)
+    second = cache.generate(second_scheduler)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second_scheduler.blocks is second and not second[0].completed
+    assert _rows(second)[1:] == _rows(first)[1:]
+
+    cache.generate(_scheduler(exam_datetime=exam, daily_limit=5))
+    cache.generate(_scheduler(exam_datetime=exam, daily_limit=6))
+    assert len(cache) == 2 and cache.get(_scheduler(exam_datetime=exam)) is None  # evicted (LRU)
+
+
+def test_disk_cache_survives_restarts_and_stays_bounded(tmp_path):
+    exam = datetime.now() + timedelta(days=9)
+    plan = ScheduleCache(disk_dir=tmp_path).generate(_scheduler(exam_datetime=exam))
+    fresh = ScheduleCache(disk_dir=tmp_path)
+    assert _rows(fresh.generate(_scheduler(exam_datetime=exam))) == _rows(plan)
+    assert fresh.hits == 1
+
+    size = next(tmp_path.glob("*.ssb")).stat().st_size
+    small = ScheduleCache(disk_dir=tmp_path, max_disk_bytes=size * 2)
+    for limit in (5, 6, 7):
+        small.generate(_scheduler(exam_datetime=exam, daily_limit=limit))
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.ssb")) <= size * 2
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.bench_suite import HeadlessTree
+from ui.schedule_view import ScheduleView
+
+
+@pytest.fixture
+def view_store(make_store):
+    return lambda n: make_store(n, chapters=4, minutes=30)
+
+
+def test_view_pages_rows_in_on_scroll(view_store):
+    store, tree = view_store(1000), HeadlessTree()
+    view = ScheduleView(tree, page_size=50)
+    view.show(store)
+    assert len(tree.rows) == 50 and view.total() == 1000
+    view.on_yscroll("0.2", "0.5")
+    assert len(tree.rows) == 50
+    store.remove(store[60])  # deleting ahead of the cursor must not skip rows
+    view.on_yscroll("0.5", "0.95")
+    assert list(tree.rows) == [str(b.block_id) for b in store[:100]]
+
+
+def test_view_applies_single_block_diffs(view_store):
+    store, tree = view_store(300), HeadlessTree()
+    view = ScheduleView(tree, page_size=100)
+    view.show(store)
+    inserts = tree.inserts
+    block = store[5]
+    block.completed = True
+    view.update_block(block)
+    view.remove_block(store[6])
+    assert tree.rows[str(block.block_id)][-1] == "✓"
+    assert str(store[6].block_id) not in tree.rows and tree.inserts == inserts
+
+
+def test_view_filters_use_indexes(view_store):
+    store, tree = view_store(400), HeadlessTree()
+    view = ScheduleView(tree, page_size=20)
+    start = datetime(2031, 1, 3)
+    view.show(store, chapter="C1", start=start, end=start + timedelta(days=2))
+    assert view.total() == 12
+    assert all(v[0] == "C1" and "2031-01-03" <= v[1] < "2031-01-05" for v in tree.rows.values())
+    assert len(tree.rows) == 12
+
+    view = ScheduleView(HeadlessTree(), page_size=20)
+    view.show(store, chapter="C2")
+    shown = store.by_chapter("C2")[:20]
+    store.relabel(shown[-1], "C0", "Revision")  # the paging cursor leaves the chapter
+    store.remove(store.by_chapter("C2")[25])
+    view.load_more()
+    assert list(view.tree.rows) == [str(b.block_id) for b in shown + store.by_chapter("C2")[19:39]]
+    assert view.total() == 98
+
+
+def test_view_rebinds_to_an_edited_copy(view_store):
+    store, tree = view_store(300), HeadlessTree()
+    view = ScheduleView(tree, page_size=100)
+    view.show(store)
+    copy = store.copy()  # edited off the Tk thread, then swapped in
+    last = copy[99]
+    copy.remove(last)
+    view.rebind(copy)
+    view.remove_block(last)
+    view.on_yscroll("0.5", "0.95")
+    assert list(tree.rows) == [str(b.block_id) for b in copy[:199]]
+    assert view.store is copy and view.total() == 299
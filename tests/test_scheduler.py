@@ -1,7 +1,7 @@
 import pytest
 from datetime import datetime, timedelta
 
-from core.scheduler import SmartScheduler, StudyBlock
+from core.scheduler import ScheduleEdit, SmartScheduler, StudyBlock
 
 
 def test_generate_schedule_basic():
@@ -22,3 +22,121 @@ def test_mark_completed():
     assert not blocks[0].completed
     sched.mark_completed("A")
     assert any(b.completed for b in sched.blocks)
+
+
+def test_solver_finds_minimal_base_limit():
+    chapters = [f"Chapter {i}" for i in range(40)]
+    exam = datetime.now() + timedelta(days=4)
+    sched = SmartScheduler(chapter_titles=chapters, block_minutes=60, exam_datetime=exam,
+                           daily_limit=1, break_minutes=15, random_seed=3)
+    now = datetime.now().replace(second=0, microsecond=0)
+    total_days = (exam.date() - now.date()).days
+    layouts = sched._day_layouts(total_days, now)
+    limit = sched._solve_base_limit(layouts, len(chapters))
+    count = lambda n: len(sched._make_time_slots(sched._compute_daily_slots(total_days, n), now))
+    assert count(limit) >= len(chapters)
+    assert limit == 1 or count(limit - 1) < len(chapters)
+
+
+def test_blocks_end_by_midnight():
+    exam = datetime.now() + timedelta(days=5)
+    sched = SmartScheduler(chapter_titles=["A", "B", "C"], block_minutes=90,
+                           exam_datetime=exam, day_start_hour=20, random_seed=5)
+    blocks = sched.generate_schedule()
+    assert all(b.end_time.date() == b.start_time.date() or b.end_time.time() == datetime.min.time()
+               for b in blocks)
+
+
+def test_unsatisfiable_constraints_raise():
+    exam = datetime.now() + timedelta(days=2)
+    sched = SmartScheduler(chapter_titles=[f"C{i}" for i in range(500)], block_minutes=120,
+                           exam_datetime=exam, random_seed=1)
+    with pytest.raises(RuntimeError, match="Unable to fit"):
+        sched.generate_schedule()
+
+
+def _sample(n=6, days=10):
+    exam = datetime.now() + timedelta(days=days)
+    sched = SmartScheduler(chapter_titles=[f"Chap {i}" for i in range(n)], block_minutes=30,
+                           exam_datetime=exam, random_seed=4)
+    return sched, sched.generate_schedule()
+
+
+def test_reschedule_add_and_remove_chapter():
+    sched, blocks = _sample()
+    before = len(blocks)
+    blocks = sched.reschedule(blocks, ScheduleEdit.add_chapter("New one"))
+    assert len(blocks) == before
+    assert [b.mode for b in blocks if b.chapter == "New one"].count("Study") == 1
+
+    blocks = sched.reschedule(blocks, ScheduleEdit.remove_chapter("Chap 0"))
+    assert len(blocks) == before
+    assert not any(b.chapter == "Chap 0" for b in blocks)
+
+
+def test_reschedule_delete_study_block_refills_chapter():
+    sched, blocks = _sample()
+    study = next(b for b in blocks if b.mode == "Study")
+    blocks = sched.reschedule(blocks, ScheduleEdit.delete_block(study))
+    assert study not in blocks
+    assert any(b.chapter == study.chapter and b.mode == "Study" for b in blocks)
+
+
+def test_reschedule_param_change_keeps_completed():
+    sched, blocks = _sample()
+    done = blocks[3]
+    sched.reschedule(blocks, ScheduleEdit.complete_block(done))
+    blocks = sched.reschedule(blocks, ScheduleEdit.change_params(block_minutes=50, break_minutes=5))
+    assert done in blocks and done.completed
+    fresh = [b for b in blocks if b is not done]
+    assert all(b.end_time - b.start_time == timedelta(minutes=50) for b in fresh)
+    assert all(not (b.start_time < done.end_time and done.start_time < b.end_time) for b in fresh)
+    studied = {b.chapter for b in blocks if b.mode == "Study"}
+    assert studied == set(sched.chapter_titles)
+
+
+def test_reschedule_param_change_fits_around_kept_blocks_off_the_new_grid():
+    # 25-min slots: each kept 60-min block covers several slots of the new grid
+    now = datetime(2031, 5, 1, 0, 0)
+    titles = [f"C{i}" for i in range(20)]
+    sched = SmartScheduler(titles, block_minutes=60, exam_datetime=now + timedelta(days=2, hours=1),
+                           daily_limit=1, break_minutes=0, random_seed=1)
+    blocks = sched.generate_schedule(now=now)
+    done = list(blocks)[:3]
+    for b in done:
+        sched.reschedule(blocks, ScheduleEdit.complete_block(b), now=now)
+    blocks = sched.reschedule(blocks, ScheduleEdit.change_params(block_minutes=25, break_minutes=0), now=now)
+    assert all(b in blocks for b in done)
+    assert {b.chapter for b in blocks if b.mode == "Study"} == set(titles)
+    ordered = list(blocks)
+    assert all(a.end_time <= b.start_time for a, b in zip(ordered, ordered[1:]))
+    with pytest.raises(RuntimeError, match="Unable to fit"):
+        sched.reschedule(blocks, ScheduleEdit.change_params(block_minutes=600, break_minutes=10), now=now)
+    assert (sched.block_minutes, sched.break_minutes) == (25, 0)
+    with pytest.raises(ValueError):
+        sched.reschedule(blocks, ScheduleEdit.change_params(break_minutes=5, block_minutes="long"), now=now)
+    assert (sched.block_minutes, sched.break_minutes) == (25, 0)
+
+
+def test_reschedule_on_copies_leaves_the_original_untouched():
+    sched, blocks = _sample()
+    before = [b.to_dict() for b in blocks]
+    edited, copied = sched.copy(), blocks.copy()
+    edited.reschedule(copied, ScheduleEdit.add_chapter("Extra"))
+    assert "Extra" in edited.chapter_titles and "Extra" not in sched.chapter_titles
+    assert [b.to_dict() for b in blocks] == before and sched.blocks is blocks
+
+
+def test_reschedule_param_change_never_reuses_block_ids():
+    sched, blocks = _sample()
+    old = {b.block_id: (b.chapter, b.mode, b.start_time) for b in blocks}
+    first = next(iter(blocks))
+    sched.reschedule(blocks, ScheduleEdit.complete_block(first))
+    next_id = blocks.next_id
+    rebuilt = sched.reschedule(blocks, ScheduleEdit.change_params(block_minutes=40))
+    assert rebuilt.get(first.block_id) is first
+    for b in rebuilt:
+        if b.block_id in old:
+            assert (b.chapter, b.mode, b.start_time) == old[b.block_id]
+        else:
+            assert b.block_id >= next_id
@@ -0,0 +1,112 @@
+import http.client
+import json
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.service import Busy, ScheduleService, request_key
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ScheduleService(port=0, workers=1, max_pending=2, root=tmp_path).start()
+    yield service
+    service.close()
+
+
+def _call(service, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(service.url + path, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, resp.headers, resp.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read().decode("utf-8")
+
+
+def _params():
+    exam = (datetime.now() + timedelta(days=5)).replace(second=0, microsecond=0)
+    return {"chapters": ["Algebra", "Geometry", "Optics"], "exam": exam.isoformat(), "block_minutes": 45,
+            "random_seed": 1}
+
+
+def test_generate_update_and_file_endpoints(service, tmp_path):
+    status, headers, text = _call(service, "/generate", dict(_params(), out="plan.jsonl"))
+    assert status == 200 and headers["Transfer-Encoding"] == "chunked"
+    blocks = json.loads(text)["blocks"]
+    assert {b["chapter"] for b in blocks} == {"Algebra", "Geometry", "Optics"}
+    assert (tmp_path / "plan.jsonl").exists()
+
+    status, _, text = _call(service, "/generate", dict(_params(), format="ics"))
+    assert text.startswith("BEGIN:VCALENDAR") and text.count("BEGIN:VEVENT") == len(blocks)
+
+    edits = [{"kind": "complete_block", "id": blocks[0]["id"]}, {"kind": "add_chapter", "chapter": "Waves"}]
+    status, _, text = _call(service, "/update", {"path": "plan.jsonl", "params": _params(), "edits": edits})
+    updated = json.loads(text)["blocks"]
+    assert status == 200 and "Waves" in {b["chapter"] for b in updated}
+    assert [b for b in updated if b["id"] == blocks[0]["id"]][0]["completed"]
+
+    status, _, text = _call(service, "/load", {"path": "plan.jsonl", "chapter": "Waves", "format": "jsonl"})
+    assert status == 200 and [json.loads(line)["chapter"] for line in text.splitlines()] == ["Waves"]
+
+    assert _call(service, "/save", {"path": "copy.db", "source": "plan.jsonl"})[0] == 200
+    status, _, text = _call(service, "/export", {"path": "copy.db"})
+    assert status == 200 and text.count("BEGIN:VEVENT") == len(updated)
+
+    assert _call(service, "/load", {"path": "../outside.json"})[0] == 400
+    for endpoint, body in (("/generate", dict(_params(), busy_ics="../outside.ics")),
+                           ("/update", {"path": "plan.jsonl", "params": dict(_params(), busy_ics="../outside.ics")})):
+        status, _, text = _call(service, endpoint, body)
+        assert status == 400 and "outside the service root" in text
+    assert _call(service, "/load", {"path": "missing.json"})[0] == 404
+    assert _call(service, "/nope")[0] == 404
+
+    stats = json.loads(_call(service, "/stats")[2])
+    assert stats["endpoints"]["/generate"]["requests"] == 3 and stats["endpoints"]["/generate"]["errors"] == 1
+    assert stats["counters"]["pool_jobs"] == 3 and stats["latency_ms"]["p50"] is not None
+
+
+def test_identical_requests_share_a_job_and_excess_is_rejected(service):
+    first = service.submit("a", time.sleep, 0.5)
+    assert service.submit("a", time.sleep, 0.5) is first  # joined, no extra slot
+    second = service.submit("b", time.sleep, 0.5)
+    with pytest.raises(Busy):
+        service.submit("c", time.sleep, 0.5)
+    first.result()
+    second.result()
+    # slots are given back by the futures' done callbacks, which may run just after result()
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            service.submit("c", time.sleep, 0).result()
+            break
+        except Busy:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    assert service.stats.counters["deduplicated"] == 1 and service.stats.counters["pool_jobs"] == 3
+
+    with service.exclusive(service.path("plan.jsonl")):
+        status, headers, _ = _call(service, "/update", {"path": "plan.jsonl", "params": _params()})
+    assert status == 503 and headers["Retry-After"] == "1"
+
+    body = _params()
+    assert request_key("generate", dict(body, format="ics"), ignore=("format",)) == \
+        request_key("generate", body, ignore=("format",))
+
+
+def test_error_after_streaming_started_closes_the_connection(service, monkeypatch):
+    def broken(blocks, namespace):
+        yield "BEGIN:VCALENDAR\r\n"
+        raise RuntimeError("bad block")
+
+    monkeypatch.setattr("core.service.iter_ics", broken)
+    req = urllib.request.Request(service.url + "/export", data=json.dumps({"blocks": []}).encode("utf-8"))
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        assert resp.status == 200
+        with pytest.raises(http.client.IncompleteRead) as e:
+            resp.read()
+    assert b"error" not in e.value.partial  # no second status line or JSON inside the chunked body
+    assert service.stats.snapshot()["counters"]["stream_errors"] == 1
@@ -0,0 +1,76 @@
+"""
+Startup-time budgets, measured with `python -X importtime` in a fresh process.
+
+The budgets are generous so slow CI machines pass; what they catch is a
+heavy import (tkinter, tkcalendar, numpy, multiprocessing...) sneaking back
+onto the startup path. The module checks are exact. Building the window is
+timed too where a display is available.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CLI_BUDGET_MS = 150  # measured ~25 ms
+GUI_BUDGET_MS = 400  # measured ~65 ms
+WINDOW_BUDGET_MS = 1500  # import plus StudyPlannerApp(); tkcalendar waits for the date picker
+
+WINDOW_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from ui.main_window import StudyPlannerApp
+app = StudyPlannerApp()
+app.update_idletasks()
+print((time.perf_counter() - started) * 1000, "tkcalendar" in sys.modules)
+app.on_close()
+"""
+
+
+def import_profile(module):
+    """Return ({module: cumulative_us}, total_ms) for importing `module` in a new interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    modules, total = {}, 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        top_level = not name.startswith("  ")
+        name = name.strip()
+        modules[name] = int(cumulative_us)
+        if top_level:
+            total += int(cumulative_us)
+    return modules, total / 1000
+
+
+def test_cli_startup_budget():
+    modules, total_ms = import_profile("core.cli")
+    for heavy in ("tkinter", "tkcalendar", "numpy", "ics", "multiprocessing", "sqlite3"):
+        assert heavy not in modules, f"core.cli imports {heavy} at startup"
+    assert total_ms < CLI_BUDGET_MS
+
+
+def test_gui_startup_budget():
+    pytest.importorskip("tkinter")
+    modules, total_ms = import_profile("ui.main_window")
+    for heavy in ("tkcalendar", "numpy", "ics"):
+        assert heavy not in modules, f"ui.main_window imports {heavy} at startup"
+    assert total_ms < GUI_BUDGET_MS
+
+
+def test_gui_window_startup_budget(tmp_path):
+    tk = pytest.importorskip("tkinter")
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        pytest.skip("no display")
+    # run in tmp_path: the window creates its database files in the working directory
+    proc = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=tmp_path, capture_output=True, text=True,
+                          check=True, env={**os.environ, "PYTHONPATH": str(ROOT)})
+    elapsed_ms, calendar_loaded = proc.stdout.split()
+    assert calendar_loaded == "False", "building the window imports tkcalendar"
+    assert float(elapsed_ms) < WINDOW_BUDGET_MS
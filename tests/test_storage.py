@@ -0,0 +1,66 @@
+from core.storage import SQLiteBackend, iter_schedule, load_schedule, open_backend, save_schedule
+
+
+def test_sqlite_row_updates(tmp_path, make_blocks):
+    db = SQLiteBackend(tmp_path / "s.db")
+    db.save_all(make_blocks(6, chapters=2, study=2))
+    store = db.load()
+    assert len(store) == 6
+
+    target = store[3]
+    target.completed = True
+    db.update_block(target)
+    db.delete_block(store[0].block_id)
+    reloaded = db.load()
+    assert len(reloaded) == 5 and reloaded.get(target.block_id).completed
+    assert [b.block_id for b in db.query(chapter="C1")] == [store[1].block_id, store[3].block_id, store[5].block_id]
+
+    db.clear_completed()
+    assert not any(b.completed for b in db.load())
+    db.close()
+
+
+def test_sqlite_json_round_trip(tmp_path, make_blocks):
+    legacy = tmp_path / "old.json"
+    save_schedule(make_blocks(4, chapters=2, study=2), legacy)
+    db = SQLiteBackend(tmp_path / "s.db")
+    db.import_json(legacy)
+    db.export_json(tmp_path / "back.json")
+    db.close()
+    assert [b.to_dict() for b in load_schedule(tmp_path / "back.json")] == \
+        [b.to_dict() for b in load_schedule(legacy)]
+    assert [b.to_dict() for b in load_schedule(tmp_path / "s.db")] == \
+        [b.to_dict() for b in load_schedule(legacy)]
+
+
+def test_jsonl_streaming_and_format_detection(tmp_path, make_blocks):
+    blocks = make_blocks(6, chapters=2, study=2)
+    lines = tmp_path / "s.jsonl"
+    save_schedule(iter(blocks), lines)
+    assert len(lines.read_text().splitlines()) == 6
+
+    legacy = tmp_path / "s.json"
+    save_schedule(blocks, legacy)
+    for fname in (lines, legacy):
+        assert [b.to_dict() for b in load_schedule(fname)] == [b.to_dict() for b in load_schedule(legacy)]
+        picked = list(iter_schedule(fname, start=blocks[1].start_time, end=blocks[5].start_time, chapter="C1"))
+        assert [b.start_time for b in picked] == [blocks[1].start_time, blocks[3].start_time]
+
+    # a .json file holding JSON Lines is still detected by content
+    (tmp_path / "renamed.json").write_text(lines.read_text())
+    assert len(load_schedule(tmp_path / "renamed.json")) == 6
+
+
+def test_json_backend_edits_without_load_keep_the_file(tmp_path, make_blocks):
+    fname = tmp_path / "p.json"
+    save_schedule(make_blocks(5), fname)
+    ids = [b.block_id for b in load_schedule(fname)]
+    open_backend(fname).delete_block(ids[1])
+    assert [b.block_id for b in load_schedule(fname)] == ids[:1] + ids[2:]
+
+    done = load_schedule(fname)[0]
+    done.completed = True
+    open_backend(fname).update_block(done.copy())
+    assert len(load_schedule(fname)) == 4 and load_schedule(fname)[0].completed
+    open_backend(fname).clear_completed()
+    assert len(load_schedule(fname)) == 4 and not any(b.completed for b in load_schedule(fname))
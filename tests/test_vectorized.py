@@ -0,0 +1,33 @@
+import pytest
+from datetime import datetime, timedelta
+
+from core.scheduler import SmartScheduler
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("block,brk,limit,ramp,start,days", [
+    (45, 10, 4, 0.5, 9, 10),
+    (30, 0, 1, 1.0, 0, 60),
+    (90, 15, 12, 0.9, 20, 14),
+    (25, 5, 30, 0.0, 6, 730),
+])
+def test_numpy_engine_matches_python(block, brk, limit, ramp, start, days):
+    exam = datetime.now() + timedelta(days=days, minutes=7, seconds=13)
+    kwargs = dict(chapter_titles=[f"Chapter {i}" for i in range(25)], block_minutes=block,
+                  exam_datetime=exam, daily_limit=limit, break_minutes=brk,
+                  ramp_factor=ramp, day_start_hour=start, random_seed=11)
+    py = SmartScheduler(engine="python", **kwargs).generate_schedule()
+    vec = SmartScheduler(engine="numpy", **kwargs).generate_schedule()
+    assert [b.to_dict() for b in py] == [b.to_dict() for b in vec]
+
+
+def test_daily_slots_match_python():
+    from core import vectorized
+    sched = SmartScheduler(["A"], 30, datetime.now() + timedelta(days=3), ramp_factor=0.37)
+    for total_days, base in [(1, 1), (17, 3), (999, 7)]:
+        expected = SmartScheduler._compute_daily_slots(sched, total_days, base)
+        assert vectorized.compute_daily_slots(total_days, base, 0.37).tolist() == expected
+        layouts = sched._day_layouts(total_days, datetime.now())
+        assert vectorized.capacity(np.array(expected), layouts) == sum(
+            min(slots, cap) - first for slots, (first, cap, _) in zip(expected, layouts) if slots > first)
@@ -1,24 +1,59 @@
 # study_planner/ui/main_window.py
+import queue
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from tkcalendar import DateEntry
-from datetime import datetime, time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from datetime import date, datetime, time, timedelta
 
-from core.scheduler import SmartScheduler, StudyBlock
+from core import instrument
+from core.autosave import AutoSaver
+from core.binary_schedule import BinarySchedule, is_binary
+from core.blockstore import BlockStore
+from core.busy import BusyCalendar
+from core.chapter_meta import ChapterMetaStore
+from core.ics_import import read_events
+from core.scheduler import ScheduleEdit, SmartScheduler, StudyBlock
 from core.exporter import export_to_ics
-from core.storage import save_schedule, load_schedule
+from core.merge import POLICIES, merge_schedules
+from core.schedule_cache import ScheduleCache
+from ui.schedule_view import ScheduleView
+from core.storage import DEFAULT_DB, DEFAULT_SAVE, SQLiteBackend, save_schedule, load_schedule
+from ui.tasks import BackgroundRunner
+
+SCHEDULE_FILETYPES = [("JSON file", "*.json"), ("JSON Lines file", "*.jsonl"), ("SQLite database", "*.db"),
+                      ("Binary schedule", "*.ssb")]
+SAVE_CHECK_MS = 1000  # how often background save failures are checked for
 
 class StudyPlannerApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Smart Study Planner")
-        self.geometry("900x620")
+        self.geometry("1000x660")
         self.minsize(850, 600)
 
-        self.blocks = []
+        self.blocks = BlockStore()
+        self.scheduler = None  # scheduler that produced self.blocks, used for incremental edits
+        # a loaded .ssb file is browsed in place: self.blocks is then this mapping and the
+        # table pages rows straight from it; only completion flags can change (in the file)
+        self.archive = None
+        self.backend = SQLiteBackend(DEFAULT_DB)  # default persistence, updated per row
+        # edits are recorded here and written behind on a background thread, merged per burst;
+        # failures are queued as (file, error, retried) and reported by _check_saves on the Tk thread
+        self._save_errors = queue.Queue()
+        self.autosave = AutoSaver(self.backend, on_error=lambda e: self._save_errors.put((DEFAULT_DB, e, True)))
+        self._active_filters = {}  # chapter/start/end passed to ScheduleView.show
+        self.cache = ScheduleCache()  # plans for parameter sets generated earlier in this session
+        self.busy_events = []  # events from imported .ics calendars, kept as busy time
+        # cached chapter scores; difficulty is learned from the minutes entered on completion
+        self.meta_store = ChapterMetaStore()
+        # completion minutes are written off the Tk thread too, one at a time and in click order
+        self._meta_writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="study-planner-meta")
+        # generate/save/load/export run on a worker thread so the window stays responsive
+        self.runner = BackgroundRunner(self, on_progress=self._on_progress, on_idle=self._on_idle)
         self._build_ui()
         self._load_if_exists()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(SAVE_CHECK_MS, self._check_saves)
 
     def _build_ui(self):
         frm = ttk.Frame(self, padding=12)
@@ -28,9 +63,13 @@ class StudyPlannerApp(tk.Tk):
         left = ttk.Frame(frm)
         left.pack(side="left", fill="y", padx=(0,12))
 
-        ttk.Label(left, text="Exam Date:").pack(anchor="w")
-        self.exam_date = DateEntry(left, date_pattern="yyyy-mm-dd")
-        self.exam_date.pack(fill="x", pady=3)
+        ttk.Label(left, text="Exam Date (YYYY-MM-DD):").pack(anchor="w")
+        date_row = ttk.Frame(left)
+        date_row.pack(fill="x", pady=3)
+        self.exam_date = ttk.Entry(date_row)
+        self.exam_date.insert(0, date.today().isoformat())
+        self.exam_date.pack(side="left", fill="x", expand=True)
+        ttk.Button(date_row, text="Pick...", command=self.on_pick_date).pack(side="left", padx=(4,0))
 
         ttk.Label(left, text="Exam Time (HH:MM, 24h):").pack(anchor="w")
         self.exam_time = ttk.Entry(left)
@@ -62,10 +101,25 @@ class StudyPlannerApp(tk.Tk):
         self.day_start_hour.insert(0, "9")
         self.day_start_hour.pack(fill="x", pady=3)
 
+        ttk.Label(left, text="Revision strategy:").pack(anchor="w")
+        self.strategy = ttk.Combobox(left, values=("round_robin", "spaced"), state="readonly")
+        self.strategy.set("round_robin")
+        self.strategy.pack(fill="x", pady=3)
+
         ttk.Label(left, text="Chapters (one per line):").pack(anchor="w", pady=(10,0))
-        self.chapters_text = tk.Text(left, width=30, height=12)
+        self.chapters_text = tk.Text(left, width=30, height=10)
         self.chapters_text.pack(fill="both", pady=3)
 
+        ttk.Label(left, text="Busy time (e.g. Mon-Fri 09:00-17:00):").pack(anchor="w")
+        self.busy_text = tk.Text(left, width=30, height=3)
+        self.busy_text.pack(fill="x", pady=3)
+        busy_row = ttk.Frame(left)
+        busy_row.pack(fill="x")
+        ttk.Button(busy_row, text="Import busy .ics", command=self.on_import_busy).pack(side="left", padx=2)
+        ttk.Button(busy_row, text="Clear imported", command=self.on_clear_busy).pack(side="left", padx=2)
+        self.busy_var = tk.StringVar(value="No calendar imported.")
+        ttk.Label(left, textvariable=self.busy_var).pack(anchor="w")
+
         btn_frame = ttk.Frame(left)
         btn_frame.pack(fill="x", pady=(8,0))
         ttk.Button(btn_frame, text="Generate Schedule", command=self.on_generate).pack(side="left", padx=2)
@@ -82,10 +136,35 @@ class StudyPlannerApp(tk.Tk):
         ttk.Button(toolbar, text="Mark Selected Completed", command=self.on_mark_completed).pack(side="left", padx=4)
         ttk.Button(toolbar, text="Clear Completed Flags", command=self.on_clear_completed).pack(side="left", padx=4)
         ttk.Button(toolbar, text="Remove Selected", command=self.on_remove_selected).pack(side="left", padx=4)
+        ttk.Button(toolbar, text="Merge Files...", command=self.on_merge).pack(side="left", padx=(12, 2))
+        ttk.Label(toolbar, text="overlaps:").pack(side="left")
+        self.merge_policy = ttk.Combobox(toolbar, values=POLICIES, state="readonly", width=6)
+        self.merge_policy.set("keep")
+        self.merge_policy.pack(side="left", padx=2)
+        self.cancel_btn = ttk.Button(toolbar, text="Cancel", command=self.on_cancel, state="disabled")
+        self.cancel_btn.pack(side="right", padx=4)
+
+        # Filters (answered from the BlockStore indexes)
+        filters = ttk.Frame(right)
+        filters.pack(fill="x", pady=(0,6))
+        ttk.Label(filters, text="Chapter:").pack(side="left")
+        self.filter_chapter = ttk.Combobox(filters, width=24)
+        self.filter_chapter.pack(side="left", padx=(2,8))
+        ttk.Label(filters, text="From (YYYY-MM-DD):").pack(side="left")
+        self.filter_from = ttk.Entry(filters, width=11)
+        self.filter_from.pack(side="left", padx=(2,8))
+        ttk.Label(filters, text="To:").pack(side="left")
+        self.filter_to = ttk.Entry(filters, width=11)
+        self.filter_to.pack(side="left", padx=(2,8))
+        ttk.Button(filters, text="Apply", command=self.on_apply_filter).pack(side="left", padx=2)
+        ttk.Button(filters, text="Clear", command=self.on_clear_filter).pack(side="left", padx=2)
 
-        # Treeview for schedule
+        # Treeview for schedule; rows are created page by page as the user scrolls
         cols = ("chapter", "start", "end", "mode", "done")
-        self.tree = ttk.Treeview(right, columns=cols, show="headings", selectmode="browse")
+        table = ttk.Frame(right)
+        table.pack(fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(table, orient="vertical")
+        self.tree = ttk.Treeview(table, columns=cols, show="headings", selectmode="browse")
         for c in cols:
             self.tree.heading(c, text=c.capitalize())
         self.tree.column("chapter", width=300)
@@ -93,32 +172,152 @@ class StudyPlannerApp(tk.Tk):
         self.tree.column("end", width=90)
         self.tree.column("mode", width=90)
         self.tree.column("done", width=60, anchor="center")
-        self.tree.pack(fill="both", expand=True)
+        self.view = ScheduleView(self.tree, scrollbar=scrollbar)
+        self.tree.configure(yscrollcommand=self.view.on_yscroll)
+        scrollbar.configure(command=self.tree.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
 
-        # Status bar
+        # Status bar (with phase timings on the right when STUDY_PLANNER_PROFILE is set)
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", side="bottom")
         self.status_var = tk.StringVar(value="Ready")
-        status = ttk.Label(self, textvariable=self.status_var, relief="sunken", anchor="w")
-        status.pack(fill="x", side="bottom")
+        self.profile_var = tk.StringVar(value="")
+        if instrument.enabled():
+            ttk.Label(bar, textvariable=self.profile_var, relief="sunken", anchor="e").pack(side="right")
+        ttk.Label(bar, textvariable=self.status_var, relief="sunken", anchor="w").pack(fill="x", side="left",
+                                                                                      expand=True)
 
     def _load_if_exists(self):
-        p = Path("study_schedule.json")
-        if p.exists():
-            try:
-                self.blocks = load_schedule()
+        try:
+            self.blocks = self.backend.load()
+            if not self.blocks and DEFAULT_SAVE.exists():
+                # first run after the switch to SQLite: bring the old JSON file across
+                self.blocks = load_schedule(DEFAULT_SAVE)
+                self.backend.save_all(self.blocks)
+            if self.blocks:
                 self._refresh_tree()
-                self.status_var.set("Loaded existing schedule from study_schedule.json")
-            except Exception:
-                self.status_var.set("No valid saved schedule to load.")
+                self.status_var.set(f"Loaded existing schedule from {DEFAULT_DB}")
+        except Exception:
+            self.status_var.set("No valid saved schedule to load.")
+
+    # background tasks
+    def _run(self, label, job, on_done, error_title):
+        """Start job(progress, cancel) on the worker; returns False if another task is running."""
+        def on_error(e):
+            self.status_var.set(f"{label} failed.")
+            messagebox.showerror(error_title, str(e))
+
+        def on_cancelled():
+            self.status_var.set(f"{label} cancelled.")
+
+        if not self.runner.submit(label, job, on_done, on_error, on_cancelled):
+            return False
+        self.cancel_btn.configure(state="normal")
+        self.configure(cursor="watch")
+        self.status_var.set(f"{label}...")
+        return True
+
+    def _check_saves(self):
+        try:
+            target, e, retried = self._save_errors.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            self.status_var.set(f"Saving to {target} failed{'; retrying' if retried else ''}.")
+            messagebox.showwarning("Save error", f"Could not save changes to {target}: {e}"
+                                   + ("\n\nThey are kept and saving is retried." if retried else ""))
+        self.after(SAVE_CHECK_MS, self._check_saves)
+
+    def _busy(self):
+        if self.runner.busy:
+            self.status_var.set("Please wait for the current task to finish (or cancel it).")
+            return True
+        return False
+
+    def _on_progress(self, label, done, total, stage):
+        if total:
+            self.status_var.set(f"{label}: {stage} {done}/{total} ({100 * done // total}%)")
+        else:
+            self.status_var.set(f"{label}: {stage} {done}")
+
+    def _on_idle(self):
+        self.cancel_btn.configure(state="disabled")
+        self.configure(cursor="")
+        self._show_profile()
+
+    def _show_profile(self):
+        if instrument.enabled():
+            self.profile_var.set(instrument.status_line(top=3))
+
+    def on_cancel(self):
+        self.runner.cancel()
+        self.status_var.set("Cancelling...")
+
+    def on_close(self):
+        self.runner.shutdown()
+        try:
+            self.autosave.close()  # writes whatever is still pending
+        except Exception as e:
+            messagebox.showerror("Save error", f"Could not save the latest changes to {DEFAULT_DB}: {e}")
+        self._meta_writes.shutdown(wait=True)  # finish recording completions before closing the store
+        self.meta_store.close()
+        self._close_archive()
+        path = instrument.output_path()
+        if path and not path.endswith(".prof"):  # .prof dumps are written by the launcher
+            instrument.export(path)
+        self.destroy()
+
+    def on_pick_date(self):
+        # tkcalendar is the slowest import of the GUI, so it is only loaded once the picker is opened
+        from tkcalendar import Calendar
+        try:
+            current = date.fromisoformat(self.exam_date.get().strip())
+        except ValueError:
+            current = date.today()
+        top = tk.Toplevel(self)
+        top.title("Exam date")
+        top.transient(self)
+        cal = Calendar(top, selectmode="day", year=current.year, month=current.month, day=current.day)
+        cal.pack(padx=8, pady=8)
+
+        def pick():
+            self.exam_date.delete(0, "end")
+            self.exam_date.insert(0, cal.selection_get().isoformat())
+            top.destroy()
+
+        ttk.Button(top, text="OK", command=pick).pack(pady=(0,8))
+
+    def on_import_busy(self):
+        fname = filedialog.askopenfilename(filetypes=[("iCalendar file", "*.ics"), ("All files", "*.*")])
+        if not fname:
+            return
+        try:
+            events = read_events(fname)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import error", str(e))
+            return
+        self.busy_events.extend(events)
+        self.busy_var.set(f"{len(self.busy_events)} busy events imported.")
+
+    def on_clear_busy(self):
+        self.busy_events = []
+        self.busy_var.set("No calendar imported.")
 
     def on_generate(self):
+        if self._busy():
+            return
         try:
             chapters = [ln.strip() for ln in self.chapters_text.get("1.0", "end").splitlines() if ln.strip()]
             if not chapters:
-                messagebox.show.error = messagebox.showerror
                 messagebox.showerror("Error", "Please enter one or more chapter titles.")
                 return
 
-            exam_date = self.exam_date.get_date()
+            try:
+                exam_date = date.fromisoformat(self.exam_date.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid exam date. Use YYYY-MM-DD.")
+                return
             try:
                 hour, minute = map(int, self.exam_time.get().split(":"))
             except Exception:
@@ -131,35 +330,108 @@ class StudyPlannerApp(tk.Tk):
             break_len = int(self.break_len.get())
             ramp = float(self.ramp_factor.get())
             day_start = int(self.day_start_hour.get())
+            rules = [ln.strip() for ln in self.busy_text.get("1.0", "end").splitlines() if ln.strip()]
+            busy = BusyCalendar(rules=rules, events=self.busy_events) if rules or self.busy_events else None
 
-            scheduler = SmartScheduler(
-                chapter_titles=chapters,
+            params = dict(
                 block_minutes=block_len,
                 exam_datetime=exam_dt,
                 daily_limit=daily_limit,
                 break_minutes=break_len,
                 ramp_factor=ramp,
-                day_start_hour=day_start
+                day_start_hour=day_start,
+                strategy=self.strategy.get(),
+                busy=busy
             )
-
-            self.blocks = scheduler.generate_schedule()
-            save_schedule(self.blocks)  # persist default
-            self._refresh_tree()
-            self.status_var.set(f"Generated schedule with {len(self.blocks)} blocks.")
-            messagebox.showinfo("Schedule Generated", f"Generated {len(self.blocks)} blocks. Saved to study_schedule.json")
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        scheduler = self.scheduler if self.blocks else None
+        current = self.blocks
+
+        def job(progress, cancel):
+            fresh = SmartScheduler(chapter_titles=chapters, meta_store=self.meta_store, **params)
+            if scheduler is None:
+                result = fresh, self.cache.generate(fresh, progress, cancel)
+            else:
+                # a field changed and changed back: reuse that plan unless progress would be lost
+                cached = None if any(b.completed for b in current) else self.cache.get(fresh)
+                if cached is not None:
+                    fresh.blocks = cached
+                    result = fresh, cached
+                else:
+                    # only re-plan what changed, on copies: the table keeps reading `current`
+                    # until done() swaps the result in
+                    edited = scheduler.copy()
+                    result = edited, self._reschedule(edited, current.copy(), chapters, params)
+            self.autosave.save_all(result[1])  # persist default (written behind)
+            return result
+
+        action = "Updated" if scheduler is not None else "Generated"
+
+        def done(result):
+            self.scheduler, self.blocks = result
+            self._refresh_tree()
+            self._close_archive()
+            self.status_var.set(f"{action} schedule with {len(self.blocks)} blocks.")
+            messagebox.showinfo(f"Schedule {action}", f"{action} {len(self.blocks)} blocks. Saved to {DEFAULT_DB}")
+
+        self._run("Generating", job, done, "Error")
+
+    def _reschedule(self, scheduler, blocks, chapters, params):
+        """
+        Apply the differences from the scheduler's inputs as incremental edits.
+        Runs on the worker thread against copies of the scheduler and blocks;
+        the edits are not cancellable.
+        """
+        changed = {k: v for k, v in params.items() if getattr(scheduler, k) != v}
+        # add before removing so the chapter list never becomes empty
+        for title in chapters:
+            if title not in scheduler.chapter_titles:
+                blocks = scheduler.reschedule(blocks, ScheduleEdit.add_chapter(title))
+        for title in list(scheduler.chapter_titles):
+            if title not in chapters:
+                blocks = scheduler.reschedule(blocks, ScheduleEdit.remove_chapter(title))
+        if changed:
+            blocks = scheduler.reschedule(blocks, ScheduleEdit.change_params(**changed))
+        return blocks
 
     def _refresh_tree(self):
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-        for b in self.blocks:
-            start_s = b.start_time.strftime("%Y-%m-%d %H:%M")
-            end_s = b.end_time.strftime("%H:%M")
-            done = "✓" if getattr(b, "completed", False) else ""
-            self.tree.insert("", "end", values=(b.chapter, start_s, end_s, b.mode, done))
+        """Reset the table to the current blocks and filters (only the first page is built)."""
+        with instrument.span("ui.refresh_tree"):
+            self.filter_chapter.configure(values=sorted(self.blocks.chapters()))
+            self.view.show(self.blocks, **self._active_filters)
+        self._show_profile()
+
+    def on_apply_filter(self):
+        try:
+            start = self.filter_from.get().strip()
+            end = self.filter_to.get().strip()
+            filters = {
+                "chapter": self.filter_chapter.get().strip() or None,
+                "start": datetime.fromisoformat(start) if start else None,
+                # "To" is inclusive of the whole day
+                "end": datetime.fromisoformat(end) + timedelta(days=1) if end else None,
+            }
+        except ValueError:
+            messagebox.showerror("Filter", "Dates must be in YYYY-MM-DD format.")
+            return
+        self._active_filters = filters
+        self._refresh_tree()
+        self.status_var.set(f"Showing {self.view.total()} of {len(self.blocks)} blocks.")
+
+    def on_clear_filter(self):
+        self.filter_chapter.set("")
+        self.filter_from.delete(0, "end")
+        self.filter_to.delete(0, "end")
+        self._active_filters = {}
+        self._refresh_tree()
+        self.status_var.set(f"Showing all {len(self.blocks)} blocks.")
 
     def on_export(self):
+        if self._busy():
+            return
         if not self.blocks:
             messagebox.showwarning("Empty", "Generate a schedule first.")
             return
@@ -168,80 +440,216 @@ class StudyPlannerApp(tk.Tk):
                                              initialfile="study_schedule.ics")
         if not fname:
             return
-        try:
-            export_to_ics(self.blocks, fname)
+        blocks = self.blocks
+
+        def done(_):
             self.status_var.set(f"Exported schedule to {fname}")
             messagebox.showinfo("Exported", f"Schedule exported to {fname}")
-        except Exception as e:
-            messagebox.showerror("Export error", str(e))
+
+        # the state file keeps UIDs/SEQUENCE numbers stable across re-exports
+        self._run("Exporting",
+                  lambda progress, cancel: export_to_ics(blocks, fname, state_file=fname + ".state.json",
+                                                         progress=progress, cancel=cancel),
+                  done, "Export error")
 
     def on_save(self):
-        try:
-            fname = filedialog.asksaveasfilename(defaultextension=".json",
-                                                 filetypes=[("JSON file", "*.json")],
-                                                 initialfile="study_schedule.json")
-            if not fname:
-                return
-            save_schedule(self.blocks, fname)
+        if self._busy():
+            return
+        fname = filedialog.asksaveasfilename(defaultextension=".json",
+                                             filetypes=SCHEDULE_FILETYPES,
+                                             initialfile="study_schedule.json")
+        if not fname:
+            return
+        blocks = self.blocks
+
+        def done(_):
             self.status_var.set(f"Saved schedule to {fname}")
             messagebox.showinfo("Saved", f"Saved schedule to {fname}")
-        except Exception as e:
-            messagebox.showerror("Save error", str(e))
+
+        self._run("Saving",
+                  lambda progress, cancel: save_schedule(blocks, fname, progress=progress, cancel=cancel),
+                  done, "Save error")
 
     def on_load(self):
-        try:
-            fname = filedialog.askopenfilename(filetypes=[("JSON file", "*.json")], initialdir=".")
-            if not fname:
-                return
-            self.blocks = load_schedule(fname)
+        if self._busy():
+            return
+        fname = filedialog.askopenfilename(filetypes=SCHEDULE_FILETYPES,
+                                           initialdir=".")
+        if not fname:
+            return
+        if is_binary(fname):
+            self._open_archive(fname)
+            return
+
+        def job(progress, cancel):
+            blocks = load_schedule(fname, progress=progress, cancel=cancel)
+            self.autosave.save_all(blocks)
+            return blocks
+
+        def done(blocks):
+            self.blocks = blocks
+            self.scheduler = None
             self._refresh_tree()
+            self._close_archive()
             self.status_var.set(f"Loaded schedule from {fname}")
             messagebox.showinfo("Loaded", f"Loaded schedule from {fname}")
-        except Exception as e:
+
+        self._run("Loading", job, done, "Load error")
+
+    def _open_archive(self, fname):
+        """
+        Browse a binary schedule without loading it: opening maps the file,
+        and rows become StudyBlocks as the table pages them in. The plan in
+        the SQLite database is left as it was.
+        """
+        try:
+            archive = BinarySchedule(fname, writable=True)
+        except (OSError, ValueError) as e:
             messagebox.showerror("Load error", str(e))
+            return
+        previous = self.archive
+        self.archive = self.blocks = archive
+        self.scheduler = None
+        self._refresh_tree()
+        if previous is not None:
+            previous.close()
+        self.status_var.set(f"Opened {fname} ({len(archive)} blocks); completion flags are saved to that file.")
+
+    def _close_archive(self):
+        # called once self.blocks and the table no longer read from the mapping
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def _archive_read_only(self):
+        if self.archive is None:
+            return False
+        messagebox.showinfo("Read-only", "Binary schedules can only be marked completed in place. "
+                                         "Save this one as .db or .json and load that to edit it.")
+        return True
+
+    def on_merge(self):
+        if self._busy():
+            return
+        fnames = filedialog.askopenfilenames(title="Schedules to merge (first file has priority)",
+                                             filetypes=SCHEDULE_FILETYPES, initialdir=".")
+        if not fnames:
+            return
+        policy = self.merge_policy.get()
+
+        def job(progress, cancel):
+            timeline = merge_schedules(list(fnames), policy=policy)
+            blocks = BlockStore(timeline)
+            self.autosave.save_all(blocks)
+            return blocks, timeline.conflicts
+
+        def done(result):
+            self.blocks, conflicts = result
+            self.scheduler = None  # a merged timeline has no single generator to re-plan with
+            self._refresh_tree()
+            self._close_archive()
+            summary = f"Merged {len(fnames)} schedules: {len(self.blocks)} blocks, {len(conflicts)} conflicts ({policy})."
+            self.status_var.set(summary)
+            if conflicts:
+                lines = [f"{c.action}: {c.block.chapter} {c.original_start:%Y-%m-%d %H:%M} "
+                         f"vs {c.against.chapter}" for c in conflicts[:10]]
+                if len(conflicts) > 10:
+                    lines.append(f"... and {len(conflicts) - 10} more")
+                messagebox.showinfo("Merged", summary + "\n\n" + "\n".join(lines))
+
+        self._run("Merging", job, done, "Merge error")
 
     def on_mark_completed(self):
+        if self._busy():
+            return
         sel = self.tree.selection()
         if not sel:
             messagebox.showinfo("Select", "Select a block in the table first.")
             return
-        vals = self.tree.item(sel[0], "values")
-        chapter = vals[0]
+        chapter = self.blocks.get(int(sel[0])).chapter
         # Mark the first matching block for that chapter as completed (prefer earliest pending)
-        for b in self.blocks:
-            if b.chapter == chapter and not b.completed:
+        for b in self.blocks.by_chapter(chapter):
+            if not b.completed:
                 b.completed = True
+                if self.archive is not None:
+                    self.archive.set_completed(self.archive.index_of(b))
+                else:
+                    self.autosave.update_block(b)
+                self.view.update_block(b)
+                self._record_actual(b)
                 break
-        save_schedule(self.blocks)
-        self._refresh_tree()
         self.status_var.set(f"Marked '{chapter}' completed (first pending block).")
 
+    def _record_actual(self, b):
+        """
+        Ask how long the block really took; cancelling marks it without recording
+        anything. The minutes are written to the chapter store off the Tk thread.
+        """
+        planned = max(1, int((b.end_time - b.start_time).total_seconds() // 60))
+        actual = simpledialog.askinteger("Time spent", f"Minutes actually spent on '{b.chapter}':",
+                                         parent=self, initialvalue=planned, minvalue=1)
+        if actual is not None:
+            future = self._meta_writes.submit(self.meta_store.record_completion, b.chapter, planned, actual)
+            future.add_done_callback(self._report_meta_error)
+
+    def _report_meta_error(self, future):
+        # runs on the meta writer thread: hand the error to _check_saves
+        if future.exception() is not None:
+            self._save_errors.put((self.meta_store.filename, future.exception(), False))
+
     def on_clear_completed(self):
-        for b in self.blocks:
-            b.completed = False
-        save_schedule(self.blocks)
-        self._refresh_tree()
+        if self._busy():
+            return
+        if self.archive is not None:
+            self.archive.clear_completed()
+        else:
+            for b in self.blocks:
+                b.completed = False
+            self.autosave.clear_completed()
+        self.view.refresh_loaded()
         self.status_var.set("Cleared completed flags.")
 
     def on_remove_selected(self):
+        if self._busy() or self._archive_read_only():
+            return
         sel = self.tree.selection()
         if not sel:
             messagebox.showinfo("Select", "Select a block in the table first.")
             return
-        vals = self.tree.item(sel[0], "values")
-        chapter = vals[0]
-        # remove the selected exact datetime block
-        start = vals[1]
-        # find block matching chapter and start string
-        removed = False
-        for b in list(self.blocks):
-            if b.chapter == chapter and b.start_time.strftime("%Y-%m-%d %H:%M") == start:
-                self.blocks.remove(b)
-                removed = True
-                break
-        if removed:
-            save_schedule(self.blocks)
-            self._refresh_tree()
-            self.status_var.set(f"Removed selected block '{chapter}' at {start}.")
-        else:
+        # tree rows are keyed by block id
+        b = self.blocks.get(int(sel[0]))
+        if b is None:
             messagebox.showwarning("Not found", "Could not find selected block to remove.")
+            return
+        removed = f"Removed selected block '{b.chapter}' at {b.start_time:%Y-%m-%d %H:%M}."
+        if self.scheduler is None:
+            self.blocks.remove(b)
+            self.autosave.delete_block(b.block_id)
+            self.view.remove_block(b)
+            self.status_var.set(removed)
+            return
+
+        scheduler, current = self.scheduler, self.blocks
+
+        def job(progress, cancel):
+            # refills the chapter's study session if this was its pending Study block; this may
+            # re-plan the pending part, so it runs on copies and done() swaps them in
+            edited, copied = scheduler.copy(), current.copy()
+            edit = ScheduleEdit.delete_block(copied.get(b.block_id))
+            blocks = edited.reschedule(copied, edit)
+            return edited, blocks, edit, blocks is copied
+
+        def done(result):
+            self.scheduler, self.blocks, edit, in_place = result
+            if in_place:
+                self.view.rebind(self.blocks)
+                self.autosave.delete_block(b.block_id)
+                self.autosave.update_blocks(edit.touched)
+                self.view.remove_block(b)
+                self.view.update_blocks(edit.touched)
+            else:
+                self.autosave.save_all(self.blocks)
+                self._refresh_tree()
+            self.status_var.set(removed)
+
+        self._run("Removing", job, done, "Error")
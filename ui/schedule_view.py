@@ -0,0 +1,142 @@
+# study_planner/ui/schedule_view.py
+"""
+Virtualized, diff-based binding between a BlockStore (or a mapped
+BinarySchedule, read in place) and a ttk.Treeview.
+
+Only the first page of matching blocks (plus what the user has scrolled to)
+is turned into Tk items; the next page is inserted when the scrollbar nears
+the bottom. Single-block changes update or delete one row instead of
+rebuilding the table. Chapter and date-range filters are answered from the
+BlockStore indexes. The tree is duck-typed (insert/item/delete/exists/
+get_children), so this module does not import tkinter; the benchmark suite's
+HeadlessTree implements those calls without a display.
+"""
+
+PAGE_SIZE = 200
+LOAD_MORE_AT = 0.9  # scrollbar fraction that triggers the next page
+
+
+def row_values(block):
+    start_s = block.start_time.strftime("%Y-%m-%d %H:%M")
+    end_s = block.end_time.strftime("%H:%M")
+    done = "✓" if getattr(block, "completed", False) else ""
+    return (block.chapter, start_s, end_s, block.mode, done)
+
+
+class ScheduleView:
+    def __init__(self, tree, page_size=PAGE_SIZE, scrollbar=None):
+        self.tree = tree
+        self.page_size = page_size
+        self.scrollbar = scrollbar
+        self.store = None
+        self.chapter = None
+        self.start = None
+        self.end = None
+        self._last = None        # last block inserted into the tree (paging cursor)
+        self._loaded = 0
+
+    def show(self, store, chapter=None, start=None, end=None):
+        """Replace the table contents with the first page of matching blocks."""
+        self.store = store
+        self.chapter, self.start, self.end = chapter, start, end
+        self._last = None
+        self._loaded = 0
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.load_more()
+
+    def matches(self, block):
+        return ((self.chapter is None or block.chapter == self.chapter)
+                and (self.start is None or block.start_time >= self.start)
+                and (self.end is None or block.start_time < self.end))
+
+    def total(self):
+        """Number of blocks matching the current filter (via the indexes)."""
+        if self.store is None:
+            return 0
+        if self.chapter is not None:
+            lo, hi = self.store.chapter_span(self.chapter, self.start, self.end)
+            return hi - lo
+        lo = 0 if self.start is None else self.store.index_at_or_after(self.start)
+        hi = len(self.store) if self.end is None else self.store.index_at_or_after(self.end)
+        return max(0, hi - lo)
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def _next_rows(self):
+        store = self.store
+        if self.chapter is not None:
+            # same key cursor, over the chapter's index
+            lo, hi = store.chapter_span(self.chapter, self.start, self.end)
+            if self._last is not None:
+                last = self._last
+                in_chapter = last in store and last.chapter == self.chapter
+                lo = max(lo, store.chapter_position(self.chapter, last) + (1 if in_chapter else 0))
+            return store.chapter_slice(self.chapter, lo, min(hi, lo + self.page_size))
+        if self._last is None:
+            lo = 0 if self.start is None else store.index_at_or_after(self.start)
+        else:
+            # cursor by key, so deletions elsewhere in the store don't shift paging
+            lo = store.index_of(self._last) + (1 if self._last in store else 0)
+        hi = len(store) if self.end is None else store.index_at_or_after(self.end)
+        return store[lo:min(hi, lo + self.page_size)]
+
+    def load_more(self):
+        """Insert the next page of rows; returns how many were added."""
+        if self.store is None:
+            return 0
+        rows = self._next_rows()
+        for b in rows:
+            self.tree.insert("", "end", iid=str(b.block_id), values=row_values(b))
+        if rows:
+            self._last = rows[-1]
+            self._loaded += len(rows)
+        return len(rows)
+
+    def on_yscroll(self, first, last):
+        """Treeview yscrollcommand: forward to the scrollbar and page in near the end."""
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_AT:
+            self.load_more()
+
+    # diffs
+    def update_block(self, block):
+        """Re-render one block's row if it is on screen."""
+        iid = str(block.block_id)
+        if not self.tree.exists(iid):
+            return
+        if self.matches(block):
+            self.tree.item(iid, values=row_values(block))
+        else:
+            self.tree.delete(iid)
+            self._loaded -= 1
+
+    def update_blocks(self, blocks):
+        for b in blocks:
+            self.update_block(b)
+
+    def remove_block(self, block):
+        iid = str(block.block_id)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+            self._loaded -= 1
+
+    def rebind(self, store):
+        """
+        Point the view at a copy of its store (same block ids) without
+        rebuilding the table, e.g. after an edit was made on a copy.
+        """
+        self.store = store
+        if self._last is not None:
+            self._last = store.get(self._last.block_id) or self._last
+
+    def refresh_loaded(self):
+        """Re-render every row currently in the tree (e.g. after clearing all flags)."""
+        for iid in self.tree.get_children():
+            block = self.store.get(int(iid))
+            if block is not None:
+                self.tree.item(iid, values=row_values(block))
@@ -0,0 +1,87 @@
+# study_planner/ui/tasks.py
+"""
+Background execution for the Tk UI.
+
+Jobs run on a single worker thread so Tk callbacks return immediately.
+The worker never touches Tk: progress, results and errors are put on a
+thread-safe queue that the main loop drains with after(). Each job gets a
+threading.Event it passes to the core functions as their `cancel` hook.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.progress import Cancelled
+
+POLL_MS = 50
+
+
+class BackgroundRunner:
+    def __init__(self, root, on_progress=None, on_idle=None):
+        self.root = root
+        self.on_progress = on_progress  # callable(label, done, total, stage) on the Tk thread
+        self.on_idle = on_idle          # callable() when the running job has finished
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="study-planner")
+        self._cancel = None
+        self._label = ""
+
+    @property
+    def busy(self):
+        return self._cancel is not None
+
+    def submit(self, label, job, on_done, on_error=None, on_cancelled=None):
+        """
+        Run job(progress, cancel) on the worker. Exactly one of on_done(result),
+        on_error(exc) or on_cancelled() is later called on the Tk thread.
+        Returns False (and does nothing) if another job is still running.
+        """
+        if self.busy:
+            return False
+        cancel = threading.Event()
+        self._cancel = cancel
+        self._label = label
+        q = self._queue
+
+        def progress(done, total, stage):
+            q.put(("progress", (done, total, stage)))
+
+        def run():
+            try:
+                q.put(("done", on_done, job(progress, cancel)))
+            except Cancelled:
+                q.put(("cancelled", on_cancelled, None))
+            except Exception as e:
+                q.put(("error", on_error, e))
+
+        self._executor.submit(run)
+        self.root.after(POLL_MS, self._poll)
+        return True
+
+    def cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def _poll(self):
+        while True:
+            try:
+                msg = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = msg[0]
+            if kind == "progress":
+                if self.on_progress is not None:
+                    self.on_progress(self._label, *msg[1])
+                continue
+            _, callback, payload = msg
+            self._cancel = None
+            if self.on_idle is not None:
+                self.on_idle()
+            if callback is not None:
+                callback() if kind == "cancelled" else callback(payload)
+            return
+        self.root.after(POLL_MS, self._poll)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)